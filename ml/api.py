@@ -3,116 +3,220 @@ BMSIT Placement Prediction API
 Flask API for placement prediction with BMSIT-specific features
 """
 
-from flask import Flask, request, jsonify
-from flask_cors import CORS
-import pickle
-import numpy as np
 import os
 import json
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Import time per group, for the startup breakdown. sklearn, pandas and scipy are
+# not imported here: the served artifacts do not need them, and the modules that
+# can (pickle fallback, similar-students index) import them when they load
+_import_marks = [time.perf_counter()]
+from flask import Flask, request, jsonify, Response, stream_with_context, g
+from flask_cors import CORS
+_import_marks.append(time.perf_counter())
+import numpy as np
+_import_marks.append(time.perf_counter())
+
+import counterfactuals
+from cohort import FINE_BINS as COHORT_FINE_BINS, CohortStore
+from drift import REFERENCE_FILE, DriftMonitor
+from features import FEATURE_COLS, build_feature_block, records_from_csv
+from heads import head_outputs
+from metrics import CONTENT_TYPE, MetricsRegistry
+from model_registry import ModelRegistry
+from prediction_cache import PredictionCache
+from similarity import IndexFile
+from tips import TipRules
+_import_marks.append(time.perf_counter())
 
 app = Flask(__name__)
 CORS(app)
 
+# Batch scoring limits
+BATCH_CHUNK_SIZE = int(os.environ.get('ML_BATCH_CHUNK_SIZE', 1024))
+BATCH_MAX_RECORDS = int(os.environ.get('ML_BATCH_MAX_RECORDS', 50000))
+
+# Fallback when model_metadata.json has no feature_importance
+DEFAULT_FEATURE_IMPORTANCE = {
+    'DSA_Score': 25,
+    'CGPA': 20,
+    'Projects': 15,
+    'Branch': 12,
+    'LeetCode_Problems': 10,
+    'Certifications': 8,
+    'Communication_Score': 5,
+    'Internship': 3,
+    'Backlogs': 2
+}
+
+# Result cache: ML_CACHE_SIZE=0 disables it
+CACHE_SIZE = int(os.environ.get('ML_CACHE_SIZE', 10000))
+CACHE_TTL = float(os.environ.get('ML_CACHE_TTL', 300))
+# /whatif searches are cached separately (one entry holds a whole ranked answer)
+WHATIF_CACHE_SIZE = int(os.environ.get('ML_WHATIF_CACHE_SIZE', 1000))
+# Named cohorts kept for /cohort/stats, and the default at-risk cut-off (placed probability, %)
+COHORT_MAX = int(os.environ.get('ML_COHORT_MAX', 16))
+AT_RISK_THRESHOLD = float(os.environ.get('ML_AT_RISK_THRESHOLD', 40))
+# Most neighbours /similar returns per profile
+SIMILAR_MAX_K = int(os.environ.get('ML_SIMILAR_MAX_K', 50))
+
+# Live input / probability histograms compared with the training distribution (/drift); 0 = off
+DRIFT_MONITOR = os.environ.get('ML_DRIFT_MONITOR', '1') != '0'
+
+# Package and company-tier outputs next to placement when the model has them; 0 = placement only
+OUTCOME_HEADS = os.environ.get('ML_OUTCOME_HEADS', '1') != '0'
+
+# Inference engine: 'flat' (compiled node arrays) or 'sklearn'; flat is used when exported
+INFERENCE_ENGINE = os.environ.get('ML_INFERENCE_ENGINE', 'flat')
+# Set ML_BUNDLE_VERIFY=0 to skip hashing every bundle file at startup
+BUNDLE_VERIFY = os.environ.get('ML_BUNDLE_VERIFY', '1') != '0'
+
+# Seconds between checks of ml/models/ for new artifacts; 0 disables hot reload
+MODEL_WATCH_INTERVAL = float(os.environ.get('ML_MODEL_WATCH_INTERVAL', 5))
+# Admin routes (/admin/*) need this token in X-Admin-Token; without it only localhost may call them
+ADMIN_TOKEN = os.environ.get('ML_ADMIN_TOKEN')
+
+# Per-request logging (payloads, predictions) is off unless ML_VERBOSE_LOG=1,
+# and then only a ML_LOG_SAMPLE_RATE fraction of requests is logged
+VERBOSE_LOG = os.environ.get('ML_VERBOSE_LOG', '0') == '1'
+LOG_SAMPLE_RATE = float(os.environ.get('ML_LOG_SAMPLE_RATE', 1.0))
+
+prediction_cache = PredictionCache(maxsize=CACHE_SIZE, ttl=CACHE_TTL)
+whatif_cache = PredictionCache(maxsize=WHATIF_CACHE_SIZE, ttl=CACHE_TTL)
+cohorts = CohortStore(max_cohorts=COHORT_MAX)
+
+# Prometheus metrics, served on /metrics
+metrics = MetricsRegistry()
+STAGE_SECONDS = metrics.histogram(
+    'ml_stage_seconds', 'Time spent per request stage (batch: per chunk; parse and serialize per request)',
+    ['endpoint', 'stage']
+)
+REQUEST_SECONDS = metrics.histogram('ml_request_seconds', 'Time to produce a response', ['endpoint'])
+REQUESTS = metrics.counter('ml_requests', 'Requests handled', ['endpoint', 'status'])
+ERRORS = metrics.counter('ml_errors', 'Requests answered with an error status', ['endpoint', 'kind'])
+ROWS_SCORED = metrics.counter('ml_rows_scored', 'Student rows scored, cache hits included', ['endpoint'])
+ERROR_KINDS = {400: 'invalid_input', 403: 'forbidden', 404: 'not_found', 405: 'not_found',
+               409: 'conflict', 413: 'too_large', 503: 'unavailable'}
+
+def log_verbose(*args):
+    if VERBOSE_LOG and (LOG_SAMPLE_RATE >= 1 or random.random() < LOG_SAMPLE_RATE):
+        print(*args)
+
+# Set once the model is loaded and a warmup batch has run; traffic is held until then
+ready = threading.Event()
+WARMUP_ROWS = int(os.environ.get('ML_WARMUP_ROWS', 64))
+# Set when warmup() has finished, whether or not a model loaded
+started = threading.Event()
+# Fast startup (default): model and tip rules load in parallel and the similar-students
+# index loads in the background once ready. ML_FAST_STARTUP=0 loads everything in turn, before ready
+FAST_STARTUP = os.environ.get('ML_FAST_STARTUP', '1') != '0'
+# WSGI environ key marking the synthetic warmup request (cannot come from a client)
+WARMUP_ENVIRON = 'ml.warmup'
+
+# Startup breakdown in ms, logged when warmup finishes and reported by /health
+startup = {
+    'import_flask_ms': round((_import_marks[1] - _import_marks[0]) * 1000, 1),
+    'import_numpy_ms': round((_import_marks[2] - _import_marks[1]) * 1000, 1),
+    'import_modules_ms': round((_import_marks[3] - _import_marks[2]) * 1000, 1)
+}
+background_loads = []
+
+def on_model_swap(version):
+    # Old entries are keyed by the old version id and would never be hit again
+    prediction_cache.clear()
+    whatif_cache.clear()
+    # An index built from students.csv is in the old model's scaler space
+    similar_index.invalidate()
+    # Every version is validated on a synthetic batch before it is swapped in. At startup
+    # warmup() opens the gate; a first model that only loads later is warmed up here
+    if started.is_set() and not ready.is_set():
+        warm_request()
+        ready.set()
+
+def on_tips_reload(table):
+    # Cached results carry tips from the previous table
+    prediction_cache.clear()
+
+# Tip rule table (tip_rules.json, or ML_TIP_RULES), reloaded when the file changes
+tip_rules = TipRules(on_reload=on_tips_reload)
+
 # Load Model & Artifacts
 MODEL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'models')
-model = None
-scaler = None
-encoders = None
-metadata = None
-
-try:
-    with open(os.path.join(MODEL_DIR, 'placement_model.pkl'), 'rb') as f:
-        model = pickle.load(f)
-    with open(os.path.join(MODEL_DIR, 'scaler.pkl'), 'rb') as f:
-        scaler = pickle.load(f)
-    with open(os.path.join(MODEL_DIR, 'encoders.pkl'), 'rb') as f:
-        encoders = pickle.load(f)
-    with open(os.path.join(MODEL_DIR, 'model_metadata.json'), 'r') as f:
-        metadata = json.load(f)
-    print("✅ Model, Scaler, and Encoders loaded successfully!")
-    print(f"   Model Accuracy: {metadata.get('accuracy', 'N/A')}%")
-    print(f"   Branches: {metadata.get('branches', [])}")
-except Exception as e:
-    print(f"❌ Error loading model artifacts: {str(e)}")
+# Past students for /similar (models/similarity_index.npz, reloaded when it changes;
+# built from students.csv in the serving model's scaler space until training writes one)
+similar_index = IndexFile(
+    MODEL_DIR, scaler_params=lambda: (*registry.current.scaler_params(), registry.current.encoders['Branch'].classes)
+)
+registry = ModelRegistry(
+    MODEL_DIR, engine=INFERENCE_ENGINE, verify=BUNDLE_VERIFY,
+    validation_rows=WARMUP_ROWS, on_swap=on_model_swap
+)
+# Training distribution (models/drift_reference.json) the live traffic is compared with
+drift = DriftMonitor(MODEL_DIR)
+
+@app.before_request
+def start_timer():
+    g.request_start = time.perf_counter()
+
+@app.before_request
+def readiness_gate():
+    if request.environ.get(WARMUP_ENVIRON):
+        return None
+    # Started lazily so every forked worker gets its own watcher thread
+    registry.watch(MODEL_WATCH_INTERVAL)
+    tip_rules.watch(MODEL_WATCH_INTERVAL)
+    if not ready.is_set() and request.endpoint not in ('health', 'readiness', 'metrics_endpoint', 'admin_models', 'admin_reload'):
+        return jsonify({'error': 'Prediction service is warming up'}), 503
+
+@app.after_request
+def record_request(response):
+    if request.environ.get(WARMUP_ENVIRON):
+        return response
+    endpoint = request.endpoint or 'not_found'
+    status = response.status_code
+    # Streaming responses are counted when the headers go out, not when the body ends
+    REQUEST_SECONDS.labels(endpoint).observe(time.perf_counter() - g.request_start)
+    REQUESTS.labels(endpoint, status).inc()
+    if status >= 400:
+        ERRORS.labels(endpoint, ERROR_KINDS.get(status, 'internal' if status >= 500 else 'client')).inc()
+    return response
 
 @app.route('/predict', methods=['POST'])
 def predict():
     try:
+        start = time.perf_counter()
         data = request.json
-        print("📥 Received Prediction Request:", data)
-        
-        # Extract features with safe defaults
-        branch = data.get('Branch', 'CSE')
-        gender = data.get('Gender', 'Male')
+        parsed = time.perf_counter()
+        STAGE_SECONDS.labels('predict', 'parse').observe(parsed - start)
+        log_verbose("📥 Received Prediction Request:", data)
         
-        cgpa = float(data.get('CGPA')) if data.get('CGPA') is not None else 7.0
-        backlogs = int(data.get('Backlogs')) if data.get('Backlogs') is not None else 0
-        dsa_score = int(data.get('DSA_Score')) if data.get('DSA_Score') is not None else 50
-        projects = int(data.get('Projects')) if data.get('Projects') is not None else 1
-        leetcode = int(data.get('LeetCode_Problems')) if data.get('LeetCode_Problems') is not None else 0
-        certifications = int(data.get('Certifications')) if data.get('Certifications') is not None else 0
-        internship = 1 if data.get('Internship') else 0
-        communication = int(data.get('Communication_Score')) if data.get('Communication_Score') is not None else 3
+        # One version for the whole request, even if a reload swaps it meanwhile
+        version = registry.current
+        features, valid, errors, context = build_feature_block([data], version.encoders)
+        STAGE_SECONDS.labels('predict', 'encode').observe(time.perf_counter() - parsed)
+        if errors:
+            return jsonify({'error': errors[0]}), 400
         
-        # Encode categorical features
-        try:
-            branch_enc = encoders['Branch'].transform([branch])[0]
-        except:
-            print(f"⚠️ Unknown branch: {branch}, defaulting to CSE")
-            branch_enc = encoders['Branch'].transform(['CSE'])[0]
-            
-        try:
-            gender_enc = encoders['Gender'].transform([gender])[0]
-        except:
-            gender_enc = 0
+        result = dict(score_block(version, features, context['branches'])[0])
         
-        # Feature order: Branch, Gender, CGPA, Backlogs, DSA_Score, Projects, LeetCode_Problems, Certifications, Internship, Communication_Score
-        features = np.array([[
-            branch_enc,
-            gender_enc,
-            cgpa,
-            backlogs,
-            dsa_score,
-            projects,
-            leetcode,
-            certifications,
-            internship,
-            communication
-        ]])
-        
-        # Scale features
-        features_scaled = scaler.transform(features)
-        
-        # Predict
-        prediction = model.predict(features_scaled)[0]
-        probability = model.predict_proba(features_scaled)[0]
-        
-        # Get feature importance from metadata
-        feature_importance = metadata.get('feature_importance', {
-            'DSA_Score': 25,
-            'CGPA': 20,
-            'Projects': 15,
-            'Branch': 12,
-            'LeetCode_Problems': 10,
-            'Certifications': 8,
-            'Communication_Score': 5,
-            'Internship': 3,
-            'Backlogs': 2
-        })
-        
-        result = {
-            'placed': bool(prediction),
-            'confidence': round(max(probability) * 100, 2),
-            'probability': {
-                'placed': round(probability[1] * 100, 2),
-                'not_placed': round(probability[0] * 100, 2)
-            },
-            'tips': generate_tips(cgpa, dsa_score, projects, leetcode, backlogs, internship, branch),
-            'feature_importance': feature_importance
-        }
+        # Get feature importance from metadata (global), plus this student's own attribution
+        result['feature_importance'] = version.metadata.get('feature_importance', DEFAULT_FEATURE_IMPORTANCE)
+        attributions = explain_block(version, features, 'predict')
+        if attributions is not None:
+            result['attribution'] = attributions[0]
+        result['model_version'] = version.id
+        if DRIFT_MONITOR and not request.environ.get(WARMUP_ENVIRON):
+            drift.observe(features, context['branches'], [result['probability']['placed'] / 100])
         
-        print(f"📤 Prediction: {'Placed' if prediction else 'Not Placed'} ({result['confidence']}% confidence)")
-        return jsonify(result)
+        log_verbose(f"📤 Prediction: {'Placed' if result['placed'] else 'Not Placed'} ({result['confidence']}% confidence)")
+        start = time.perf_counter()
+        response = jsonify(result)
+        response.headers['X-Model-Version'] = version.id
+        STAGE_SECONDS.labels('predict', 'serialize').observe(time.perf_counter() - start)
+        return response
 
     except Exception as e:
         print(f"❌ Error predicting: {str(e)}")
@@ -120,59 +224,560 @@ def predict():
         traceback.print_exc()
         return jsonify({'error': str(e)}), 500
 
-def generate_tips(cgpa, dsa_score, projects, leetcode, backlogs, internship, branch):
-    """Generate personalized improvement tips"""
-    tips = []
+def score_block(version, features, branches, endpoint='predict'):
+    """
+    Result dicts (prediction + tips) for every row, served from the cache when the
+    same encoded profile was scored recently. Misses are transformed once and
+    that block feeds the placement model and every outcome head. Returned dicts
+    are shared with the cache and must not be mutated.
+    """
+    start = time.perf_counter()
+    tips = tip_rules.current
+    # Tips depend on the branch name as well as the encoded row (unknown branches encode as CSE)
+    keys = [(version.id, tips.version, tuple(row), branch) for row, branch in zip(features.tolist(), branches)]
+    results = [prediction_cache.get(key) for key in keys]
+    missing = [i for i, result in enumerate(results) if result is None]
+    looked_up = time.perf_counter()
+    STAGE_SECONDS.labels(endpoint, 'cache').observe(looked_up - start)
+    ROWS_SCORED.labels(endpoint).inc(len(keys))
+    if missing:
+        inputs = version.transform(features[missing])
+        scaled = time.perf_counter()
+        probabilities = version.infer(inputs)
+        inferred = time.perf_counter()
+        outputs = version.infer_heads(inputs) if OUTCOME_HEADS and version.heads else None
+        headed = time.perf_counter()
+        tip_lists = tips.evaluate(features[missing], [branches[i] for i in missing])
+        for row, (probability, i, row_tips) in enumerate(zip(probabilities, missing, tip_lists)):
+            result = summarize(probability)
+            if outputs is not None:
+                result.update(head_outputs(
+                    result['placed'],
+                    outputs['package'][row] if 'package' in outputs else None,
+                    outputs['tier'][row] if 'tier' in outputs else None,
+                    version.head_classes('tier') if 'tier' in outputs else None
+                ))
+            result['tips'] = row_tips
+            prediction_cache.put(keys[i], result)
+            results[i] = result
+        STAGE_SECONDS.labels(endpoint, 'scale').observe(scaled - looked_up)
+        STAGE_SECONDS.labels(endpoint, 'inference').observe(inferred - scaled)
+        if outputs is not None:
+            STAGE_SECONDS.labels(endpoint, 'heads').observe(headed - inferred)
+        STAGE_SECONDS.labels(endpoint, 'tips').observe(time.perf_counter() - headed)
+    return results
+
+def explain_block(version, features, endpoint):
+    """
+    Per-row attribution dicts: the model's base placed probability and each
+    feature's contribution, in percentage points, largest effect first.
+    None when the serving model is not a tree forest.
+    """
+    start = time.perf_counter()
+    contributions = version.explain(features)
+    if contributions is None:
+        return None
+    base = round(version.explainer.base * 100, 2)
+    order = np.argsort(-np.abs(contributions), axis=1, kind='stable')
+    values = np.round(contributions * 100, 2).tolist()
+    attributions = [
+        {
+            'base': base,
+            'contributions': [{'feature': FEATURE_COLS[j], 'value': row[j]} for j in row_order]
+        }
+        for row, row_order in zip(values, order.tolist())
+    ]
+    STAGE_SECONDS.labels(endpoint, 'explain').observe(time.perf_counter() - start)
+    return attributions
+
+def summarize(probability):
+    """Turn a probability row into the placed/confidence/probability response fields"""
+    placed = bool(probability[1] > probability[0])
+    return {
+        'placed': placed,
+        'confidence': round(float(max(probability)) * 100, 2),
+        'probability': {
+            'placed': round(float(probability[1]) * 100, 2),
+            'not_placed': round(float(probability[0]) * 100, 2)
+        }
+    }
+
+def read_batch_records():
+    """Read the batch payload: a JSON array (or {"students": [...]}) or a CSV upload"""
+    if 'file' in request.files:
+        return records_from_csv(request.files['file'].read().decode('utf-8-sig'))
+    if request.mimetype == 'text/csv':
+        return records_from_csv(request.get_data(as_text=True))
+    data = request.get_json(silent=True)
+    if isinstance(data, dict):
+        data = data.get('students')
+    if not isinstance(data, list):
+        raise ValueError('Expected a JSON array of students or a CSV upload')
+    return data
+
+def score_records(version, records, chunk_size=BATCH_CHUNK_SIZE, explain=False, cohort=None):
+    """
+    Yield one result dict per record, scoring (and optionally explaining) each
+    chunk as a single block. With `cohort`, every scored chunk also updates
+    that cohort's aggregates.
+    """
+    for offset in range(0, len(records), chunk_size):
+        chunk = records[offset:offset + chunk_size]
+        start = time.perf_counter()
+        features, valid, errors, context = build_feature_block(chunk, version.encoders)
+        STAGE_SECONDS.labels('predict_batch', 'encode').observe(time.perf_counter() - start)
+        results = score_block(version, features, context['branches'], 'predict_batch') if len(features) else []
+        if DRIFT_MONITOR and len(features):
+            drift.observe(features, context['branches'], np.array([r['probability']['placed'] for r in results]) / 100)
+        if cohort is not None and len(features):
+            record_cohort(cohort, version, [r for r, ok in zip(chunk, valid) if ok], features, context, results)
+        attributions = explain_block(version, features, 'predict_batch') if explain and len(features) else None
+        row = 0
+        for i, record in enumerate(chunk):
+            item = {'index': offset + i}
+            if isinstance(record, dict) and record.get('id') is not None:
+                item['id'] = record['id']
+            if valid[i]:
+                item.update(results[row])
+                if attributions is not None:
+                    item['attribution'] = attributions[row]
+                row += 1
+            else:
+                item['error'] = errors[i]
+            yield item
+
+def record_cohort(name, version, records, features, context, results):
+    """Add one scored chunk (valid rows only) to the cohort aggregates"""
+    start = time.perf_counter()
+    genders = version.encoders['Gender'].classes[features[:, FEATURE_COLS.index('Gender')].astype(np.int64)]
+    internship = features[:, FEATURE_COLS.index('Internship')] > 0
+    keys = [(str(b), str(g), bool(i)) for b, g, i in zip(context['branches'], genders, internship)]
+    ids = [str(r['id']) if r.get('id') is not None else None for r in records]
+    cohorts.add(
+        name, version.id, keys,
+        [r['probability']['placed'] for r in results], [r['placed'] for r in results], ids
+    )
+    STAGE_SECONDS.labels('predict_batch', 'cohort').observe(time.perf_counter() - start)
+
+@app.route('/predict/batch', methods=['POST'])
+def predict_batch():
+    """
+    Score a whole cohort in one call, streaming results back as NDJSON.
+    ?explain=1 adds attributions; ?cohort=<name> also feeds /cohort/stats
+    """
+    start = time.perf_counter()
+    try:
+        records = read_batch_records()
+    except (ValueError, UnicodeDecodeError) as e:
+        return jsonify({'error': str(e)}), 400
+    STAGE_SECONDS.labels('predict_batch', 'parse').observe(time.perf_counter() - start)
+    if len(records) > BATCH_MAX_RECORDS:
+        return jsonify({'error': f'Batch too large (max {BATCH_MAX_RECORDS} records)'}), 413
+    
+    log_verbose(f"📥 Received Batch Prediction Request: {len(records)} records")
+    version = registry.current
+    explain = request.args.get('explain', '0').lower() in ('1', 'true', 'yes')
+    cohort = request.args.get('cohort') or None
     
-    # CGPA tips
-    if cgpa < 6.5:
-        tips.append("🎯 Focus on improving your CGPA to at least 6.5. Many companies have this as a cutoff.")
-    elif cgpa < 7.5:
-        tips.append("📚 Try to push your CGPA above 7.5 for better opportunities.")
+    def stream():
+        serialize = 0.0
+        for item in score_records(version, records, explain=explain, cohort=cohort):
+            start = time.perf_counter()
+            line = json.dumps(item) + '\n'
+            serialize += time.perf_counter() - start
+            yield line
+        STAGE_SECONDS.labels('predict_batch', 'serialize').observe(serialize)
     
-    # DSA tips (very important for tech)
-    if dsa_score < 40:
-        tips.append("💻 DSA is crucial! Practice on LeetCode/GeeksForGeeks daily. Aim for 50+ problems.")
-    elif dsa_score < 60:
-        tips.append("📝 Good DSA foundation! Focus on medium-hard problems to stand out in coding rounds.")
+    return Response(
+        stream_with_context(stream()), mimetype='application/x-ndjson',
+        headers={'X-Model-Version': version.id}
+    )
+
+@app.route('/whatif', methods=['POST'])
+def whatif():
+    """
+    Smallest feasible profile changes that reach a target placement probability.
+
+    Body: a student profile, or {"student": {...}, "target": 50, "max_changes": 2, "top_k": 5}
+    """
+    start = time.perf_counter()
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({'error': 'Expected a JSON object'}), 400
+    student = data.get('student', data)
+    try:
+        target = float(data.get('target', counterfactuals.DEFAULT_TARGET))
+        max_changes = int(data.get('max_changes', 2))
+        top_k = int(data.get('top_k', 5))
+    except (TypeError, ValueError):
+        return jsonify({'error': 'target, max_changes and top_k must be numbers'}), 400
+    if not 0 <= target < 100 or not 1 <= max_changes <= counterfactuals.MAX_CHANGES or not 1 <= top_k <= 50:
+        return jsonify({'error': f'Expected 0 <= target < 100, 1 <= max_changes <= {counterfactuals.MAX_CHANGES}, 1 <= top_k <= 50'}), 400
+    parsed = time.perf_counter()
+    STAGE_SECONDS.labels('whatif', 'parse').observe(parsed - start)
     
-    # Projects tips
-    if projects < 2:
-        tips.append("🔧 Build at least 2-3 quality projects. Recruiters love seeing practical work!")
+    version = registry.current
+    features, _, errors, _ = build_feature_block([student], version.encoders)
+    encoded = time.perf_counter()
+    STAGE_SECONDS.labels('whatif', 'encode').observe(encoded - parsed)
+    if errors:
+        return jsonify({'error': errors[0]}), 400
     
-    # LeetCode tips
-    if leetcode < 50 and branch in ['CSE', 'ISE', 'AIML']:
-        tips.append("🏋️ Solve at least 100+ LeetCode problems before placement season.")
+    key = (version.id, tuple(features[0].tolist()), target, max_changes, top_k)
+    result = whatif_cache.get(key)
+    looked_up = time.perf_counter()
+    STAGE_SECONDS.labels('whatif', 'cache').observe(looked_up - encoded)
+    if result is None:
+        result = counterfactuals.search(version, features[0], target, max_changes, top_k)
+        whatif_cache.put(key, result)
+        STAGE_SECONDS.labels('whatif', 'inference').observe(time.perf_counter() - looked_up)
+    ROWS_SCORED.labels('whatif').inc()
     
-    # Backlogs penalty
-    if backlogs > 0:
-        tips.append("⚠️ Clear your backlogs ASAP! Many companies don't allow candidates with active backlogs.")
+    response = jsonify({**result, 'model_version': version.id})
+    response.headers['X-Model-Version'] = version.id
+    return response
+
+@app.route('/similar', methods=['POST'])
+def similar():
+    """
+    Past students closest to a profile, with their placement outcomes.
+
+    Body: a student profile, {"student": {...}, "k": 5}, or {"students": [...], "k": 5}
+    (or a bare JSON array) for a batch
+    """
+    start = time.perf_counter()
+    data = request.get_json(silent=True)
+    if not isinstance(data, (dict, list)):
+        return jsonify({'error': 'Expected a JSON object or array'}), 400
+    batch = isinstance(data, list) or 'students' in data
+    options = data if isinstance(data, dict) else {}
+    records = data if isinstance(data, list) else data['students'] if batch else [data.get('student', data)]
+    try:
+        k = int(options.get('k', 5))
+    except (TypeError, ValueError):
+        return jsonify({'error': 'k must be a number'}), 400
+    if not 1 <= k <= SIMILAR_MAX_K:
+        return jsonify({'error': f'Expected 1 <= k <= {SIMILAR_MAX_K}'}), 400
+    if not isinstance(records, list):
+        return jsonify({'error': 'students must be a JSON array'}), 400
+    if len(records) > BATCH_MAX_RECORDS:
+        return jsonify({'error': f'Batch too large (max {BATCH_MAX_RECORDS} records)'}), 413
+    parsed = time.perf_counter()
+    STAGE_SECONDS.labels('similar', 'parse').observe(parsed - start)
     
-    # Internship tips
-    if not internship and branch in ['CSE', 'ISE', 'AIML']:
-        tips.append("💼 Try to get at least one internship - it significantly boosts your profile!")
+    try:
+        index = similar_index.current()
+    except Exception as e:
+        print(f"❌ Similar-students index unavailable: {e}")
+        return jsonify({'error': f'Similar-students index unavailable: {e}'}), 503
+    version = registry.current
+    features, valid, errors, context = build_feature_block(records, version.encoders)
+    encoded = time.perf_counter()
+    STAGE_SECONDS.labels('similar', 'encode').observe(encoded - parsed)
+    if not batch and errors:
+        return jsonify({'error': errors[0]}), 400
     
-    # Strong profile
-    if cgpa >= 7.5 and dsa_score >= 60 and projects >= 2 and backlogs == 0:
-        tips.append("🌟 Your profile looks strong! Focus on mock interviews and aptitude practice.")
+    neighbours = index.neighbours(features, context['branches'], k) if len(features) else []
+    STAGE_SECONDS.labels('similar', 'search').observe(time.perf_counter() - encoded)
+    ROWS_SCORED.labels('similar').inc(len(features))
     
-    return tips
+    if not batch:
+        return jsonify({'neighbours': neighbours[0], 'summary': outcome_summary(neighbours[0]),
+                        'similarity_index': index.describe()})
+    results, row = [], 0
+    for i, record in enumerate(records):
+        item = {'index': i}
+        if isinstance(record, dict) and record.get('id') is not None:
+            item['id'] = record['id']
+        if valid[i]:
+            item['neighbours'] = neighbours[row]
+            item['summary'] = outcome_summary(neighbours[row])
+            row += 1
+        else:
+            item['error'] = errors[i]
+        results.append(item)
+    return jsonify({'results': results, 'similarity_index': index.describe()})
+
+def outcome_summary(neighbours):
+    """Placement rate and median package among a profile's neighbours"""
+    packages = [n['package_lpa'] for n in neighbours if n['placed'] and n['package_lpa'] is not None]
+    return {
+        'placement_rate': round(100 * sum(n['placed'] for n in neighbours) / len(neighbours), 2) if neighbours else None,
+        'median_package_lpa': round(float(np.median(packages)), 2) if packages else None
+    }
+
+@app.route('/cohort/stats', methods=['GET'])
+def cohort_stats():
+    """
+    Placement rate, probability quantiles/histogram and at-risk count of a
+    scored cohort, overall and per branch, from the in-memory aggregates.
+
+    Query: cohort (default: last updated), branch and gender (comma-separated),
+    internship (0/1), threshold (at-risk cut-off, %), bins (histogram bins,
+    1-1000; edges are rounded to 0.1 points and returned as bin_edges, plus
+    bin_width when the bins are uniform, i.e. when the count divides 1000)
+    """
+    args = request.args
+    try:
+        threshold = float(args.get('threshold', AT_RISK_THRESHOLD))
+        bins = int(args.get('bins', 10))
+    except ValueError:
+        return jsonify({'error': 'threshold and bins must be numbers'}), 400
+    if not 0 <= threshold <= 100 or not 1 <= bins <= COHORT_FINE_BINS:
+        return jsonify({'error': f'Expected 0 <= threshold <= 100 and 1 <= bins <= {COHORT_FINE_BINS}'}), 400
+    
+    tables = registry.current.encoders
+    def categories(name, col):
+        if not args.get(name):
+            return None
+        values = np.array(args[name].split(','), dtype=object)
+        codes, known = tables[col].encode_column(values)
+        return set(np.where(known, tables[col].classes[codes], values).astype(str))
+    internship = args.get('internship')
+    try:
+        stats = cohorts.stats(
+            args.get('cohort'), categories('branch', 'Branch'), categories('gender', 'Gender'),
+            None if internship is None else internship.lower() in ('1', 'true', 'yes'),
+            threshold, bins
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    if stats is None:
+        return jsonify({'error': 'No such cohort; score one with /predict/batch?cohort=<name>',
+                        'cohorts': cohorts.names()}), 404
+    return jsonify(stats)
+
+@app.route('/drift', methods=['GET'])
+def drift_stats():
+    """
+    How the recently scored profiles (and their placed probabilities) compare
+    with the training data: PSI per feature, KS for numeric ones. 404 until
+    models/drift_reference.json exists (train_model.py or `python drift.py`)
+    """
+    stats = drift.report()
+    if stats is None:
+        return jsonify({'error': 'No drift reference in models/; train the model or run `python drift.py` '
+                                 f'to write {REFERENCE_FILE} for the current one'}), 404
+    return jsonify(stats)
 
 @app.route('/branches', methods=['GET'])
 def get_branches():
     """Return available branches"""
     return jsonify({
-        'branches': metadata.get('branches', ['CSE', 'ISE', 'ECE', 'EEE', 'ETE', 'AIML', 'Mechanical', 'Civil'])
+        'branches': registry.current.metadata.get('branches', ['CSE', 'ISE', 'ECE', 'EEE', 'ETE', 'AIML', 'Mechanical', 'Civil'])
     })
 
 @app.route('/health', methods=['GET'])
 def health():
     """Health check endpoint"""
+    version = registry.current
     return jsonify({
         'status': 'healthy',
-        'model_loaded': model is not None,
-        'accuracy': metadata.get('accuracy') if metadata else None
+        'model_loaded': version is not None,
+        'model_version': version.id if version else None,
+        'ready': ready.is_set(),
+        'startup': startup,
+        'inference_engine': version.engine if version else None,
+        'cache': prediction_cache.stats(),
+        'accuracy': version.metadata.get('accuracy') if version else None
     })
 
+@app.route('/ready', methods=['GET'])
+def readiness():
+    """Readiness probe for load balancers: 200 only after warmup"""
+    if not ready.is_set():
+        return jsonify({'ready': False}), 503
+    return jsonify({'ready': True})
+
+@metrics.collector
+def collect_service_state():
+    """Cache, model and readiness values that live outside the metrics registry"""
+    cache = prediction_cache.stats()
+    version = registry.current
+    drift_stats = drift.report() if DRIFT_MONITOR else None
+    return [
+        ('ml_cache_hits_total', 'counter', 'Prediction cache hits', [({}, cache['hits'])]),
+        ('ml_cache_misses_total', 'counter', 'Prediction cache misses', [({}, cache['misses'])]),
+        ('ml_cache_evictions_total', 'counter', 'Entries evicted by the LRU bound', [({}, cache['evictions'])]),
+        ('ml_cache_expirations_total', 'counter', 'Entries dropped after their TTL', [({}, cache['expirations'])]),
+        ('ml_cache_entries', 'gauge', 'Entries currently cached', [({}, cache['size'])]),
+        ('ml_model_info', 'gauge', 'Serving model version',
+         [({'version': version.id, 'engine': version.engine}, 1)] if version else []),
+        ('ml_model_reloads_total', 'counter', 'Model reload attempts',
+         [({'result': 'ok'}, registry.reloads), ({'result': 'failed'}, registry.failed_reloads)]),
+        ('ml_ready', 'gauge', '1 once the model is loaded and warmed up', [({}, int(ready.is_set()))]),
+        ('ml_drift_psi', 'gauge', 'Population stability index of recent inputs against the training data',
+         [({'feature': name}, result['psi']) for name, result in drift_stats['features'].items()] if drift_stats else [])
+    ]
+
+@app.route('/metrics', methods=['GET'])
+def metrics_endpoint():
+    """Prometheus scrape endpoint"""
+    return Response(metrics.render(), content_type=CONTENT_TYPE)
+
+def admin_allowed():
+    if ADMIN_TOKEN:
+        return request.headers.get('X-Admin-Token') == ADMIN_TOKEN
+    return request.remote_addr in ('127.0.0.1', '::1')
+
+@app.route('/admin/models', methods=['GET'])
+def admin_models():
+    """Serving and previous model versions plus reload history"""
+    if not admin_allowed():
+        return jsonify({'error': 'Forbidden'}), 403
+    index = similar_index.index
+    return jsonify({**registry.status(), 'tips': tip_rules.status(),
+                    'similarity_index': index.describe() if index else None})
+
+@app.route('/admin/reload', methods=['POST'])
+def admin_reload():
+    """Load, validate and swap in the artifacts currently in ml/models/"""
+    if not admin_allowed():
+        return jsonify({'error': 'Forbidden'}), 403
+    try:
+        version = registry.reload(force=True)
+    except Exception as e:
+        return jsonify({'error': f'Reload failed: {e}', **registry.status()}), 500
+    return jsonify({'model_version': version.id, **registry.status()})
+
+@app.route('/admin/cohort/reset', methods=['POST'])
+def admin_cohort_reset():
+    """Forget one cohort's aggregates (?cohort=<name>)"""
+    if not admin_allowed():
+        return jsonify({'error': 'Forbidden'}), 403
+    name = request.args.get('cohort')
+    if not cohorts.reset(name):
+        return jsonify({'error': f'No cohort named {name!r}', 'cohorts': cohorts.names()}), 404
+    return jsonify({'reset': name, 'cohorts': cohorts.names()})
+
+@app.route('/admin/drift/reset', methods=['POST'])
+def admin_drift_reset():
+    """Start the live drift histograms over (e.g. after a known change in traffic)"""
+    if not admin_allowed():
+        return jsonify({'error': 'Forbidden'}), 403
+    drift.reset()
+    return jsonify({'reset': True})
+
+@app.route('/admin/similar/records', methods=['POST'])
+def admin_similar_records():
+    """
+    Insert past students (a new season) into the similar-students index.
+
+    Body: a JSON array of students.csv-shaped records, or {"records": [...]};
+    branch, year, cgpa, backlogs, num_projects, num_certifications,
+    has_internship, placed, company and package_lpa are required
+    """
+    if not admin_allowed():
+        return jsonify({'error': 'Forbidden'}), 403
+    import pandas as pd
+    from data_loading import DataValidationError
+
+    data = request.get_json(silent=True)
+    records = data.get('records') if isinstance(data, dict) else data
+    if not isinstance(records, list) or not records or not all(isinstance(r, dict) for r in records):
+        return jsonify({'error': 'Expected a non-empty JSON array of records'}), 400
+    if len(records) > BATCH_MAX_RECORDS:
+        return jsonify({'error': f'Batch too large (max {BATCH_MAX_RECORDS} records)'}), 413
+    try:
+        inserted = similar_index.insert(pd.DataFrame.from_records(records), source='records')
+    except DataValidationError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify({'inserted': inserted, 'similarity_index': similar_index.index.describe()})
+
+@app.route('/admin/rollback', methods=['POST'])
+def admin_rollback():
+    """Instantly switch back to the previously served version"""
+    if not admin_allowed():
+        return jsonify({'error': 'Forbidden'}), 403
+    try:
+        version = registry.rollback()
+    except LookupError as e:
+        return jsonify({'error': str(e)}), 409
+    return jsonify({'model_version': version.id, **registry.status()})
+
+def timed(phase, fn, *args):
+    """Call fn, recording its duration in the startup breakdown"""
+    start = time.perf_counter()
+    try:
+        return fn(*args)
+    finally:
+        startup[phase] = round((time.perf_counter() - start) * 1000, 1)
+
+def warm_request():
+    """Send one synthetic /predict through the whole app (routing, JSON, scoring, attribution)"""
+    with app.test_client() as client:
+        response = client.post('/predict', json={}, environ_base={WARMUP_ENVIRON: True})
+    if response.status_code != 200:
+        print(f"⚠️  Warmup request failed with {response.status_code}: {response.get_data(as_text=True)}")
+
+def load_similar_index():
+    try:
+        features, _, _, context = build_feature_block([{}], registry.current.encoders)
+        similar_index.current().neighbours(features, context['branches'])
+    except Exception as e:
+        # Only /similar depends on it; it answers 503 until the index loads
+        print(f"⚠️  Similar-students index not loaded: {e}")
+
+def join_background_loads():
+    """Wait for loads started after ready (gunicorn preload does, so workers share them)"""
+    for thread in background_loads:
+        thread.join()
+
+def warmup():
+    """
+    Load the model, tip rules and drift reference, send a synthetic request
+    through the app, then open the readiness gate. With FAST_STARTUP the loads run in
+    parallel and the similar-students index loads afterwards in the background.
+    """
+    start = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=3 if FAST_STARTUP else 1, thread_name_prefix='startup') as pool:
+            tips_load = pool.submit(timed, 'load_tips_ms', tip_rules.reload)
+            drift_load = pool.submit(timed, 'load_drift_ms', drift.reload)
+            model_load = pool.submit(timed, 'load_model_ms', registry.reload)
+            # A broken rules file at startup is a deployment error, not something to wait out
+            tips_load.result()
+            try:
+                if drift_load.result() is None and DRIFT_MONITOR:
+                    # Models trained before drift monitoring (or copied without it) have none
+                    print(f"⚠️  No {REFERENCE_FILE} in {MODEL_DIR}: /drift answers 404 until "
+                          f"training writes one or `python drift.py` is run")
+            except (OSError, ValueError, KeyError) as e:
+                # Only /drift depends on it
+                print(f"⚠️  Drift reference not loaded: {e}")
+            try:
+                version = model_load.result()
+            except Exception:
+                # The watcher keeps polling ml/models/ and the service turns ready once a load succeeds
+                print("❌ Model not loaded, staying unready")
+                return False
+        startup['load_ms'] = round((time.perf_counter() - start) * 1000, 1)
+        if not FAST_STARTUP:
+            timed('similar_index_ms', load_similar_index)
+        timed('warmup_request_ms', warm_request)
+        ready.set()
+    finally:
+        started.set()
+    startup['ready_ms'] = round((time.perf_counter() - _import_marks[0]) * 1000, 1)
+    print(f"✅ Model {version.id} loaded successfully! ({version.source}, {version.engine} engine)")
+    print(f"   Model Accuracy: {version.metadata.get('accuracy', 'N/A')}%")
+    print(f"   Branches: {version.metadata.get('branches', [])}")
+    imports = startup['import_flask_ms'] + startup['import_numpy_ms'] + startup['import_modules_ms']
+    print(f"⏱️  Startup: imports {imports:.1f} ms (flask {startup['import_flask_ms']}, numpy {startup['import_numpy_ms']}, "
+          f"modules {startup['import_modules_ms']}), model {startup['load_model_ms']} ms, tips {startup['load_tips_ms']} ms, "
+          f"drift reference {startup['load_drift_ms']} ms "
+          f"({'parallel' if FAST_STARTUP else 'sequential'}, {startup['load_ms']} ms), "
+          f"warmup request {startup['warmup_request_ms']} ms")
+    print(f"🔥 Ready {startup['ready_ms']:.1f} ms after import started")
+    if FAST_STARTUP:
+        thread = threading.Thread(target=timed, args=('similar_index_ms', load_similar_index),
+                                  daemon=True, name='similar-index')
+        thread.start()
+        background_loads.append(thread)
+    return True
+
+warmup()
+
 if __name__ == '__main__':
+    # Development server only; use serve.py in production
     app.run(port=5001, debug=True)
@@ -0,0 +1,292 @@
+"""
+BMSIT Placement Prediction API - Async Micro-batching Mode
+ASGI app that serves /predict through a MicroBatcher so concurrent requests
+share one vectorized forest evaluation. /health, /ready and /metrics are
+answered here too; every other path (/predict/batch, /whatif, /similar,
+/cohort/stats, /drift, /admin/...) is forwarded to the Flask app in api.py,
+which runs in a worker thread behind a small WSGI adapter.
+
+Run with: python serve.py --mode async
+"""
+
+import asyncio
+import io
+import json
+import os
+import sys
+import time
+
+import api
+from features import build_feature_block
+from metrics import CONTENT_TYPE
+from microbatch import MicroBatcher, QueueFullError
+
+BATCH_WINDOW_MS = float(os.environ.get('ML_BATCH_WINDOW_MS', 2.0))
+BATCH_MAX_ROWS = int(os.environ.get('ML_BATCH_MAX_ROWS', 64))
+BATCH_MAX_QUEUE = int(os.environ.get('ML_BATCH_MAX_QUEUE', 1024))
+MAX_BODY_BYTES = 1024 * 1024
+# Forwarded requests include CSV uploads to /predict/batch
+FORWARD_MAX_BODY_BYTES = int(os.environ.get('ML_ASYNC_FORWARD_MAX_MB', 32)) * 1024 * 1024
+
+batcher = MicroBatcher(
+    api.score_block,
+    window_ms=BATCH_WINDOW_MS,
+    max_batch=BATCH_MAX_ROWS,
+    max_queue=BATCH_MAX_QUEUE
+)
+
+@api.metrics.collector
+def collect_microbatch():
+    stats = batcher.stats()
+    return [
+        ('ml_microbatch_batches_total', 'counter', 'Micro-batches scored', [({}, stats['batches'])]),
+        ('ml_microbatch_rows_total', 'counter', 'Rows scored through micro-batches', [({}, stats['rows'])]),
+        ('ml_microbatch_rejected_total', 'counter', 'Requests rejected with a full queue', [({}, stats['rejected'])]),
+        ('ml_microbatch_queued', 'gauge', 'Requests waiting for a batch', [({}, stats['queued'])])
+    ]
+
+CORS_HEADERS = [
+    (b'access-control-allow-origin', b'*'),
+    (b'access-control-allow-headers', b'Content-Type'),
+    (b'access-control-allow-methods', b'GET, POST, OPTIONS'),
+]
+
+
+async def send_json(send, status, payload, extra_headers=(), stage_endpoint=None):
+    start = time.perf_counter()
+    body = json.dumps(payload).encode('utf-8')
+    if stage_endpoint:
+        api.STAGE_SECONDS.labels(stage_endpoint, 'serialize').observe(time.perf_counter() - start)
+    headers = [
+        (b'content-type', b'application/json'),
+        (b'content-length', str(len(body)).encode()),
+        *CORS_HEADERS,
+        *extra_headers
+    ]
+    await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+    await send({'type': 'http.response.body', 'body': body})
+
+
+async def read_body(receive, limit=MAX_BODY_BYTES):
+    chunks, size = [], 0
+    while True:
+        message = await receive()
+        chunk = message.get('body', b'')
+        size += len(chunk)
+        if size > limit:
+            raise ValueError('Request body too large')
+        chunks.append(chunk)
+        if not message.get('more_body'):
+            return b''.join(chunks)
+
+
+async def predict(receive, send):
+    try:
+        body = await read_body(receive)
+        start = time.perf_counter()
+        data = json.loads(body or b'null')
+    except ValueError as e:
+        return await send_json(send, 400, {'error': str(e)})
+    parsed = time.perf_counter()
+    api.STAGE_SECONDS.labels('predict', 'parse').observe(parsed - start)
+    api.log_verbose("📥 Received Prediction Request:", data)
+
+    # One version for the whole request, even if a reload swaps it meanwhile
+    version = api.registry.current
+    features, valid, errors, context = build_feature_block([data], version.encoders)
+    api.STAGE_SECONDS.labels('predict', 'encode').observe(time.perf_counter() - parsed)
+    if errors:
+        return await send_json(send, 400, {'error': errors[0]})
+
+    try:
+        result = dict(await batcher.submit(features[0], context['branches'][0], version))
+    except QueueFullError as e:
+        return await send_json(send, 503, {'error': str(e)}, [(b'retry-after', b'1')])
+    except Exception as e:
+        print(f"❌ Error predicting: {str(e)}")
+        return await send_json(send, 500, {'error': str(e)})
+
+    result['feature_importance'] = version.metadata.get('feature_importance', api.DEFAULT_FEATURE_IMPORTANCE)
+    # One row: a single traversal, cheaper than a trip to the executor
+    attributions = api.explain_block(version, features, 'predict')
+    if attributions is not None:
+        result['attribution'] = attributions[0]
+    result['model_version'] = version.id
+    if api.DRIFT_MONITOR:
+        api.drift.observe(features, context['branches'], [result['probability']['placed'] / 100])
+    await send_json(send, 200, result, [(b'x-model-version', version.id.encode())], stage_endpoint='predict')
+
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            await batcher.start()
+            api.registry.watch(api.MODEL_WATCH_INTERVAL)
+            api.tip_rules.watch(api.MODEL_WATCH_INTERVAL)
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            await batcher.stop()
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+def wsgi_environ(scope, body):
+    """WSGI environ (PEP 3333) for an ASGI HTTP scope and its full request body"""
+    server = scope.get('server') or ('localhost', 80)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', '').encode('utf-8').decode('latin-1'),
+        'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+        'SERVER_NAME': str(server[0]),
+        'SERVER_PORT': str(server[1]),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'REMOTE_ADDR': scope['client'][0] if scope.get('client') else '',
+        'CONTENT_LENGTH': str(len(body)),
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False
+    }
+    for name, value in scope['headers']:
+        key = name.decode('latin-1').upper().replace('-', '_')
+        value = value.decode('latin-1')
+        if key == 'CONTENT_LENGTH':
+            continue
+        if key != 'CONTENT_TYPE':
+            key = f'HTTP_{key}'
+        environ[key] = f"{environ[key]},{value}" if key in environ else value
+    return environ
+
+
+async def forward(scope, receive, send):
+    """
+    Serve a request with the Flask app. The app runs in a worker thread and
+    hands each body chunk back to the event loop as it is produced, so
+    streamed responses (NDJSON from /predict/batch) stay streamed.
+    The Flask app applies its own readiness gate and request metrics.
+    """
+    try:
+        body = await read_body(receive, FORWARD_MAX_BODY_BYTES)
+    except ValueError as e:
+        return await send_json(send, 413, {'error': str(e)})
+    environ = wsgi_environ(scope, body)
+    loop = asyncio.get_running_loop()
+    messages = asyncio.Queue()
+
+    def put(message):
+        loop.call_soon_threadsafe(messages.put_nowait, message)
+
+    def run():
+        def start_response(status, headers, exc_info=None):
+            put(('start', int(status.split(' ', 1)[0]),
+                 [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in headers]))
+            return lambda data: put(('body', data))
+        try:
+            result = api.app(environ, start_response)
+            try:
+                for chunk in result:
+                    if chunk:
+                        put(('body', chunk))
+            finally:
+                if hasattr(result, 'close'):
+                    result.close()
+            put(('end', None))
+        except Exception as e:
+            put(('error', e))
+
+    worker = loop.run_in_executor(None, run)
+    started = False
+    try:
+        while True:
+            kind, *payload = await messages.get()
+            if kind == 'start':
+                status, headers = payload
+                await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+                started = True
+            elif kind == 'body':
+                await send({'type': 'http.response.body', 'body': payload[0], 'more_body': True})
+            elif kind == 'end':
+                return await send({'type': 'http.response.body', 'body': b''})
+            else:
+                print(f"❌ Error in forwarded request {scope['method']} {scope['path']}: {payload[0]}")
+                if not started:
+                    return await send_json(send, 500, {'error': str(payload[0])})
+                return await send({'type': 'http.response.body', 'body': b''})
+    finally:
+        await worker
+
+
+ROUTES = {
+    ('GET', '/health'): 'health',
+    ('GET', '/ready'): 'readiness',
+    ('GET', '/metrics'): 'metrics_endpoint',
+    ('POST', '/predict'): 'predict'
+}
+
+
+async def app(scope, receive, send):
+    if scope['type'] == 'lifespan':
+        return await lifespan(receive, send)
+    if scope['type'] != 'http':
+        return
+
+    endpoint = ROUTES.get((scope['method'], scope['path']))
+    if endpoint is None and scope['method'] != 'OPTIONS':
+        # The Flask app routes (and counts) everything else itself
+        return await forward(scope, receive, send)
+
+    # Same request/error counters as the Flask app
+    start = time.perf_counter()
+    endpoint = endpoint or 'not_found'
+    status = []
+
+    async def send_recorded(message):
+        if message['type'] == 'http.response.start':
+            status.append(message['status'])
+        await send(message)
+
+    try:
+        await route(scope, receive, send_recorded)
+    finally:
+        code = status[0] if status else 500
+        api.REQUEST_SECONDS.labels(endpoint).observe(time.perf_counter() - start)
+        api.REQUESTS.labels(endpoint, code).inc()
+        if code >= 400:
+            api.ERRORS.labels(endpoint, api.ERROR_KINDS.get(code, 'internal' if code >= 500 else 'client')).inc()
+
+
+async def route(scope, receive, send):
+    method, path = scope['method'], scope['path']
+    if method == 'OPTIONS':
+        await send({'type': 'http.response.start', 'status': 204, 'headers': CORS_HEADERS})
+        return await send({'type': 'http.response.body', 'body': b''})
+    if path == '/health' and method == 'GET':
+        version = api.registry.current
+        return await send_json(send, 200, {
+            'status': 'healthy',
+            'ready': api.ready.is_set(),
+            'startup': api.startup,
+            'model_loaded': version is not None,
+            'model_version': version.id if version else None,
+            'inference_engine': version.engine if version else None,
+            'cache': api.prediction_cache.stats(),
+            'microbatch': batcher.stats(),
+            'accuracy': version.metadata.get('accuracy') if version else None
+        })
+    if path == '/metrics' and method == 'GET':
+        body = api.metrics.render().encode('utf-8')
+        await send({'type': 'http.response.start', 'status': 200, 'headers': [
+            (b'content-type', CONTENT_TYPE.encode()), (b'content-length', str(len(body)).encode())
+        ]})
+        return await send({'type': 'http.response.body', 'body': body})
+    if path == '/ready' and method == 'GET':
+        ready = api.ready.is_set()
+        return await send_json(send, 200 if ready else 503, {'ready': ready})
+    if not api.ready.is_set():
+        return await send_json(send, 503, {'error': 'Prediction service is warming up'})
+    return await predict(receive, send)
@@ -0,0 +1,52 @@
+"""
+Per-Prediction Feature Attributions
+Tree-path contributions (Saabas-style, the path-dependent relative of
+TreeSHAP) computed from a FlatForest's node arrays. Every split moves the
+positive-class probability from the parent's value to the child's; that
+change is credited to the split feature. The sums along each root-to-node
+path are precomputed once per model, so explaining a row costs the same
+traversal as predicting it plus one gather per tree.
+"""
+
+import numpy as np
+
+from flat_forest import ROW_BLOCK
+
+
+class TreeExplainer:
+    """
+    For every row: base value + sum(contributions) == forest positive-class
+    probability (up to float rounding). Contributions are in probability units.
+    """
+
+    def __init__(self, forest, n_features, positive_class=-1):
+        self.forest = forest
+        self.n_features = n_features
+        value = forest.value[:, positive_class]
+        self.base = float(value[forest.roots].mean())
+
+        # path[node, f]: change in the tree's probability credited to feature f
+        # on the way from the root to `node`. Filled one depth level at a time.
+        path = np.zeros((forest.n_nodes, n_features), dtype=np.float64)
+        frontier = forest.roots
+        own = np.arange(forest.n_nodes)
+        for _ in range(forest.max_depth):
+            split = frontier[forest.left[frontier] != own[frontier]]
+            if not len(split):
+                break
+            for children in (forest.left[split], forest.right[split]):
+                path[children] = path[split]
+                path[children, forest.feature[split]] += value[children] - value[split]
+            frontier = np.concatenate([forest.left[split], forest.right[split]])
+        # float32 halves the table; attributions are reported to 0.01 percentage points
+        self.path = np.ascontiguousarray(path, dtype=np.float32)
+
+    def explain(self, X):
+        """Contribution matrix (n_rows, n_features) for a block in the forest's input units"""
+        X = np.asarray(X)
+        contributions = np.zeros((len(X), self.n_features), dtype=np.float64)
+        for start in range(0, len(X), ROW_BLOCK):
+            leaves = self.forest.apply(X[start:start + ROW_BLOCK])
+            contributions[start:start + ROW_BLOCK] = self.path[leaves].sum(axis=0, dtype=np.float64)
+        contributions /= self.forest.n_trees
+        return contributions
@@ -0,0 +1,67 @@
+"""
+Batch Scoring Throughput Benchmark
+Compares per-row /predict calls against a single /predict/batch call
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+
+ML_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ML_DIR)
+
+import api  # noqa: E402
+
+
+def load_students(n):
+    """Load n student records from the BMSIT dataset (repeated if needed)"""
+    with open(os.path.join(ML_DIR, 'data', 'bmsit_placement_data.csv')) as f:
+        rows = list(csv.DictReader(f))
+    for row in rows:
+        row.pop('PlacedOrNot', None)
+        row['Internship'] = row['Internship'] == '1'
+    return [rows[i % len(rows)] for i in range(n)]
+
+
+def bench_per_row(client, students):
+    start = time.perf_counter()
+    for s in students:
+        resp = client.post('/predict', json=s)
+        assert resp.status_code == 200, resp.get_data(as_text=True)
+    return time.perf_counter() - start
+
+
+def bench_batch(client, students):
+    start = time.perf_counter()
+    resp = client.post('/predict/batch', json=students)
+    lines = resp.get_data(as_text=True).splitlines()
+    elapsed = time.perf_counter() - start
+    assert resp.status_code == 200 and len(lines) == len(students)
+    return elapsed, [json.loads(line) for line in lines]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 600, 2000])
+    args = parser.parse_args()
+
+    client = api.app.test_client()
+    print(f"{'rows':>6} {'per-row (s)':>12} {'rows/s':>10} {'batch (s)':>10} {'rows/s':>10} {'speedup':>8}")
+    for n in args.sizes:
+        students = load_students(n)
+        per_row = bench_per_row(client, students)
+        batch, results = bench_batch(client, students)
+
+        # Sanity check: both paths agree on the first few students
+        for s, r in zip(students[:20], results):
+            single = client.post('/predict', json=s).get_json()
+            assert single['probability'] == r['probability'], (single, r)
+
+        print(f"{n:>6} {per_row:>12.3f} {n / per_row:>10.0f} {batch:>10.3f} {n / batch:>10.0f} {per_row / batch:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
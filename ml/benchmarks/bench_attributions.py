@@ -0,0 +1,66 @@
+"""
+Feature Attribution Benchmark
+Time to explain 1, 100 and 10k rows with the precomputed tree-path
+contributions, next to plain prediction of the same rows, plus the one-off
+precomputation cost and the additivity error (base + contributions vs the
+predicted probability)
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+ML_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ML_DIR)
+
+from attributions import TreeExplainer  # noqa: E402
+from features import FEATURE_COLS, build_feature_block  # noqa: E402
+from generate_kaggle_data import generate_dataset  # noqa: E402
+from model_registry import load_model_version  # noqa: E402
+
+
+def best_of(fn, repeats):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, nargs='+', default=[1, 100, 10_000])
+    parser.add_argument('--repeats', type=int, default=20)
+    parser.add_argument('--engine', choices=['flat', 'sklearn'], default='flat')
+    args = parser.parse_args()
+
+    version = load_model_version(os.path.join(ML_DIR, 'models'), engine=args.engine)
+    if version.explainer is None:
+        sys.exit(f"{type(version.model).__name__} is not a tree forest; nothing to explain")
+    start = time.perf_counter()
+    TreeExplainer(version.explainer.forest, len(FEATURE_COLS))
+    print(f"Precompute: {(time.perf_counter() - start) * 1000:.1f} ms for "
+          f"{version.explainer.forest.n_nodes:,} nodes ({version.explainer.path.nbytes / 1e6:.1f} MB)")
+
+    records = generate_dataset(max(args.rows), seed=7).astype(object).to_dict('records')
+    features, _, _, _ = build_feature_block(records, version.encoders)
+
+    print(f"{'rows':>7} {'predict ms':>11} {'explain ms':>11} {'us/row':>8} {'max additivity err':>19}")
+    for n_rows in args.rows:
+        block = features[:n_rows]
+        repeats = args.repeats if n_rows <= 1000 else max(3, args.repeats // 5)
+        predict_s = best_of(lambda: version.predict_proba(block), repeats)
+        explain_s = best_of(lambda: version.explain(block), repeats)
+        error = np.abs(
+            version.explainer.base + version.explain(block).sum(axis=1) - version.predict_proba(block)[:, 1]
+        ).max()
+        print(f"{n_rows:>7,} {predict_s * 1000:>11.3f} {explain_s * 1000:>11.3f} "
+              f"{explain_s / n_rows * 1e6:>8.1f} {error:>19.1e}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""
+Dataset Loading Benchmark
+Load time and memory of the placement CSV read untyped with pandas, parsed
+through the typed schema (first run, which also writes the columnar cache),
+and memory-mapped from the cache. Each variant runs in its own process so
+peak RSS is not shared between them.
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+ML_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ML_DIR)
+
+VARIANTS = ['untyped', 'typed', 'cached']
+
+
+def run_variant(variant, csv_path, cache_dir):
+    """Child process: load once, touch every column, print a JSON result"""
+    import pandas as pd
+    from data_loading import PLACEMENT_SCHEMA, load_dataset
+
+    baseline_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    start = time.perf_counter()
+    if variant == 'untyped':
+        df = pd.read_csv(csv_path)
+    else:
+        df, _ = load_dataset(csv_path, PLACEMENT_SCHEMA, cache_dir=cache_dir)
+    load_s = time.perf_counter() - start
+    # A training run reads every value; mapped pages only count once touched
+    checksum = float(df.select_dtypes('number').sum().sum())
+    print(json.dumps({
+        'variant': variant,
+        'rows': len(df),
+        'load_s': load_s,
+        'frame_mb': df.memory_usage(deep=True).sum() / 1e6,
+        'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024 - baseline_mb,
+        'checksum': checksum
+    }))
+
+
+def measure(variant, csv_path, cache_dir):
+    output = subprocess.run(
+        [sys.executable, __file__, '--variant', variant, '--csv', csv_path, '--cache-dir', cache_dir],
+        check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, nargs='+', default=[1_000_000, 5_000_000])
+    parser.add_argument('--variant', choices=VARIANTS, help=argparse.SUPPRESS)
+    parser.add_argument('--csv', help=argparse.SUPPRESS)
+    parser.add_argument('--cache-dir', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.variant:
+        return run_variant(args.variant, args.csv, args.cache_dir)
+
+    from generate_kaggle_data import write_dataset
+
+    print(f"{'rows':>11} {'variant':>8} {'load s':>8} {'frame MB':>9} {'peak RSS MB':>12}")
+    with tempfile.TemporaryDirectory() as work_dir:
+        for n_rows in args.rows:
+            csv_path = os.path.join(work_dir, 'bmsit_placement_data.csv')
+            cache_dir = os.path.join(work_dir, f'cache_{n_rows}')
+            write_dataset(csv_path, n_rows)
+            # 'typed' runs first and builds the cache that 'cached' maps
+            for variant in VARIANTS:
+                result = measure(variant, csv_path, cache_dir)
+                print(f"{result['rows']:>11,} {variant:>8} {result['load_s']:>8.2f} "
+                      f"{result['frame_mb']:>9.1f} {result['peak_rss_mb']:>12.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+"""
+Drift Monitor Benchmark
+Cost of the drift monitor on the request path (observe per single-row
+request and per row of a batch chunk, the periodic flush, its share of a
+/predict) and a sanity check of its scores: PSI on a held-back sample of
+the training data against samples with a shifted CGPA, inflated LeetCode
+counts and unseen branches.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import warnings
+
+import numpy as np
+
+ML_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ML_DIR)
+os.environ.setdefault('ML_MODEL_WATCH_INTERVAL', '0')
+# Every /predict must score, not hit the result cache
+os.environ['ML_CACHE_SIZE'] = '0'
+
+from data_loading import load_dataset  # noqa: E402
+from drift import CATEGORICAL, DriftMonitor, build_reference, save_reference  # noqa: E402
+from features import FEATURE_COLS, build_feature_block  # noqa: E402
+from model_registry import load_model_version  # noqa: E402
+
+DATA_PATH = os.path.join(ML_DIR, 'data', 'bmsit_placement_data.csv')
+
+
+def best_of(fn, repeats):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def shifted(records, rng):
+    """The same students with a higher CGPA, more LeetCode problems and one in five from an unseen branch"""
+    out = []
+    for r in records:
+        r = dict(r, CGPA=min(10.0, r['CGPA'] + 1.0), LeetCode_Problems=r['LeetCode_Problems'] * 3)
+        if rng.random() < 0.2:
+            r['Branch'] = 'Robotics'
+        out.append(r)
+    return out
+
+
+def scores(monitor, version, records):
+    monitor.reset()
+    features, _, _, context = build_feature_block(records, version.encoders)
+    monitor.observe(features, context['branches'], version.predict_proba(features)[:, 1])
+    return monitor.report()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=20000)
+    parser.add_argument('--predict-requests', type=int, default=2000)
+    args = parser.parse_args()
+
+    version = load_model_version(os.path.join(ML_DIR, 'models'))
+    df, _ = load_dataset(DATA_PATH)
+    records = df[FEATURE_COLS].astype(object).to_dict('records')
+    rng = np.random.default_rng(0)
+    order = rng.permutation(len(records))
+    reference_rows, live_rows = order[:len(order) // 2], order[len(order) // 2:]
+    features, _, _, context = build_feature_block(records, version.encoders)
+    reference = build_reference(
+        features[reference_rows], version.predict_proba(features[reference_rows])[:, 1],
+        {col: version.encoders[col].classes for col in CATEGORICAL}
+    )
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        save_reference(work_dir, reference)
+        monitor = DriftMonitor(work_dir)
+        monitor.reload()
+
+        rows = [(features[i:i + 1], context['branches'][i:i + 1], [0.5]) for i in rng.integers(0, len(features), args.requests)]
+        def observe_rows():
+            for block, branches, probabilities in rows:
+                monitor.observe(block, branches, probabilities)
+        single_s = best_of(observe_rows, 3) / len(rows)
+        chunk = (features[:1024], context['branches'][:1024], np.full(1024, 0.5))
+        chunk_s = best_of(lambda: monitor.observe(*chunk), 20) / 1024
+        monitor._pending = rows[:monitor.flush_rows]
+        flush_s = best_of(monitor._flush, 1)
+        report_s = best_of(monitor.report, 20)
+        counters = monitor.current.nbytes + monitor.previous.nbytes
+
+        print(f"observe, one-row request (flush amortized): {single_s * 1e9:,.0f} ns")
+        print(f"observe, per row of a 1024-row chunk:       {chunk_s * 1e9:,.0f} ns")
+        print(f"flush of {monitor.flush_rows} one-row blocks:               {flush_s * 1000:.2f} ms")
+        print(f"report (/drift body):                       {report_s * 1000:.2f} ms")
+        print(f"counters:                                   {monitor.n_bins} bins, {counters} bytes")
+
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            import api
+        api.join_background_loads()
+        api.drift = monitor
+        client = api.app.test_client()
+        bodies = [records[i] for i in rng.integers(0, len(records), args.predict_requests)]
+        def predict_all():
+            for body in bodies:
+                client.post('/predict', json=body)
+        # The monitor's cost is far below the run-to-run noise of a whole request, so
+        # it is reported as a share of the request rather than as an on/off difference
+        predict_s = best_of(predict_all, 3) / len(bodies)
+        print(f"/predict latency:                           {predict_s * 1e6:,.0f} us "
+              f"(observe = {100 * single_s / predict_s:.2f}% of it)")
+
+        live = [records[i] for i in live_rows]
+        print(f"\n{'sample':>22} {'rows':>6} {'CGPA':>7} {'LeetCode':>8} {'Branch':>7} {'placed p':>8}  drifted")
+        for name, sample in [('held-back training', live), ('shifted', shifted(live, rng))]:
+            report = scores(monitor, version, sample)
+            f = report['features']
+            print(f"{name:>22} {report['rows']:>6} {f['CGPA']['psi']:>7.3f} {f['LeetCode_Problems']['psi']:>8.3f} "
+                  f"{f['Branch']['psi']:>7.3f} {f['placed_probability']['psi']:>8.3f}  {','.join(report['drifted']) or '-'}")
+
+
+if __name__ == '__main__':
+    main()
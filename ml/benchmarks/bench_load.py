@@ -0,0 +1,124 @@
+"""
+Prediction API Load Test
+Starts serve.py with 1, 2 and 4 workers and reports requests/sec and latency percentiles,
+optionally for both the sync (Flask) and async (micro-batching) serving modes
+"""
+
+import argparse
+import csv
+import http.client
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import numpy as np
+
+ML_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load_payloads():
+    with open(os.path.join(ML_DIR, 'data', 'bmsit_placement_data.csv')) as f:
+        rows = list(csv.DictReader(f))
+    payloads = []
+    for row in rows:
+        row.pop('PlacedOrNot', None)
+        row['Internship'] = row['Internship'] == '1'
+        payloads.append(json.dumps(row))
+    return payloads
+
+
+def wait_until_ready(port, timeout=60):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=1)
+            conn.request('GET', '/ready')
+            if conn.getresponse().status == 200:
+                return True
+        except OSError:
+            pass
+        time.sleep(0.2)
+    return False
+
+
+def run_client(port, payloads, offset, deadline, latencies, errors):
+    """One keep-alive connection sending /predict requests until the deadline"""
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=10)
+    headers = {'Content-Type': 'application/json'}
+    i = offset
+    while time.perf_counter() < deadline:
+        body = payloads[i % len(payloads)]
+        i += 1
+        start = time.perf_counter()
+        try:
+            conn.request('POST', '/predict', body=body, headers=headers)
+            resp = conn.getresponse()
+            resp.read()
+            if resp.status != 200:
+                errors.append(resp.status)
+                continue
+        except OSError as e:
+            errors.append(str(e))
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=10)
+            continue
+        latencies.append((time.perf_counter() - start) * 1000)
+
+
+def load_test(port, payloads, concurrency, duration):
+    latencies, errors = [], []
+    deadline = time.perf_counter() + duration
+    threads = [
+        threading.Thread(target=run_client, args=(port, payloads, k * 97, deadline, latencies, errors))
+        for k in range(concurrency)
+    ]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    return np.array(latencies), errors, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--modes', nargs='+', choices=['sync', 'async'], default=['sync'])
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument('--port', type=int, default=5101)
+    parser.add_argument('--cache', action='store_true', help='leave the result cache on')
+    args = parser.parse_args()
+
+    payloads = load_payloads()
+    env = dict(os.environ)
+    if not args.cache:
+        env['ML_CACHE_SIZE'] = '0'
+
+    print(f"{'mode':>5} {'workers':>7} {'threads':>7} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for mode, workers in [(m, w) for m in args.modes for w in args.workers]:
+        server = subprocess.Popen(
+            [sys.executable, os.path.join(ML_DIR, 'serve.py'), '--mode', mode,
+             '--workers', str(workers), '--threads', str(args.threads), '--port', str(args.port)],
+            env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        try:
+            if not wait_until_ready(args.port):
+                print(f"❌ Server with {workers} worker(s) never became ready")
+                continue
+            load_test(args.port, payloads, args.concurrency, 1.0)  # warm connections
+            latencies, errors, elapsed = load_test(args.port, payloads, args.concurrency, args.duration)
+            p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) if len(latencies) else (0, 0, 0)
+            print(f"{mode:>5} {workers:>7} {args.threads:>7} {len(latencies) / elapsed:>9.0f} "
+                  f"{p50:>8.2f} {p95:>8.2f} {p99:>8.2f} {len(errors):>7}")
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""
+Similar Students Benchmark
+Index load (embed + KD-tree build), single-query latency and batch
+throughput of the similar-students index against a linear scan over the same
+points, plus the cost of inserting one season, at growing history sizes.
+Histories larger than students.csv are its records repeated with jittered
+CGPAs (one "year" per copy).
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import warnings
+
+import numpy as np
+
+ML_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ML_DIR)
+
+from similarity import SimilarityIndex, build_from_artifacts  # noqa: E402
+
+
+def best_of(fn, repeats):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def history(base, n_rows, rng):
+    """n_rows records made of copies of the base records, CGPA jittered per copy"""
+    copies = -(-n_rows // len(base['cgpa']))
+    records = {field: np.concatenate([values] * copies)[:n_rows] for field, values in base.items()}
+    records['cgpa'] = np.clip(records['cgpa'] + rng.normal(0, 0.3, n_rows), 4.0, 10.0).astype(np.float32)
+    records['year'] = (2023 - np.arange(n_rows) // len(base['cgpa'])).astype(np.int16)
+    return records
+
+
+def linear_scan(points, queries, k):
+    squared = ((points[None, :, :] - queries[:, None, :]) ** 2).sum(axis=2)
+    return np.argsort(squared, axis=1)[:, :k]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, nargs='+', default=[700, 100_000, 1_000_000])
+    parser.add_argument('--k', type=int, default=5)
+    parser.add_argument('--batch', type=int, default=1000)
+    args = parser.parse_args()
+
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        base_index = build_from_artifacts(os.path.join(ML_DIR, 'models'))
+    rng = np.random.default_rng(0)
+    season = {field: values.copy() for field, values in base_index.records.items()}
+
+    print(f"{'rows':>9} {'load ms':>8} {'scan ms':>8} {'query us':>9} "
+          f"{f'batch {args.batch} ms':>14} {'insert ms':>10} {'exact':>6}")
+    for n_rows in args.rows:
+        records = history(base_index.records, n_rows, rng)
+        index = SimilarityIndex(records, base_index.mean, base_index.scale, base_index.branches)
+        with tempfile.TemporaryDirectory() as work_dir:
+            path = os.path.join(work_dir, 'index.npz')
+            index.save(path)
+            load_s = best_of(lambda: SimilarityIndex.load(path), 3)
+
+        queries = index.points[rng.integers(0, n_rows, args.batch)] + rng.normal(0, 0.05, (args.batch, index.points.shape[1]))
+        one = queries[:1]
+        scan_s = best_of(lambda: linear_scan(index.points, one, args.k), 5)
+        query_s = best_of(lambda: index.query(one, args.k), 200)
+        batch_s = best_of(lambda: index.query(queries, args.k), 3)
+        # Distances tie often (discrete features), so compare the distances, not the ids
+        expected = [np.sort(np.sqrt(((index.points - q) ** 2).sum(axis=1)))[:args.k] for q in queries[:10]]
+        exact = np.allclose(index.query(queries[:10], args.k)[0], expected)
+        insert_s = best_of(lambda: index.insert(season), 1)
+        print(f"{n_rows:>9,} {load_s * 1000:>8.1f} {scan_s * 1000:>8.2f} {query_s * 1e6:>9.1f} "
+              f"{batch_s * 1000:>14.1f} {insert_s * 1000:>10.2f} {str(exact):>6}")
+
+
+if __name__ == '__main__':
+    main()
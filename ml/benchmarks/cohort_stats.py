@@ -0,0 +1,79 @@
+"""
+Cohort Stats Benchmark
+Dashboard query cost with and without the cohort aggregates: /cohort/stats
+(branch filter, served from memory) against rescoring the cohort through
+/predict/batch plus a pandas groupby, and the ingest overhead that
+?cohort=<name> adds to the batch call, for growing cohort sizes
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import warnings
+
+import numpy as np
+
+ML_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ML_DIR)
+
+# Every request must reach the model: no result cache, no watcher thread
+os.environ['ML_CACHE_SIZE'] = '0'
+os.environ['ML_MODEL_WATCH_INTERVAL'] = '0'
+
+
+def best_of(fn, repeats):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, nargs='+', default=[1_000, 10_000, 50_000])
+    args = parser.parse_args()
+    warnings.simplefilter('ignore')
+
+    import contextlib
+    import io
+    import pandas as pd
+    with contextlib.redirect_stdout(io.StringIO()):
+        import api
+    from generate_kaggle_data import generate_dataset
+
+    client = api.app.test_client()
+    print(f"{'rows':>7} {'batch ms':>9} {'+cohort ms':>11} {'rescore+groupby ms':>19} {'stats ms':>9} {'rates match':>12}")
+    for n_rows in args.rows:
+        records = generate_dataset(n_rows, seed=9).drop(columns=['PlacedOrNot']).astype(object).to_dict('records')
+        for i, record in enumerate(records):
+            record['id'] = i
+            record['Internship'] = bool(record['Internship'])
+        name = f'bench_{n_rows}'
+
+        batch_s = best_of(lambda: client.post('/predict/batch', json=records).data, 3)
+        cohort_s = best_of(lambda: client.post(f'/predict/batch?cohort={name}', json=records).data, 3)
+
+        def rescore():
+            lines = client.post('/predict/batch', json=records).data.decode().splitlines()
+            scored = pd.DataFrame({
+                'Branch': [r['Branch'] for r in records],
+                'probability': [json.loads(line)['probability']['placed'] for line in lines]
+            })
+            cse = scored[scored['Branch'] == 'CSE']
+            return cse['probability'].gt(50).mean() * 100, cse['probability'].quantile([0.1, 0.5, 0.9]), (cse['probability'] < 40).sum()
+        rescore_s = best_of(rescore, 3)
+        stats_s = best_of(lambda: client.get(f'/cohort/stats?cohort={name}&branch=CSE').json, 20)
+
+        expected_rate = rescore()[0]
+        stats = client.get(f'/cohort/stats?cohort={name}&branch=CSE').json['overall']
+        match = np.isclose(stats['placement_rate'], expected_rate, atol=0.01)
+        print(f"{n_rows:>7,} {batch_s * 1000:>9.1f} {(cohort_s - batch_s) * 1000:>11.1f} "
+              f"{rescore_s * 1000:>19.1f} {stats_s * 1000:>9.2f} {str(match):>12}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+"""
+Cold Start & Memory Benchmark
+Loads the model from the pickle artifacts and from the mmap bundle in several
+concurrent worker processes, reporting load time and per-worker RSS/PSS
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+ML_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODEL_DIR = os.path.join(ML_DIR, 'models')
+
+
+def memory_mb():
+    """RSS, PSS (shared pages split between sharers) and private memory from smaps_rollup"""
+    fields = {}
+    with open('/proc/self/smaps_rollup') as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 2 and parts[1].isdigit():
+                fields[parts[0].rstrip(':')] = int(parts[1]) / 1024
+    return {
+        'rss_mb': round(fields.get('Rss', 0), 1),
+        'pss_mb': round(fields.get('Pss', 0), 1),
+        'private_mb': round(fields.get('Private_Clean', 0) + fields.get('Private_Dirty', 0), 1)
+    }
+
+
+def child(path):
+    """Load one way, score a few rows so every page is touched, then report"""
+    sys.path.insert(0, ML_DIR)
+    baseline = memory_mb()
+    start = time.perf_counter()
+    import numpy as np
+    if path == 'pickle':
+        import pickle
+        with open(os.path.join(MODEL_DIR, 'placement_model.pkl'), 'rb') as f:
+            model = pickle.load(f)
+        with open(os.path.join(MODEL_DIR, 'scaler.pkl'), 'rb') as f:
+            scaler = pickle.load(f)
+        with open(os.path.join(MODEL_DIR, 'encoders.pkl'), 'rb') as f:
+            pickle.load(f)
+        loaded = time.perf_counter()
+        X = scaler.mean_ + scaler.scale_ * np.random.default_rng(0).normal(size=(256, len(scaler.mean_)))
+        model.n_jobs = 1
+        model.predict_proba(scaler.transform(X))
+    else:
+        from model_bundle import BUNDLE_DIR, load_bundle
+        bundle = load_bundle(os.path.join(MODEL_DIR, BUNDLE_DIR), verify=False)
+        loaded = time.perf_counter()
+        X = bundle.scaler_mean + bundle.scaler_scale * np.random.default_rng(0).normal(size=(256, len(bundle.scaler_mean)))
+        bundle.forest.predict_proba(X)
+    first_prediction = time.perf_counter()
+
+    print('loaded', flush=True)
+    sys.stdin.readline()  # wait until every sibling has loaded before measuring shared pages
+    memory = memory_mb()
+    print(json.dumps({
+        'load_s': round(loaded - start, 3),
+        'first_prediction_s': round(first_prediction - start, 3),
+        'model_rss_mb': round(memory['rss_mb'] - baseline['rss_mb'], 1),
+        **memory
+    }), flush=True)
+
+
+def run(path, workers):
+    procs = [
+        subprocess.Popen([sys.executable, '-W', 'ignore', __file__, '--child', path],
+                         stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+        for _ in range(workers)
+    ]
+    for p in procs:
+        assert p.stdout.readline().strip() == 'loaded'
+    results = []
+    for p in procs:
+        p.stdin.write('\n')
+        p.stdin.flush()
+        results.append(json.loads(p.stdout.readline()))
+        p.wait()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--child', choices=['pickle', 'bundle'], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        return child(args.child)
+
+    print(f"{'path':>7} {'load s':>7} {'first pred s':>12} {'RSS MB':>7} {'PSS MB':>7} {'private MB':>10}   ({args.workers} workers, mean per worker)")
+    for path in ['pickle', 'bundle']:
+        results = run(path, args.workers)
+        mean = {k: sum(r[k] for r in results) / len(results) for k in results[0]}
+        print(f"{path:>7} {mean['load_s']:>7.3f} {mean['first_prediction_s']:>12.3f} "
+              f"{mean['rss_mb']:>7.1f} {mean['pss_mb']:>7.1f} {mean['private_mb']:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,153 @@
+"""
+Compact Model Benchmark
+Compares the full flat-forest bundle in ml/models/ with a --compact export
+of the same model: bundle size on disk, process RSS and load time (each in
+its own process, through the API's load_model_version), prediction latency,
+and accuracy / probability drift on the train_model.py held-out split
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import pickle
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+ML_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ML_DIR)
+
+MODEL_DIR = os.path.join(ML_DIR, 'models')
+
+
+def rss_mb():
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1]) / 1024
+    return float('nan')
+
+
+def run_variant(model_dir, rows):
+    """Child process: load one bundle, time it and a few prediction sizes, print JSON"""
+    from features import build_feature_block
+    from generate_kaggle_data import generate_dataset
+    from model_registry import load_model_version
+
+    records = generate_dataset(max(rows), seed=11).astype(object).to_dict('records')
+    before = rss_mb()
+    start = time.perf_counter()
+    version = load_model_version(model_dir)
+    load_s = time.perf_counter() - start
+    features, _, _, _ = build_feature_block(records, version.encoders)
+    version.predict_proba(features[:1])
+    loaded = rss_mb()
+
+    latency = {}
+    for n_rows in rows:
+        block = features[:n_rows]
+        times = []
+        for _ in range(20 if n_rows <= 1000 else 3):
+            start = time.perf_counter()
+            version.predict_proba(block)
+            times.append(time.perf_counter() - start)
+        latency[n_rows] = min(times)
+    print(json.dumps({
+        'layout': version.forest.LAYOUT,
+        'load_s': load_s,
+        'rss_mb': loaded - before,
+        'forest_mb': sum(getattr(version.forest, name).nbytes for name in version.forest.ARRAYS) / 1e6,
+        'latency': latency
+    }))
+
+
+def measure(model_dir, rows):
+    output = subprocess.run(
+        [sys.executable, __file__, '--variant', model_dir, '--rows', *map(str, rows)],
+        check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def bundle_size_mb(model_dir):
+    path = os.path.join(model_dir, 'bundle')
+    return sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path)) / 1e6
+
+
+def held_out_drift(full_dir, compact_dir):
+    """Accuracy of both variants and their probability drift on train_model.py's test split"""
+    from sklearn.model_selection import train_test_split
+
+    import pandas as pd
+    from export_model import DATA_PATH, load_encoded_dataset
+    from model_registry import load_model_version
+
+    with open(os.path.join(full_dir, 'scaler.pkl'), 'rb') as f:
+        scaler = pickle.load(f)
+    with open(os.path.join(full_dir, 'encoders.pkl'), 'rb') as f:
+        encoders = pickle.load(f)
+    X = load_encoded_dataset(scaler, encoders)
+    y = pd.read_csv(DATA_PATH)['PlacedOrNot'].to_numpy()
+    _, X_test, _, y_test = train_test_split(X, y, test_size=0.2, random_state=42, stratify=y)
+
+    full = load_model_version(full_dir).predict_proba(X_test)
+    compact = load_model_version(compact_dir).predict_proba(X_test)
+    diff = np.abs(full[:, 1] - compact[:, 1])
+    return {
+        'rows': len(X_test),
+        'accuracy_full': float((full.argmax(axis=1) == y_test).mean()),
+        'accuracy_compact': float((compact.argmax(axis=1) == y_test).mean()),
+        'max_drift': float(diff.max()),
+        'mean_drift': float(diff.mean()),
+        'flipped': int((full.argmax(axis=1) != compact.argmax(axis=1)).sum())
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, nargs='+', default=[1, 100, 10_000])
+    parser.add_argument('--variant', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.variant:
+        return run_variant(args.variant, args.rows)
+
+    from export_model import export_bundle, load_encoded_dataset, parity_inputs
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        compact_dir = os.path.join(work_dir, 'models')
+        shutil.copytree(MODEL_DIR, compact_dir, ignore=shutil.ignore_patterns('bundle'))
+        with open(os.path.join(compact_dir, 'placement_model.pkl'), 'rb') as f:
+            model = pickle.load(f)
+        with open(os.path.join(compact_dir, 'scaler.pkl'), 'rb') as f:
+            scaler = pickle.load(f)
+        with open(os.path.join(compact_dir, 'encoders.pkl'), 'rb') as f:
+            encoders = pickle.load(f)
+        with contextlib.redirect_stdout(io.StringIO()):
+            X_check = parity_inputs(load_encoded_dataset(scaler, encoders), scaler)
+            export_bundle(model, scaler, encoders, compact_dir, X_check, compact=True)
+
+        results = {'full': measure(MODEL_DIR, args.rows), 'compact': measure(compact_dir, args.rows)}
+        results['full']['disk_mb'] = bundle_size_mb(MODEL_DIR)
+        results['compact']['disk_mb'] = bundle_size_mb(compact_dir)
+        drift = held_out_drift(MODEL_DIR, compact_dir)
+
+    print(f"{'variant':>8} {'disk MB':>8} {'forest MB':>10} {'RSS MB':>7} {'load ms':>8} "
+          + ' '.join(f"{f'{n:,} rows ms':>13}" for n in args.rows))
+    for name, result in results.items():
+        print(f"{name:>8} {result['disk_mb']:>8.2f} {result['forest_mb']:>10.2f} {result['rss_mb']:>7.1f} "
+              f"{result['load_s'] * 1000:>8.1f} "
+              + ' '.join(f"{result['latency'][str(n)] * 1000:>13.3f}" for n in args.rows))
+    print(f"\nHeld-out split ({drift['rows']} rows): accuracy {drift['accuracy_full'] * 100:.2f}% full, "
+          f"{drift['accuracy_compact'] * 100:.2f}% compact; probability drift max {drift['max_drift']:.2e}, "
+          f"mean {drift['mean_drift']:.2e}; {drift['flipped']} predictions flipped")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+"""
+Dataset Generator Throughput Benchmark
+Rows/sec of the vectorized generate_kaggle_data generator, in memory and
+written chunk by chunk to CSV (or Parquet), at several dataset sizes
+"""
+
+import argparse
+import os
+import resource
+import sys
+import tempfile
+import time
+
+ML_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ML_DIR)
+
+from generate_kaggle_data import generate_chunks, write_dataset  # noqa: E402
+
+
+def bench_generate(n_rows):
+    """Generate every chunk without keeping it; returns seconds"""
+    start = time.perf_counter()
+    for _ in generate_chunks(n_rows):
+        pass
+    return time.perf_counter() - start
+
+
+def bench_write(n_rows, file_format, output_dir):
+    path = os.path.join(output_dir, f'bench_{n_rows}.{file_format}')
+    start = time.perf_counter()
+    write_dataset(path, n_rows, file_format=file_format)
+    elapsed = time.perf_counter() - start
+    size_mb = os.path.getsize(path) / 1e6
+    os.remove(path)
+    return elapsed, size_mb
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, nargs='+', default=[10_000, 1_000_000, 10_000_000])
+    parser.add_argument('--format', choices=['csv', 'parquet'], default='csv')
+    parser.add_argument('--no-write', action='store_true', help='only measure in-memory generation')
+    args = parser.parse_args()
+
+    print(f"{'rows':>11} {'generate rows/s':>16} {f'+{args.format} rows/s':>16} {'file MB':>9} {'peak RSS MB':>12}")
+    with tempfile.TemporaryDirectory() as output_dir:
+        for n_rows in args.rows:
+            generate_s = bench_generate(n_rows)
+            line = f"{n_rows:>11,} {n_rows / generate_s:>16,.0f}"
+            if not args.no_write:
+                write_s, size_mb = bench_write(n_rows, args.format, output_dir)
+                line += f" {n_rows / write_s:>16,.0f} {size_mb:>9.1f}"
+            peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+            print(f"{line} {peak_mb:>12.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""
+Inference Latency Benchmark
+p50/p99 latency of scaler + sklearn predict_proba vs the folded flat forest engine
+"""
+
+import argparse
+import os
+import pickle
+import sys
+import time
+
+import numpy as np
+
+ML_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ML_DIR)
+
+from export_model import load_encoded_dataset  # noqa: E402
+from flat_forest import FlatForest, check_parity  # noqa: E402
+from model_bundle import BUNDLE_DIR, load_bundle  # noqa: E402
+
+
+def latencies(fn, X, batch_size, repeats):
+    """Time fn on `repeats` consecutive batches, returning milliseconds per call"""
+    times = np.empty(repeats)
+    for i in range(repeats):
+        start = (i * batch_size) % max(1, len(X) - batch_size)
+        block = X[start:start + batch_size]
+        t0 = time.perf_counter()
+        fn(block)
+        times[i] = (time.perf_counter() - t0) * 1000
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 100, 2000])
+    parser.add_argument('--repeats', type=int, default=200)
+    args = parser.parse_args()
+
+    model_dir = os.path.join(ML_DIR, 'models')
+    with open(os.path.join(model_dir, 'placement_model.pkl'), 'rb') as f:
+        model = pickle.load(f)
+    with open(os.path.join(model_dir, 'scaler.pkl'), 'rb') as f:
+        scaler = pickle.load(f)
+    with open(os.path.join(model_dir, 'encoders.pkl'), 'rb') as f:
+        encoders = pickle.load(f)
+
+    bundle_path = os.path.join(model_dir, BUNDLE_DIR)
+    forest = load_bundle(bundle_path).forest if os.path.exists(bundle_path) else FlatForest.from_sklearn(model)
+    if not forest.raw_inputs:
+        forest = forest.fold_scaler(scaler.mean_, scaler.scale_)
+
+    X = load_encoded_dataset(scaler, encoders)
+    check_parity(model, forest, X, scaler=scaler)
+    print(f"✅ Parity verified on {len(X)} rows\n")
+
+    engines = {
+        'sklearn': lambda block: model.predict_proba(scaler.transform(block)),
+        'flat': forest.predict_proba
+    }
+    print(f"{'engine':>8} {'batch':>6} {'p50 ms':>9} {'p99 ms':>9} {'rows/s':>10}")
+    for batch_size in args.batch_sizes:
+        repeats = args.repeats if batch_size < 1000 else max(10, args.repeats // 10)
+        for name, fn in engines.items():
+            fn(X[:batch_size])  # warmup
+            t = latencies(fn, X, batch_size, repeats)
+            p50, p99 = np.percentile(t, [50, 99])
+            print(f"{name:>8} {batch_size:>6} {p50:>9.3f} {p99:>9.3f} {batch_size / (t.mean() / 1000):>10.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,139 @@
+"""
+Multi-Head Benchmark
+Placement-only serving (the models in ml/models/) against the same model
+exported with the package and company-tier heads (trained here into a
+temporary copy): bundle load time and RSS in separate processes, and
+latency for 1, 100 and 10k records of
+    single       encode + placement forest
+    shared       encode once, one input block for placement + both heads
+    independent  a full encode + predict pipeline per output
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import pickle
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import warnings
+
+ML_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ML_DIR)
+
+MODEL_DIR = os.path.join(ML_DIR, 'models')
+
+
+def rss_mb():
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1]) / 1024
+    return float('nan')
+
+
+def best_of(fn, repeats):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def run_variant(model_dir, rows):
+    """Child process: load one model directory, time the scoring paths, print JSON"""
+    from features import build_feature_block
+    from generate_kaggle_data import generate_dataset
+    from model_registry import load_model_version
+
+    records = generate_dataset(max(rows), seed=5).astype(object).to_dict('records')
+    before = rss_mb()
+    start = time.perf_counter()
+    version = load_model_version(model_dir)
+    load_s = time.perf_counter() - start
+
+    def single(chunk):
+        features = build_feature_block(chunk, version.encoders)[0]
+        return version.infer(version.transform(features))
+
+    def shared(chunk):
+        inputs = version.transform(build_feature_block(chunk, version.encoders)[0])
+        return version.infer(inputs), version.infer_heads(inputs)
+
+    def independent(chunk):
+        outputs = [single(chunk)]
+        for name in version.heads:
+            inputs = version.transform(build_feature_block(chunk, version.encoders)[0])
+            outputs.append(version.infer_heads(inputs)[name])
+        return outputs
+
+    paths = {'single': single}
+    if version.heads:
+        paths.update(shared=shared, independent=independent)
+    latency = {name: {} for name in paths}
+    for n_rows in rows:
+        chunk = records[:n_rows]
+        for name, fn in paths.items():
+            fn(chunk)
+            latency[name][n_rows] = best_of(lambda: fn(chunk), 20 if n_rows <= 1000 else 3)
+    # After scoring, so every mapped node page that inference touches is counted
+    print(json.dumps({'heads': sorted(version.heads), 'load_s': load_s, 'rss_mb': rss_mb() - before, 'latency': latency}))
+
+
+def measure(model_dir, rows):
+    output = subprocess.run(
+        [sys.executable, __file__, '--variant', model_dir, '--rows', *map(str, rows)],
+        check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, nargs='+', default=[1, 100, 10_000])
+    parser.add_argument('--variant', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    warnings.simplefilter('ignore')
+
+    if args.variant:
+        return run_variant(args.variant, args.rows)
+
+    from export_model import export_bundle, load_encoded_dataset, parity_inputs
+    from heads import save_heads, train_heads
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        heads_dir = os.path.join(work_dir, 'models')
+        shutil.copytree(MODEL_DIR, heads_dir, ignore=shutil.ignore_patterns('bundle'))
+        with open(os.path.join(heads_dir, 'placement_model.pkl'), 'rb') as f:
+            model = pickle.load(f)
+        with open(os.path.join(heads_dir, 'scaler.pkl'), 'rb') as f:
+            scaler = pickle.load(f)
+        with open(os.path.join(heads_dir, 'encoders.pkl'), 'rb') as f:
+            encoders = pickle.load(f)
+        # Serving cost of both heads, whether or not they beat their baselines
+        heads, report = train_heads(scaler, encoders, require_baseline=False)
+        save_heads(heads_dir, heads)
+        with contextlib.redirect_stdout(io.StringIO()):
+            X_check = parity_inputs(load_encoded_dataset(scaler, encoders), scaler)
+            export_bundle(model, scaler, encoders, heads_dir, X_check, heads=heads)
+
+        results = {'placement only': measure(MODEL_DIR, args.rows), 'with heads': measure(heads_dir, args.rows)}
+
+    print(f"Heads (held out): package MAE {report['package']['mae_lpa']} LPA, R² {report['package']['r2']}; "
+          f"tier accuracy {report['tier']['accuracy'] * 100:.1f}%\n")
+    print(f"{'bundle':>15} {'load ms':>8} {'RSS MB':>7}")
+    for name, result in results.items():
+        print(f"{name:>15} {result['load_s'] * 1000:>8.1f} {result['rss_mb']:>7.1f}")
+    print(f"\n{'path':>15} " + ' '.join(f"{f'{n:,} rows ms':>13}" for n in args.rows))
+    paths = {'single': results['placement only']['latency']['single'], **results['with heads']['latency']}
+    for name, latency in paths.items():
+        print(f"{name:>15} " + ' '.join(f"{latency[str(n)] * 1000:>13.3f}" for n in args.rows))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""
+Startup Benchmark
+Time from launching a fresh interpreter to the first successful /predict,
+in fast (ML_FAST_STARTUP=1) and sequential startup mode, with the API's own
+import/load breakdown and which heavy libraries were imported by then.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+ML_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ['sklearn', 'pandas', 'scipy']
+
+
+def child():
+    """Import the API and send one /predict; report timings and the heavy modules loaded"""
+    sys.path.insert(0, ML_DIR)
+    start = time.perf_counter()
+    import api
+    imported = time.perf_counter()
+    response = api.app.test_client().post('/predict', json={'Branch': 'CSE', 'CGPA': 8.2, 'Projects': 3})
+    done = time.perf_counter()
+    assert response.status_code == 200, response.get_data(as_text=True)
+    print(json.dumps({
+        'import_api_s': round(imported - start, 3),
+        'first_request_ms': round((done - imported) * 1000, 2),
+        'startup': api.startup,
+        'heavy': [m for m in HEAVY_MODULES if m in sys.modules]
+    }), file=sys.stderr, flush=True)
+
+
+def run(fast):
+    env = dict(os.environ, ML_FAST_STARTUP='1' if fast else '0', ML_MODEL_WATCH_INTERVAL='0')
+    start = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, '-W', 'ignore', __file__, '--child'],
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, env=env)
+    # The API logs to stdout; the result goes to stderr right after the first prediction
+    result = json.loads(proc.stderr.readline())
+    result['first_prediction_s'] = round(time.perf_counter() - start, 3)
+    proc.wait()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        return child()
+
+    print(f"{'mode':>10} {'first pred s':>12} {'import api s':>12} {'first req ms':>12} "
+          f"{'imports ms':>10} {'load ms':>8} {'warmup ms':>9}  heavy modules   (median of {args.repeats})")
+    for fast in (True, False):
+        results = sorted((run(fast) for _ in range(args.repeats)), key=lambda r: r['first_prediction_s'])
+        r = results[len(results) // 2]
+        s = r['startup']
+        imports = s['import_flask_ms'] + s['import_numpy_ms'] + s['import_modules_ms']
+        print(f"{'fast' if fast else 'sequential':>10} {r['first_prediction_s']:>12.3f} {r['import_api_s']:>12.3f} "
+              f"{r['first_request_ms']:>12.2f} {imports:>10.1f} {s['load_ms']:>8.1f} {s['warmup_request_ms']:>9.1f}  "
+              f"{','.join(r['heavy']) or '-'}")
+
+
+if __name__ == '__main__':
+    main()
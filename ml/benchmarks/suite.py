@@ -0,0 +1,348 @@
+"""
+Offline Evaluation & Benchmark Suite
+Runs the real code paths on datasets synthesized by generate_kaggle_data.py
+and emits one JSON document of metrics:
+
+    evaluate   held-out accuracy / F1 / ROC AUC of the serving model, plus the
+               same on a fresh synthetic dataset
+    train      RandomForest fit time (train_model.py settings) vs rows and n_jobs
+    load       artifact load time through model_registry (bundle and pickles)
+    inference  encode and predict_proba throughput, single-row latency
+    api        /predict latency and /predict/batch throughput via the Flask test client
+
+Every section runs in its own process and also reports its peak RSS. The
+results are compared against benchmarks/baseline.json; the run exits with
+status 1 when a metric regressed by more than the tolerance.
+
+Usage:
+    python benchmarks/suite.py                          # 1k/100k/1M rows, compare with the baseline
+    python benchmarks/suite.py --quick                  # 1k/10k rows
+    python benchmarks/suite.py --sections train --train-max-rows 1000000
+    python benchmarks/suite.py --save-baseline          # record this run as the new baseline
+"""
+
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+ML_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ML_DIR)
+
+MODEL_DIR = os.path.join(ML_DIR, 'models')
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+RESULTS_DIR = os.path.join(ML_DIR, '.cache', 'benchmarks')
+
+SECTIONS = ['evaluate', 'train', 'load', 'inference', 'api']
+SIZES = [1_000, 100_000, 1_000_000]
+QUICK_SIZES = [1_000, 10_000]
+# Fitting 100 trees on 1M rows takes minutes per n_jobs setting; opt in with --train-max-rows
+TRAIN_MAX_ROWS = 100_000
+N_JOBS = [1, -1]
+# Row counts above this use the vectorized encoder instead of per-record dicts
+RECORDS_MAX_ROWS = 100_000
+SEED = 2024
+
+# Same forest as train_model.py
+TRAIN_PARAMS = {'n_estimators': 100, 'max_depth': 10, 'min_samples_split': 5, 'random_state': 42}
+
+# Relative slowdown tolerated for timings/memory, absolute drop for quality metrics
+TOLERANCE = 0.25
+QUALITY_TOLERANCE = 0.005
+# Differences below these are timer/allocator noise, whatever the ratio
+NOISE_FLOOR = {'_s': 0.005, '_ms': 0.25, '_mb': 5.0}
+
+
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def synthetic(n_rows):
+    from generate_kaggle_data import generate_dataset
+    return generate_dataset(n_rows, seed=SEED)
+
+
+def encode_frame(df, encoders):
+    """Feature matrix for a generated DataFrame, encoded with the serving CategoryTables"""
+    from features import FEATURE_COLS
+    columns = []
+    for col in FEATURE_COLS:
+        if col in encoders:
+            columns.append(encoders[col].encode_column(df[col].astype(str).to_numpy())[0])
+        else:
+            columns.append(df[col].to_numpy())
+    return np.column_stack(columns).astype(np.float64)
+
+
+def as_records(df):
+    records = df.drop(columns=['PlacedOrNot']).astype(object).to_dict('records')
+    for record in records:
+        record['Internship'] = bool(record['Internship'])
+    return records
+
+
+def best_of(fn, repeats):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def section_evaluate(sizes, args):
+    import pandas as pd
+    import pickle
+    from sklearn.metrics import accuracy_score, f1_score, roc_auc_score
+    from sklearn.model_selection import train_test_split
+    from export_model import DATA_PATH, load_encoded_dataset
+    from model_registry import load_model_version
+
+    version = load_model_version(MODEL_DIR)
+    with open(os.path.join(MODEL_DIR, 'scaler.pkl'), 'rb') as f:
+        scaler = pickle.load(f)
+    with open(os.path.join(MODEL_DIR, 'encoders.pkl'), 'rb') as f:
+        encoders = pickle.load(f)
+    # The split train_model.py holds out
+    X = load_encoded_dataset(scaler, encoders)
+    y = pd.read_csv(DATA_PATH)['PlacedOrNot'].to_numpy()
+    _, X_test, _, y_test = train_test_split(X, y, test_size=0.2, random_state=42, stratify=y)
+    splits = {'holdout': (X_test, y_test)}
+    df = synthetic(max(sizes))
+    splits[f'synthetic_{len(df)}'] = (encode_frame(df, version.encoders), df['PlacedOrNot'].to_numpy())
+
+    results = {}
+    for name, (X_eval, y_eval) in splits.items():
+        probability = version.predict_proba(X_eval)[:, 1]
+        predicted = (probability > 0.5).astype(int)
+        results[f'{name}.accuracy'] = accuracy_score(y_eval, predicted)
+        results[f'{name}.f1'] = f1_score(y_eval, predicted)
+        results[f'{name}.roc_auc'] = roc_auc_score(y_eval, probability)
+    return results
+
+
+def section_train(sizes, args):
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.preprocessing import StandardScaler
+    from features import FEATURE_COLS
+
+    results = {}
+    for n_rows in [n for n in sizes if n <= args.train_max_rows]:
+        df = synthetic(n_rows)
+        X = df[FEATURE_COLS].copy()
+        for col in ('Branch', 'Gender'):
+            X[col] = X[col].cat.codes
+        X = StandardScaler().fit_transform(X)
+        y = df['PlacedOrNot'].to_numpy()
+        for n_jobs in N_JOBS:
+            model = RandomForestClassifier(**TRAIN_PARAMS, n_jobs=n_jobs)
+            start = time.perf_counter()
+            model.fit(X, y)
+            results[f'rows_{n_rows}.n_jobs_{n_jobs}.fit_s'] = time.perf_counter() - start
+    return results
+
+
+def section_load(sizes, args):
+    from model_registry import load_model_version
+
+    results = {}
+    for engine, verify in (('flat', True), ('flat', False), ('sklearn', True)):
+        name = engine if verify or engine == 'sklearn' else f'{engine}_noverify'
+        start = time.perf_counter()
+        load_model_version(MODEL_DIR, engine=engine, verify=verify)
+        results[f'{name}.first_load_s'] = time.perf_counter() - start
+        results[f'{name}.load_s'] = best_of(lambda: load_model_version(MODEL_DIR, engine=engine, verify=verify), 5)
+    return results
+
+
+def section_inference(sizes, args):
+    from features import build_feature_block
+    from model_registry import load_model_version
+
+    version = load_model_version(MODEL_DIR)
+    df = synthetic(max(sizes))
+    features = encode_frame(df, version.encoders)
+
+    results = {}
+    single = []
+    for i in range(500):
+        row = features[i % len(features)][None, :]
+        start = time.perf_counter()
+        version.predict_proba(row)
+        single.append(time.perf_counter() - start)
+    results['rows_1.p50_ms'] = float(np.percentile(single, 50) * 1000)
+    results['rows_1.p99_ms'] = float(np.percentile(single, 99) * 1000)
+    for n_rows in sizes:
+        block = features[:n_rows]
+        seconds = best_of(lambda: version.predict_proba(block), 3 if n_rows < 1_000_000 else 1)
+        results[f'rows_{n_rows}.predict_rows_per_s'] = n_rows / seconds
+        if n_rows <= RECORDS_MAX_ROWS:
+            records = as_records(df.iloc[:n_rows])
+            seconds = best_of(lambda: build_feature_block(records, version.encoders), 3)
+            results[f'rows_{n_rows}.encode_rows_per_s'] = n_rows / seconds
+    return results
+
+
+def section_api(sizes, args):
+    # Every request must reach the model: no result cache, no watcher thread
+    os.environ['ML_CACHE_SIZE'] = '0'
+    os.environ['ML_MODEL_WATCH_INTERVAL'] = '0'
+    import contextlib
+    import io
+    with contextlib.redirect_stdout(io.StringIO()):
+        import api
+    client = api.app.test_client()
+    df = synthetic(max(sizes))
+
+    results = {}
+    records = as_records(df.iloc[:500])
+    latencies = []
+    for record in records:
+        start = time.perf_counter()
+        response = client.post('/predict', json=record)
+        latencies.append(time.perf_counter() - start)
+        assert response.status_code == 200, response.get_data(as_text=True)
+    results['predict.p50_ms'] = float(np.percentile(latencies, 50) * 1000)
+    results['predict.p95_ms'] = float(np.percentile(latencies, 95) * 1000)
+    results['predict.requests_per_s'] = len(latencies) / sum(latencies)
+
+    for n_rows in sorted({min(n, api.BATCH_MAX_RECORDS) for n in sizes}):
+        records = as_records(df.iloc[:n_rows])
+        start = time.perf_counter()
+        response = client.post('/predict/batch', json=records)
+        lines = response.get_data(as_text=True).splitlines()
+        elapsed = time.perf_counter() - start
+        assert response.status_code == 200 and len(lines) == n_rows
+        results[f'batch_{n_rows}.rows_per_s'] = n_rows / elapsed
+    return results
+
+
+def run_section(section, sizes, args):
+    """Child process: run one section and print its metrics as JSON"""
+    results = globals()[f'section_{section}'](sizes, args)
+    results['peak_rss_mb'] = peak_rss_mb()
+    print(json.dumps({name: float(value) for name, value in results.items()}))
+
+
+def measure(section, sizes, args):
+    command = [
+        sys.executable, os.path.abspath(__file__), '--section', section,
+        '--sizes', *map(str, sizes), '--train-max-rows', str(args.train_max_rows)
+    ]
+    start = time.perf_counter()
+    output = subprocess.run(command, check=True, capture_output=True, text=True).stdout
+    results = json.loads(output.strip().splitlines()[-1])
+    print(f"   {section}: {len(results)} metrics in {time.perf_counter() - start:.1f}s")
+    return {f'{section}.{name}': value for name, value in results.items()}
+
+
+def run_metadata(sizes, args):
+    import sklearn
+    from model_registry import load_model_version
+    return {
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'sizes': sizes,
+        'train_max_rows': args.train_max_rows,
+        'model_version': load_model_version(MODEL_DIR).id,
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'sklearn': sklearn.__version__,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count()
+    }
+
+
+def lower_is_better(metric):
+    return metric.endswith(('_s', '_ms', '_mb'))
+
+
+def compare(results, baseline, tolerance=TOLERANCE):
+    """Rows of (metric, baseline, current, change, regressed) for metrics present in both runs"""
+    rows = []
+    for metric, value in results.items():
+        if metric not in baseline:
+            continue
+        base = baseline[metric]
+        if metric.startswith('evaluate.'):
+            regressed = value < base - QUALITY_TOLERANCE
+        elif lower_is_better(metric):
+            floor = next(delta for suffix, delta in NOISE_FLOOR.items() if metric.endswith(suffix))
+            regressed = value > base * (1 + tolerance) and value - base > floor
+        else:
+            regressed = value < base * (1 - tolerance)
+        change = (value - base) / base if base else 0.0
+        rows.append((metric, base, value, change, regressed))
+    return rows
+
+
+def print_comparison(rows, baseline_meta, meta):
+    if baseline_meta.get('cpu_count') != meta['cpu_count'] or baseline_meta.get('platform') != meta['platform']:
+        print(f"⚠️  Baseline was recorded on another machine ({baseline_meta.get('platform')}, "
+              f"{baseline_meta.get('cpu_count')} CPUs); timings are only roughly comparable")
+    print(f"\n   {'metric':<48} {'baseline':>12} {'current':>12} {'change':>8}")
+    for metric, base, value, change, regressed in rows:
+        flag = '  ❌ regression' if regressed else ''
+        print(f"   {metric:<48} {base:>12.4g} {value:>12.4g} {change * 100:>+7.1f}%{flag}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+')
+    parser.add_argument('--quick', action='store_true', help=f'use {QUICK_SIZES} rows')
+    parser.add_argument('--sections', nargs='+', choices=SECTIONS, default=SECTIONS)
+    parser.add_argument('--train-max-rows', type=int, help=f'largest training set (default {TRAIN_MAX_ROWS})')
+    parser.add_argument('--baseline', default=BASELINE_FILE)
+    parser.add_argument('--save-baseline', action='store_true', help='write this run to --baseline')
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE, help='relative slowdown allowed')
+    parser.add_argument('--output', help='results file (default: ml/.cache/benchmarks/<timestamp>.json)')
+    parser.add_argument('--section', choices=SECTIONS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    sizes = args.sizes or (QUICK_SIZES if args.quick else SIZES)
+    if args.train_max_rows is None:
+        args.train_max_rows = min(TRAIN_MAX_ROWS, max(sizes))
+    if args.section:
+        return run_section(args.section, sizes, args)
+
+    print(f"📏 Benchmark suite: {', '.join(args.sections)} at {', '.join(f'{n:,}' for n in sizes)} rows")
+    results = {}
+    for section in args.sections:
+        results.update(measure(section, sizes, args))
+    meta = run_metadata(sizes, args)
+    document = {'meta': meta, 'results': results}
+
+    output = args.output or os.path.join(RESULTS_DIR, time.strftime('%Y%m%d-%H%M%S') + '.json')
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(document, f, indent=2)
+    print(f"💾 Results written to: {output}")
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(document, f, indent=2)
+        print(f"📌 Baseline saved to: {args.baseline}")
+        return 0
+    if not os.path.exists(args.baseline):
+        print("⚠️  No baseline to compare with (run with --save-baseline first)")
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    rows = compare(results, baseline['results'], args.tolerance)
+    print_comparison(rows, baseline['meta'], meta)
+    regressions = [row for row in rows if row[4]]
+    if regressions:
+        print(f"\n❌ {len(regressions)} metric(s) regressed beyond the tolerance")
+        return 1
+    print(f"\n✅ No regressions ({len(rows)} metrics compared)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
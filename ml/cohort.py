@@ -0,0 +1,193 @@
+"""
+Cohort Analytics
+In-memory aggregates over the students scored by /predict/batch?cohort=<name>.
+Every (branch, gender, internship) cell keeps a histogram of placed
+probabilities at 0.1 percentage-point resolution plus placed/total counts,
+updated as each chunk is scored. /cohort/stats answers from those cells:
+filters pick cells, and rates, quantiles, at-risk counts and coarse
+histograms are read off the summed histogram without touching any student row.
+
+Records with an `id` replace their previous score when they are scored again,
+so re-running a cohort does not count it twice; records without one are added.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+# Histogram resolution: 1000 bins of 0.1 percentage points
+FINE_BINS = 1000
+QUANTILES = (10, 25, 50, 75, 90)
+
+
+class Cell:
+    """Aggregates of one (branch, gender, internship) group"""
+
+    def __init__(self):
+        self.histogram = np.zeros(FINE_BINS, dtype=np.int64)
+        self.placed = 0
+        self.probability_sum = 0.0
+
+
+def probability_bins(probability):
+    """Fine histogram bin of placed probabilities given in percent"""
+    return np.clip((np.asarray(probability) * (FINE_BINS / 100)).astype(np.int64), 0, FINE_BINS - 1)
+
+
+class Cohort:
+    """Cells of one named cohort; `ids` maps a record id to its current (cell key, bin, probability, placed)"""
+
+    def __init__(self, name):
+        self.name = name
+        self.cells = {}
+        self.ids = {}
+        self.model_versions = set()
+        self.updated_at = None
+
+    def _apply(self, key, bins, probabilities, placed, sign):
+        cell = self.cells.get(key)
+        if cell is None:
+            cell = self.cells[key] = Cell()
+        np.add.at(cell.histogram, bins, sign)
+        cell.placed += sign * int(np.count_nonzero(placed))
+        cell.probability_sum += sign * float(np.sum(probabilities))
+
+    def _apply_rows(self, keys, bins, probabilities, placed, sign):
+        """Add (sign=1) or remove (sign=-1) rows, one histogram update per cell"""
+        groups = {}
+        for i, key in enumerate(keys):
+            groups.setdefault(key, []).append(i)
+        for key, rows in groups.items():
+            self._apply(key, bins[rows], probabilities[rows], placed[rows], sign)
+
+    def add(self, keys, probabilities, placed, ids):
+        """
+        Add scored rows. `keys` holds one (branch, gender, internship) tuple per
+        row, `probabilities` placed probabilities in percent, `ids` the record id or None.
+        """
+        probabilities = np.asarray(probabilities, dtype=np.float64)
+        placed = np.asarray(placed, dtype=bool)
+        bins = probability_bins(probabilities)
+        # An id listed twice in one call counts once, with its last score
+        last = {record_id: i for i, record_id in enumerate(ids) if record_id is not None}
+        if last:
+            previous = [self.ids[record_id] for record_id in last if record_id in self.ids]
+            if previous:
+                old_keys, old_bins, old_probabilities, old_placed = zip(*previous)
+                self._apply_rows(old_keys, np.array(old_bins), np.array(old_probabilities), np.array(old_placed), -1)
+            for record_id, i in last.items():
+                self.ids[record_id] = (keys[i], int(bins[i]), float(probabilities[i]), bool(placed[i]))
+            rows = [i for i, record_id in enumerate(ids) if record_id is None or last[record_id] == i]
+            keys = [keys[i] for i in rows]
+            bins, probabilities, placed = bins[rows], probabilities[rows], placed[rows]
+        self._apply_rows(keys, bins, probabilities, placed, 1)
+        self.updated_at = time.time()
+
+    def select(self, branches=None, genders=None, internship=None):
+        """Cells matching the filters (None = any)"""
+        return {
+            key: cell for key, cell in self.cells.items()
+            if (branches is None or key[0] in branches)
+            and (genders is None or key[1] in genders)
+            and (internship is None or key[2] == internship)
+        }
+
+
+def bin_starts(bins):
+    """First fine bin of each of `bins` coarse bins (1 <= bins <= FINE_BINS); edges round to the nearest 0.1 point"""
+    if not 1 <= bins <= FINE_BINS:
+        raise ValueError(f"bins must be between 1 and {FINE_BINS}")
+    return np.round(np.arange(bins) * FINE_BINS / bins).astype(np.int64)
+
+
+def summarize_cells(cells, threshold, bins):
+    """Counts, placement rate, mean, quantiles, at-risk count and a `bins`-bin histogram over some cells"""
+    histogram = np.zeros(FINE_BINS, dtype=np.int64)
+    placed, probability_sum = 0, 0.0
+    for cell in cells:
+        histogram += cell.histogram
+        placed += cell.placed
+        probability_sum += cell.probability_sum
+    students = int(histogram.sum())
+    summary = {'students': students, 'placed': placed}
+    if not students:
+        return summary
+
+    cumulative = np.cumsum(histogram)
+    # Quantile = upper edge of the bin holding the q-th student, in percent
+    quantiles = {
+        f'p{q}': round(float(np.searchsorted(cumulative, q / 100 * students) + 1) * 100 / FINE_BINS, 1)
+        for q in QUANTILES
+    }
+    summary.update({
+        'placement_rate': round(100 * placed / students, 2),
+        'mean_probability': round(probability_sum / students, 2),
+        'quantiles': quantiles,
+        'at_risk': int(histogram[:int(round(threshold * FINE_BINS / 100))].sum()),
+        'histogram': np.add.reduceat(histogram, bin_starts(bins)).tolist()
+    })
+    return summary
+
+
+class CohortStore:
+    """Named cohorts, the least recently updated dropped beyond `max_cohorts`; thread-safe"""
+
+    def __init__(self, max_cohorts=16):
+        self.max_cohorts = max_cohorts
+        self._cohorts = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, name, version_id, keys, probabilities, placed, ids):
+        with self._lock:
+            cohort = self._cohorts.get(name)
+            if cohort is None:
+                cohort = self._cohorts[name] = Cohort(name)
+            cohort.add(keys, probabilities, placed, ids)
+            cohort.model_versions.add(version_id)
+            self._cohorts.move_to_end(name)
+            while len(self._cohorts) > self.max_cohorts:
+                self._cohorts.popitem(last=False)
+
+    def reset(self, name):
+        with self._lock:
+            return self._cohorts.pop(name, None) is not None
+
+    def names(self):
+        with self._lock:
+            return list(self._cohorts)
+
+    def stats(self, name=None, branches=None, genders=None, internship=None, threshold=40.0, bins=10):
+        """
+        Aggregates of one cohort (the most recently updated one by default),
+        overall and per branch, or None if there is no such cohort.
+        """
+        starts = bin_starts(bins)
+        with self._lock:
+            if name is None and self._cohorts:
+                name = next(reversed(self._cohorts))
+            cohort = self._cohorts.get(name)
+            if cohort is None:
+                return None
+            cells = cohort.select(branches, genders, internship)
+            by_branch = {}
+            for key, cell in cells.items():
+                by_branch.setdefault(key[0], []).append(cell)
+            result = {
+                'cohort': cohort.name,
+                'updated_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(cohort.updated_at)),
+                'model_versions': sorted(cohort.model_versions),
+                'threshold': threshold,
+                # Edges sit on the 0.1-point fine bins, so bins that do not divide 1000 differ slightly in width
+                'bin_edges': [round(float(edge) * 100 / FINE_BINS, 1) for edge in [*starts, FINE_BINS]],
+                'overall': summarize_cells(cells.values(), threshold, bins),
+                'branches': {
+                    branch: summarize_cells(branch_cells, threshold, bins)
+                    for branch, branch_cells in sorted(by_branch.items())
+                }
+            }
+        if FINE_BINS % bins == 0:
+            # Only uniform bins have a single width
+            result['bin_width'] = 100 / bins
+        return result
@@ -0,0 +1,165 @@
+"""
+What-If Counterfactuals
+Searches the feasible changes around one student profile for the cheapest
+ones that reach a target placement probability. Every candidate (single
+changes and combinations of up to `max_changes` features) is built as one
+feature block and scored in a single model call.
+"""
+
+import itertools
+
+import numpy as np
+
+from features import FEATURE_COLS, INTEGER_COLS
+
+# Ranges produced by generate_kaggle_data.py; candidates never leave them
+FEATURE_BOUNDS = {
+    'CGPA': (4.0, 10.0),
+    'Backlogs': (0, 4),
+    'DSA_Score': (0, 100),
+    'Projects': (0, 5),
+    'LeetCode_Problems': (0, 500),
+    'Certifications': (0, 4),
+    'Internship': (0, 1),
+    'Communication_Score': (1, 5),
+}
+
+# Actionable features: (step, effort per step, max steps). Backlogs can only go
+# down; Branch and Gender are never changed. Effort is a rough "weeks of work" scale
+CHANGE_STEPS = {
+    'CGPA': (0.25, 2.0, 8),
+    'Backlogs': (-1, 1.5, 4),
+    'DSA_Score': (5, 0.5, 8),
+    'Projects': (1, 2.0, 3),
+    'LeetCode_Problems': (25, 0.5, 8),
+    'Certifications': (1, 1.0, 3),
+    'Internship': (1, 4.0, 1),
+    'Communication_Score': (1, 2.0, 2),
+}
+
+MAX_CHANGES = 3
+DEFAULT_TARGET = 50.0
+
+
+def candidate_options(row):
+    """Every single-feature change of `row`: (column indices, new values, efforts)"""
+    columns, values, efforts = [], [], []
+    for feature, (step, effort, max_steps) in CHANGE_STEPS.items():
+        col = FEATURE_COLS.index(feature)
+        low, high = FEATURE_BOUNDS[feature]
+        for k in range(1, max_steps + 1):
+            value = round(row[col] + step * k, 2)
+            # A step past the bound it moves towards stops at the bound itself (CGPA 9.9 -> 10.0),
+            # costed for the part of the step taken, unless the previous step already reached it.
+            # Profiles already outside the range can still move back into it
+            clamped = min(value, high) if step > 0 else max(value, low)
+            if clamped != value:
+                if (clamped - (row[col] + step * (k - 1))) * step > 1e-9:
+                    columns.append(col)
+                    values.append(clamped)
+                    efforts.append(effort * abs(clamped - row[col]) / abs(step))
+                break
+            columns.append(col)
+            values.append(value)
+            efforts.append(effort * k)
+    return np.array(columns, dtype=np.int64), np.array(values), np.array(efforts)
+
+
+def candidate_block(row, max_changes=2):
+    """
+    Feature block of all candidates changing 1..max_changes distinct features.
+    Returns (block, option indices per candidate (-1 = unused), effort per
+    candidate, (option columns, option values)).
+    """
+    columns, values, efforts = candidate_options(row)
+    groups = []
+    for k in range(1, max_changes + 1):
+        combos = np.array(list(itertools.combinations(range(len(columns)), k)), dtype=np.int64).reshape(-1, k)
+        # One change per feature: combinations that touch a column twice are dropped
+        cols = np.sort(columns[combos], axis=1)
+        distinct = np.all(cols[:, 1:] != cols[:, :-1], axis=1)
+        combos = combos[distinct]
+        groups.append(np.pad(combos, ((0, 0), (0, max_changes - k)), constant_values=-1))
+    picks = np.vstack(groups) if groups else np.zeros((0, max_changes), dtype=np.int64)
+
+    block = np.repeat(np.asarray(row, dtype=np.float64)[None, :], len(picks), axis=0)
+    rows = np.arange(len(picks))
+    effort = np.zeros(len(picks))
+    for j in range(picks.shape[1]):
+        used = picks[:, j] >= 0
+        option = picks[used, j]
+        block[rows[used], columns[option]] = values[option]
+        effort[used] += efforts[option]
+    return block, picks, effort, (columns, values)
+
+
+def describe_changes(row, pick, options):
+    columns, values = options
+    changes = []
+    for option in pick[pick >= 0]:
+        feature = FEATURE_COLS[columns[option]]
+        cast = int if feature in INTEGER_COLS or feature == 'Internship' else float
+        changes.append({'feature': feature, 'from': cast(row[columns[option]]), 'to': cast(values[option])})
+    return changes
+
+
+def is_covered(row, pick, kept, options):
+    """True if a kept candidate already makes a subset of these changes, none of them larger"""
+    columns, values = options
+    mine = {columns[o]: abs(values[o] - row[columns[o]]) for o in pick[pick >= 0]}
+    for other in kept:
+        if all(columns[o] in mine and abs(values[o] - row[columns[o]]) <= mine[columns[o]]
+               for o in other[other >= 0]):
+            return True
+    return False
+
+
+def search(version, row, target=DEFAULT_TARGET, max_changes=2, top_k=5):
+    """
+    Rank the counterfactuals of one encoded feature row.
+
+    Only candidates that raise the placed probability are considered. Those
+    exceeding `target` (percent) come first, cheapest effort first; one that
+    only adds changes on top of a cheaper one already listed is skipped. If
+    fewer than top_k reach the target, the remaining slots go to the
+    highest-probability improvements.
+    """
+    if not 1 <= max_changes <= MAX_CHANGES:
+        raise ValueError(f"max_changes must be between 1 and {MAX_CHANGES}")
+    row = np.asarray(row, dtype=np.float64)
+    block, picks, effort, options = candidate_block(row, max_changes)
+    probabilities = version.predict_proba(np.vstack([row[None, :], block]))
+    current, placed = probabilities[0, 1] * 100, probabilities[1:, 1] * 100
+
+    reaches = placed > target
+    # Changes the model scores as no better are never suggested
+    useful = placed > current
+    order = np.lexsort((-placed, effort))
+    chosen, kept = [], []
+    for i in order[(reaches & useful)[order]]:
+        if len(chosen) >= top_k:
+            break
+        if not is_covered(row, picks[i], kept, options):
+            kept.append(picks[i])
+            chosen.append(i)
+    if len(chosen) < top_k:
+        improving = np.flatnonzero(~reaches & useful)
+        improving = improving[np.lexsort((effort[improving], -placed[improving]))]
+        chosen.extend(improving[:top_k - len(chosen)].tolist())
+
+    return {
+        'current': round(float(current), 2),
+        'target': target,
+        'meets_target': bool(current > target),
+        'candidates_evaluated': len(block),
+        'counterfactuals': [
+            {
+                'changes': describe_changes(row, picks[i], options),
+                'effort': round(float(effort[i]), 2),
+                'probability': round(float(placed[i]), 2),
+                'gain': round(float(placed[i] - current), 2),
+                'reaches_target': bool(reaches[i])
+            }
+            for i in chosen
+        ]
+    }
@@ -0,0 +1,279 @@
+"""
+Typed Dataset Loading
+Explicit schemas (categorical / int8 / int16 / float32 columns with value
+ranges) for the CSVs under ml/data/, and a columnar cache: each CSV is parsed
+and validated once, then stored as one .npy file per column that later runs
+memory-map instead of parsing text again
+
+Usage:
+    python data_loading.py            # convert every known CSV under ml/data/
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import time
+
+import numpy as np
+import pandas as pd
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+CACHE_DIR = os.path.join(DATA_DIR, '.cache')
+META_FILE = 'meta.json'
+# Bump when the cache layout changes
+CACHE_VERSION = 1
+
+
+class DataValidationError(ValueError):
+    """Raised when a CSV has missing columns, unparseable values or values out of range"""
+
+
+class Column:
+    """Storage dtype ('category', 'string', 'bool' or a NumPy dtype) plus allowed range"""
+
+    def __init__(self, dtype, low=None, high=None, nullable=False):
+        self.dtype = dtype
+        self.low = low
+        self.high = high
+        self.nullable = nullable
+
+    def describe(self):
+        return [self.dtype, self.low, self.high, self.nullable]
+
+
+# ml/data/bmsit_placement_data.csv (generate_kaggle_data.py); ranges follow the generator
+PLACEMENT_SCHEMA = {
+    'Branch': Column('category'),
+    'Gender': Column('category'),
+    'CGPA': Column('float32', 4.0, 10.0),
+    'Backlogs': Column('int8', 0, 10),
+    'DSA_Score': Column('int8', 0, 100),
+    'Projects': Column('int8', 0, 10),
+    'LeetCode_Problems': Column('int16', 0, 5000),
+    'Certifications': Column('int8', 0, 10),
+    'Internship': Column('int8', 0, 1),
+    'Communication_Score': Column('int8', 1, 5),
+    'PlacedOrNot': Column('int8', 0, 1),
+}
+
+REAL_PLACEMENT_SCHEMA = {
+    'Age': Column('int8', 15, 40),
+    'Gender': Column('category'),
+    'Stream': Column('category'),
+    'Internships': Column('int8', 0, 10),
+    'CGPA': Column('float32', 4.0, 10.0),
+    'Hostel': Column('int8', 0, 1),
+    'HistoryOfBacklogs': Column('int8', 0, 1),
+    'PlacedOrNot': Column('int8', 0, 1),
+}
+
+# ml/data/students.csv (generate_dataset.py)
+STUDENT_SCHEMA = {
+    'usn': Column('string'),
+    'name': Column('string'),
+    'gender': Column('category'),
+    'branch': Column('category'),
+    'year': Column('int16', 2000, 2100),
+    'cgpa': Column('float32', 4.0, 10.0),
+    'backlogs': Column('int8', 0, 10),
+    'skills': Column('string'),
+    'num_skills': Column('int8', 0, 20),
+    'has_internship': Column('bool'),
+    'internship_months': Column('int8', 0, 24),
+    'num_projects': Column('int8', 0, 20),
+    'num_certifications': Column('int8', 0, 20),
+    'placed': Column('bool'),
+    'company': Column('category', nullable=True),
+    'package_lpa': Column('float32', 0.0, 200.0, nullable=True),
+    'placement_score': Column('float32'),
+}
+
+SCHEMAS = {
+    'bmsit_placement_data.csv': PLACEMENT_SCHEMA,
+    'real_placement_data.csv': REAL_PLACEMENT_SCHEMA,
+    'students.csv': STUDENT_SCHEMA,
+}
+
+TRUE_VALUES = {'true', '1', 'yes'}
+FALSE_VALUES = {'false', '0', 'no'}
+
+
+def schema_hash(schema):
+    text = json.dumps({name: column.describe() for name, column in schema.items()})
+    return hashlib.sha256(text.encode()).hexdigest()[:16]
+
+
+def read_dtypes(schema):
+    """dtypes for read_csv: numerics parse as float64 first so ranges can be checked before narrowing"""
+    dtypes = {}
+    for name, column in schema.items():
+        if column.dtype in ('category', 'string', 'bool'):
+            dtypes[name] = 'category' if column.dtype == 'category' else object
+        else:
+            dtypes[name] = 'float64'
+    return dtypes
+
+
+def apply_schema(df, schema, source='data'):
+    """
+    Cast an untyped (or read_csv(dtype=read_dtypes(...))) frame to the schema.
+
+    Raises DataValidationError listing every offending column with its number of
+    bad rows and the first few row numbers (1-based, header excluded).
+    """
+    missing = [name for name in schema if name not in df.columns]
+    if missing:
+        raise DataValidationError(f"{source}: missing columns {missing}")
+
+    columns, problems = {}, []
+    for name, column in schema.items():
+        values = df[name]
+        if column.dtype == 'category':
+            typed = values.astype('category')
+            typed = typed.cat.rename_categories([str(c) for c in typed.cat.categories])
+            bad = typed.isna().to_numpy() & ~values.isna().to_numpy()
+            nulls = typed.isna().to_numpy()
+        elif column.dtype == 'string':
+            typed = values.astype(object)
+            nulls = values.isna().to_numpy()
+            bad = np.zeros(len(values), dtype=bool)
+        elif column.dtype == 'bool':
+            text = values.astype(str).str.strip().str.lower()
+            nulls = values.isna().to_numpy()
+            bad = ~(text.isin(TRUE_VALUES) | text.isin(FALSE_VALUES)).to_numpy() & ~nulls
+            typed = pd.Series(text.isin(TRUE_VALUES).to_numpy(), index=values.index)
+        else:
+            numeric = pd.to_numeric(values, errors='coerce').to_numpy(dtype=np.float64)
+            nulls = np.isnan(numeric)
+            bad = nulls & ~values.isna().to_numpy()
+            with np.errstate(invalid='ignore'):
+                if column.low is not None:
+                    bad |= numeric < column.low
+                if column.high is not None:
+                    bad |= numeric > column.high
+                if np.dtype(column.dtype).kind in 'iu':
+                    bad |= ~nulls & (numeric != np.trunc(numeric))
+            typed = numeric.astype(column.dtype) if not nulls.any() else numeric.astype(np.float32)
+        if not column.nullable:
+            bad = bad | nulls
+        if bad.any():
+            rows = (np.flatnonzero(bad)[:5] + 1).tolist()
+            bounds = f" (allowed {column.low}..{column.high})" if column.low is not None else ''
+            problems.append(f"{name}: {int(bad.sum())} invalid values{bounds}, e.g. rows {rows}")
+        columns[name] = typed
+    if problems:
+        raise DataValidationError(f"{source}: " + '; '.join(problems))
+    return pd.DataFrame(columns, index=pd.RangeIndex(len(df)))
+
+
+def source_signature(csv_path):
+    stat = os.stat(csv_path)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def write_columns(cache_path, df, schema, meta):
+    """Store every column as .npy (categories as int codes + a category list), atomically"""
+    tmp_path = f"{cache_path}.tmp-{os.getpid()}"
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    os.makedirs(tmp_path)
+    for name, column in schema.items():
+        values = df[name]
+        if column.dtype == 'category':
+            categories = np.asarray(values.cat.categories, dtype=str)
+            code_dtype = np.int8 if len(categories) < 127 else np.int32
+            np.save(os.path.join(tmp_path, f'{name}.npy'), values.cat.codes.to_numpy().astype(code_dtype))
+            np.save(os.path.join(tmp_path, f'{name}.categories.npy'), categories)
+        elif column.dtype == 'string':
+            np.save(os.path.join(tmp_path, f'{name}.npy'), values.fillna('').to_numpy(dtype=str))
+        else:
+            np.save(os.path.join(tmp_path, f'{name}.npy'), np.ascontiguousarray(values.to_numpy()))
+    with open(os.path.join(tmp_path, META_FILE), 'w') as f:
+        json.dump(meta, f, indent=2)
+    shutil.rmtree(cache_path, ignore_errors=True)
+    os.rename(tmp_path, cache_path)
+
+
+def read_columns(cache_path, schema):
+    """Memory-map the cached columns; numeric columns are not copied"""
+    columns = {}
+    for name, column in schema.items():
+        values = np.load(os.path.join(cache_path, f'{name}.npy'), mmap_mode='r')
+        if column.dtype == 'category':
+            categories = np.load(os.path.join(cache_path, f'{name}.categories.npy'))
+            columns[name] = pd.Categorical.from_codes(values, categories=list(categories))
+        elif column.dtype == 'string':
+            columns[name] = np.asarray(values, dtype=object)
+        else:
+            columns[name] = values
+    return pd.DataFrame(columns, copy=False)
+
+
+def cache_path_for(csv_path, cache_dir=CACHE_DIR):
+    return os.path.join(cache_dir, os.path.splitext(os.path.basename(csv_path))[0])
+
+
+def load_dataset(csv_path, schema=None, use_cache=True, cache_dir=CACHE_DIR):
+    """
+    Load a CSV as a typed, validated DataFrame.
+
+    Returns (df, meta); meta['offset'] is the byte length of the rows loaded
+    (see training_state.py). The first call parses the CSV and writes the
+    columnar cache; later calls map the cache until the CSV changes.
+    """
+    schema = schema or SCHEMAS[os.path.basename(csv_path)]
+    signature = source_signature(csv_path)
+    cache_path = cache_path_for(csv_path, cache_dir)
+    meta_path = os.path.join(cache_path, META_FILE)
+
+    if use_cache and os.path.exists(meta_path):
+        with open(meta_path) as f:
+            meta = json.load(f)
+        if (meta.get('version') == CACHE_VERSION and meta.get('schema') == schema_hash(schema)
+                and meta.get('source') == signature):
+            return read_columns(cache_path, schema), meta
+
+    try:
+        raw = pd.read_csv(csv_path, dtype=read_dtypes(schema), usecols=list(schema))
+    except ValueError:
+        # Unparseable or missing columns: re-read untyped so apply_schema can say which rows
+        raw = pd.read_csv(csv_path, dtype=str)
+    df = apply_schema(raw, schema, source=os.path.basename(csv_path))
+    with open(csv_path, 'r', encoding='utf-8-sig') as f:
+        header = f.readline().rstrip('\r\n')
+    meta = {
+        'version': CACHE_VERSION,
+        'schema': schema_hash(schema),
+        'source': signature,
+        'rows': len(df),
+        # Every row parsed and passed the schema, a last line without a newline included,
+        # so the whole file counts as loaded (training_state.read_rows handles partial appends)
+        'offset': signature['size'],
+        'header': header,
+        'converted_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
+    }
+    if use_cache:
+        os.makedirs(cache_dir, exist_ok=True)
+        write_columns(cache_path, df, schema, meta)
+        # Serve the mapped copy so the parsed frame can be freed
+        return read_columns(cache_path, schema), meta
+    return df, meta
+
+
+def convert_all(data_dir=DATA_DIR):
+    """Build (or refresh) the columnar cache for every known CSV in data_dir"""
+    for filename, schema in SCHEMAS.items():
+        path = os.path.join(data_dir, filename)
+        if not os.path.exists(path):
+            continue
+        start = time.perf_counter()
+        df, meta = load_dataset(path, schema)
+        memory_mb = df.memory_usage(deep=True).sum() / 1e6
+        print(f"   {filename}: {meta['rows']} rows, {memory_mb:.2f} MB in memory, "
+              f"{(time.perf_counter() - start) * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    print("🗂️  Converting datasets to the columnar cache...")
+    convert_all()
+    print(f"✅ Cache written to: {CACHE_DIR}")
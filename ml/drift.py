@@ -0,0 +1,312 @@
+"""
+Input Drift Monitoring
+Streaming histograms of the profiles /predict and /predict/batch score, and
+of the placed probabilities they get, compared with the training
+distribution. train_model.py writes that distribution to
+models/drift_reference.json; GET /drift reports per feature the population
+stability index (PSI) and, for numeric features, a Kolmogorov-Smirnov
+distance over the same bins.
+
+Numeric features are binned on training quantiles (equal-mass bins), Branch
+and Gender per class; a branch the model has never seen falls in an extra
+"unseen" bin. Requests only append their feature block to a pending list,
+which is binned in bulk every FLUSH_ROWS rows (or when stats are read), so
+a request pays a list append and memory is a fixed set of counters.
+Counts cover the last one to two WINDOW_ROWS windows of traffic.
+
+The reference is a generated file (not committed). Training writes it; for
+models trained without it, e.g. on a fresh checkout, GET /drift answers 404
+until it is written once with the command below. The API picks it up
+without a restart.
+
+Usage:
+    python drift.py        # write the reference for the models already in models/
+"""
+
+import argparse
+import json
+import os
+import threading
+import time
+
+import numpy as np
+
+from features import FEATURE_COLS
+
+REFERENCE_FILE = 'drift_reference.json'
+CATEGORICAL = ('Branch', 'Gender')
+
+# Equal-mass bins per numeric feature in the reference (fewer when values repeat)
+REFERENCE_BINS = 20
+# Pending rows binned together
+FLUSH_ROWS = 1024
+# Rows per counting window; stats cover the previous window plus the current one
+WINDOW_ROWS = int(os.environ.get('ML_DRIFT_WINDOW', 10000))
+# Fractions are floored here so an empty bin does not make PSI infinite
+PSI_EPSILON = 1e-4
+# Common PSI reading: < 0.1 stable, < 0.25 moderate shift, above that drifted
+PSI_MODERATE = 0.1
+PSI_DRIFT = float(os.environ.get('ML_DRIFT_PSI_ALERT', 0.25))
+# Fewer live rows than this and the scores are mostly noise
+MIN_ROWS = 100
+
+
+def numeric_reference(values, bins=REFERENCE_BINS):
+    values = np.asarray(values, dtype=np.float64)
+    edges = np.unique(np.quantile(values, np.linspace(0, 1, bins + 1)[1:-1]))
+    counts = np.bincount(np.searchsorted(edges, values, side='right'), minlength=len(edges) + 1)
+    return {
+        'edges': edges.tolist(),
+        'fractions': (counts / len(values)).tolist(),
+        'min': float(values.min()),
+        'max': float(values.max())
+    }
+
+
+def build_reference(features, probabilities, categories, bins=REFERENCE_BINS):
+    """
+    Reference statistics for an encoded (FEATURE_COLS order) training block and
+    the model's placed probabilities on held-out rows. `categories` maps Branch
+    and Gender to their classes in encoder order.
+    """
+    features = np.asarray(features, dtype=np.float64)
+    reference = {
+        'built_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'rows': len(features),
+        'features': {}
+    }
+    for j, feature in enumerate(FEATURE_COLS):
+        if feature in CATEGORICAL:
+            classes = [str(c) for c in categories[feature]]
+            counts = np.bincount(features[:, j].astype(np.int64), minlength=len(classes))[:len(classes)]
+            # Last bin: categories the model has not seen (none in training)
+            reference['features'][feature] = {'classes': classes, 'fractions': (counts / len(features)).tolist() + [0.0]}
+        else:
+            reference['features'][feature] = numeric_reference(features[:, j], bins)
+    reference['probability'] = numeric_reference(probabilities, bins) if probabilities is not None else None
+    return reference
+
+
+def save_reference(model_dir, reference):
+    path = os.path.join(model_dir, REFERENCE_FILE)
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    with open(tmp_path, 'w') as f:
+        json.dump(reference, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def load_reference(model_dir):
+    """The stored reference, or None when training has not written one"""
+    path = os.path.join(model_dir, REFERENCE_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def psi(live, expected):
+    live = np.maximum(live, PSI_EPSILON)
+    expected = np.maximum(expected, PSI_EPSILON)
+    return float(np.sum((live - expected) * np.log(live / expected)))
+
+
+def status(score):
+    if score < PSI_MODERATE:
+        return 'stable'
+    return 'moderate' if score < PSI_DRIFT else 'drift'
+
+
+class DriftMonitor:
+    """
+    Live histograms against the reference in model_dir; thread-safe.
+
+    All bins of all features live in one counter vector (`offsets` marks
+    where each feature's bins start), so binning a pending block ends in a
+    single bincount. The reference is re-read when its file changes, checked
+    whenever stats are read; counts restart with a new reference.
+    """
+
+    def __init__(self, model_dir, window=WINDOW_ROWS, flush_rows=FLUSH_ROWS):
+        self.path = os.path.join(model_dir, REFERENCE_FILE)
+        self.window = window
+        self.flush_rows = flush_rows
+        self.reference = None
+        self.rows_seen = 0
+        self._signature = None
+        self._pending = []
+        self._pending_rows = 0
+        self._lock = threading.Lock()
+
+    def reload(self):
+        """Read the reference file if it changed; returns the reference (None if there is none)"""
+        try:
+            stat = os.stat(self.path)
+            signature = (stat.st_mtime_ns, stat.st_size)
+        except FileNotFoundError:
+            signature = None
+        with self._lock:
+            if signature == self._signature:
+                return self.reference
+            self._signature = signature
+            if signature is None:
+                self.reference = None
+                return None
+            with open(self.path, 'r') as f:
+                self._compile(json.load(f))
+        print(f"📡 Drift reference: {self.reference['rows']} training rows ({self.reference['built_at']})")
+        return self.reference
+
+    def _compile(self, reference):
+        self.reference = reference
+        self.features = []
+        offset = 0
+        for j, feature in enumerate(FEATURE_COLS):
+            spec = reference['features'][feature]
+            edges = np.asarray(spec['edges']) if 'edges' in spec else None
+            classes = np.asarray(spec['classes'], dtype=object) if 'classes' in spec else None
+            self.features.append((feature, j, edges, classes, np.asarray(spec['fractions']), offset))
+            offset += len(spec['fractions'])
+        self.branch_names = frozenset(reference['features']['Branch']['classes'])
+        spec = reference.get('probability')
+        self.probability = (np.asarray(spec['edges']), np.asarray(spec['fractions']), offset) if spec else None
+        offset += len(spec['fractions']) if spec else 0
+        self.n_bins = offset
+        self.reset_counts()
+
+    def reset_counts(self):
+        self.current = np.zeros(self.n_bins, dtype=np.int64)
+        self.previous = np.zeros(self.n_bins, dtype=np.int64)
+        self.current_rows = self.previous_rows = 0
+        self.out_of_range = np.zeros(len(FEATURE_COLS) + 1, dtype=np.int64)
+        self.out_of_range_previous = np.zeros_like(self.out_of_range)
+        self._pending, self._pending_rows = [], 0
+
+    def reset(self):
+        with self._lock:
+            if self.reference is not None:
+                self.reset_counts()
+
+    def observe(self, features, branches, probabilities):
+        """Queue a scored block: encoded features, branch names and placed probabilities (0-1)"""
+        if self.reference is None:
+            return
+        with self._lock:
+            self._pending.append((features, branches, probabilities))
+            self._pending_rows += len(features)
+            if self._pending_rows >= self.flush_rows:
+                self._flush()
+
+    def _flush(self):
+        if not self._pending:
+            return
+        features = np.concatenate([block for block, _, _ in self._pending])
+        branches = np.concatenate([names for _, names, _ in self._pending]).tolist()
+        probabilities = np.array([p for _, _, block in self._pending for p in block], dtype=np.float64)
+        self._pending, self._pending_rows = [], 0
+
+        bins, outside = [], []
+        for feature, j, edges, classes, _, offset in self.features:
+            if edges is not None:
+                column = features[:, j]
+                bins.append(offset + np.searchsorted(edges, column, side='right'))
+                spec = self.reference['features'][feature]
+                outside.append(np.count_nonzero((column < spec['min']) | (column > spec['max'])))
+            elif feature == 'Branch':
+                # Branch names are canonical when known, so membership tells unseen branches apart
+                known = np.fromiter((name in self.branch_names for name in branches), dtype=bool, count=len(branches))
+                bins.append(offset + np.where(known, features[:, j].astype(np.int64), len(classes)))
+                outside.append(0)
+            else:
+                bins.append(offset + np.minimum(features[:, j].astype(np.int64), len(classes)))
+                outside.append(0)
+        if self.probability is not None:
+            edges, _, offset = self.probability
+            bins.append(offset + np.searchsorted(edges, probabilities, side='right'))
+        outside.append(0)
+
+        if self.current_rows >= self.window:
+            self.previous, self.current = self.current, np.zeros_like(self.current)
+            self.out_of_range_previous, self.out_of_range = self.out_of_range, np.zeros_like(self.out_of_range)
+            self.previous_rows, self.current_rows = self.current_rows, 0
+        self.current += np.bincount(np.concatenate(bins), minlength=self.n_bins)
+        self.out_of_range += np.asarray(outside, dtype=np.int64)
+        self.current_rows += len(features)
+        self.rows_seen += len(features)
+
+    def report(self):
+        """Per-feature PSI / KS against the reference over the recent window(s)"""
+        self.reload()
+        with self._lock:
+            if self.reference is None:
+                return None
+            self._flush()
+            counts = self.current + self.previous
+            out_of_range = self.out_of_range + self.out_of_range_previous
+            rows = self.current_rows + self.previous_rows
+            reference = self.reference
+            features = self.features
+            probability = self.probability
+            rows_seen = self.rows_seen
+
+        def compare(observed, expected):
+            live = observed / rows
+            result = {'psi': round(psi(live, expected), 4)}
+            result['status'] = status(result['psi'])
+            return live, result
+
+        scores = {}
+        if rows:
+            for feature, j, edges, classes, expected, offset in features:
+                live, result = compare(counts[offset:offset + len(expected)], expected)
+                if edges is not None:
+                    result['ks'] = round(float(np.max(np.abs(np.cumsum(live) - np.cumsum(expected)))), 4)
+                    result['out_of_range'] = round(float(out_of_range[j] / rows), 4)
+                else:
+                    result['unseen'] = round(float(live[-1]), 4)
+                scores[feature] = result
+            if probability is not None:
+                _, expected, offset = probability
+                live, result = compare(counts[offset:offset + len(expected)], expected)
+                result['ks'] = round(float(np.max(np.abs(np.cumsum(live) - np.cumsum(expected)))), 4)
+                scores['placed_probability'] = result
+        return {
+            'rows': rows,
+            'rows_seen': rows_seen,
+            'window': self.window,
+            'enough_data': rows >= MIN_ROWS,
+            'reference': {'built_at': reference['built_at'], 'rows': reference['rows']},
+            'thresholds': {'moderate': PSI_MODERATE, 'drift': PSI_DRIFT},
+            'drifted': sorted(name for name, result in scores.items() if result['status'] == 'drift'),
+            'features': scores
+        }
+
+
+def reference_from_artifacts(model_dir, data_path):
+    """
+    Reference for the models already in model_dir: features of every training
+    row, probabilities on the rows train_model.py held out for testing.
+    """
+    from sklearn.model_selection import train_test_split
+
+    from data_loading import load_dataset
+    from features import build_feature_block
+    from model_registry import load_model_version
+
+    version = load_model_version(model_dir)
+    df, _ = load_dataset(data_path)
+    records = df[FEATURE_COLS].astype(object).to_dict('records')
+    features, _, _, _ = build_feature_block(records, version.encoders)
+    _, X_test = train_test_split(features, test_size=0.2, random_state=42, stratify=df['PlacedOrNot'])
+    categories = {col: version.encoders[col].classes for col in CATEGORICAL}
+    return build_reference(features, version.predict_proba(X_test)[:, 1], categories)
+
+
+if __name__ == '__main__':
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    parser = argparse.ArgumentParser(description='Write the drift reference for the current models')
+    parser.add_argument('--models', default=os.path.join(script_dir, 'models'))
+    parser.add_argument('--data', default=os.path.join(script_dir, 'data', 'bmsit_placement_data.csv'))
+    args = parser.parse_args()
+    reference = reference_from_artifacts(args.models, args.data)
+    save_reference(args.models, reference)
+    print(f"✅ Drift reference over {reference['rows']} rows written to {os.path.join(args.models, REFERENCE_FILE)}")
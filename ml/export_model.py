@@ -0,0 +1,166 @@
+"""
+BMSIT Placement Model Export
+Compiles the pickled Random Forest, scaler and encoders into the
+memory-mappable model bundle used by api.py
+
+With --compact the bundle holds a quantized CompactForest (merged leaves,
+float32 thresholds, uint8/uint16 indices) for low-memory deployments; the
+API loads it through the same path.
+"""
+
+import argparse
+import json
+import os
+import pickle
+
+import numpy as np
+import pandas as pd
+
+from features import FEATURE_COLS
+from flat_forest import CompactForest, FlatForest, check_parity, scale_rows
+from heads import load_heads
+from model_bundle import BUNDLE_DIR, write_bundle
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+MODEL_DIR = os.path.join(SCRIPT_DIR, 'models')
+DATA_PATH = os.path.join(SCRIPT_DIR, 'data', 'bmsit_placement_data.csv')
+
+# Input resolution used by --compact: CGPA has two decimals (generate_kaggle_data.py),
+# every other feature reaches the model as an integer (counts, flags, category codes)
+INPUT_DECIMALS = {col: 2 if col == 'CGPA' else 0 for col in FEATURE_COLS}
+
+
+def parity_inputs(X, scaler, n_random=5000, seed=42):
+    """Raw rows to check an exported forest on: the given rows plus random points around them"""
+    rng = np.random.default_rng(seed)
+    X = np.asarray(X, dtype=np.float64)
+    noise = scaler.mean_ + scaler.scale_ * rng.normal(0, 2, size=(n_random, X.shape[1]))
+    return np.vstack([X, noise])
+
+
+def boundary_inputs(forest, X, seed=42):
+    """Rows with one feature moved onto a split threshold of a folded forest"""
+    rng = np.random.default_rng(seed)
+    split = np.flatnonzero(np.isfinite(forest.threshold))
+    rows = []
+    for direction in (-np.inf, None, np.inf):
+        base = np.asarray(X, dtype=np.float64)[rng.integers(0, len(X), len(split))].copy()
+        values = forest.threshold[split]
+        if direction is not None:
+            values = np.nextafter(values, direction)
+        base[np.arange(len(split)), forest.feature[split]] = values
+        rows.append(base)
+    return np.vstack(rows)
+
+
+def export_bundle(model, scaler, encoders, model_dir, X_check, fold=True, compact=False, heads=None):
+    """
+    Flatten the forest, optionally fold the scaler into its thresholds, verify
+    it against sklearn and write the model bundle into model_dir/bundle.
+
+    X_check holds raw (unscaled, encoded) rows. A compact forest is not
+    bit-exact; its largest probability difference on X_check rounded to
+    INPUT_DECIMALS is reported. `heads` (see heads.py) are flattened, checked
+    and folded the same way and stay full flat forests.
+    """
+    if compact and not fold:
+        raise ValueError("A compact bundle needs the scaler folded into the thresholds")
+    forest = FlatForest.from_sklearn(model)
+    X_check = np.asarray(X_check, dtype=np.float64)
+    n_checked = check_parity(model, forest, scale_rows(scaler, X_check))
+    if fold:
+        forest = forest.fold_scaler(scaler.mean_, scaler.scale_)
+        X_check = np.vstack([X_check, boundary_inputs(forest, X_check)])
+        n_checked = check_parity(model, forest, X_check, scaler=scaler)
+    if compact:
+        full = forest
+        forest = CompactForest.from_flat(full, {FEATURE_COLS.index(c): d for c, d in INPUT_DECIMALS.items()})
+        # Measured on inputs at their real resolution (X_check's random rows are continuous)
+        X_grid = np.column_stack([np.round(X_check[:, j], INPUT_DECIMALS[c]) for j, c in enumerate(FEATURE_COLS)])
+        drift = np.abs(full.predict_proba(X_grid) - forest.predict_proba(X_grid)).max()
+
+    flat_heads = {}
+    for head, head_model in (heads or {}).items():
+        flat_heads[head] = FlatForest.from_sklearn(head_model)
+        check_parity(head_model, flat_heads[head], scale_rows(scaler, X_check))
+        if fold:
+            flat_heads[head] = flat_heads[head].fold_scaler(scaler.mean_, scaler.scale_)
+            check_parity(head_model, flat_heads[head], X_check, scaler=scaler)
+
+    metadata = record_export(model_dir, forest)
+    path = os.path.join(model_dir, BUNDLE_DIR)
+    manifest = write_bundle(
+        path, forest, scaler.mean_, scaler.scale_,
+        {col: list(encoder.classes_) for col, encoder in encoders.items()},
+        metadata, flat_heads
+    )
+    print(f"   {forest.LAYOUT.title()} forest: {forest.n_trees} trees, {forest.n_nodes} nodes, depth {forest.max_depth}")
+    print(f"   Thresholds: {'raw feature units (scaler folded in)' if forest.raw_inputs else 'scaled units'}")
+    print(f"   Parity with predict_proba verified on {n_checked} rows")
+    for head, head_forest in flat_heads.items():
+        print(f"   Head '{head}': {head_forest.n_trees} trees, {head_forest.n_nodes} nodes, parity verified")
+    if compact:
+        size = sum(getattr(forest, name).nbytes for name in forest.ARRAYS)
+        full_size = sum(getattr(full, name).nbytes for name in full.ARRAYS)
+        print(f"   Compact: {full.n_nodes - forest.n_nodes} nodes merged, {full_size / 1e6:.2f} MB -> {size / 1e6:.2f} MB, "
+              f"max probability drift {drift:.2e} on {len(X_grid)} rows")
+    print(f"   Bundle saved to: {path} (checksum {manifest['checksum'][:12]})")
+    return forest
+
+
+def record_export(model_dir, forest):
+    """Note in model_metadata.json how the exported forest expects its inputs"""
+    path = os.path.join(model_dir, 'model_metadata.json')
+    with open(path, 'r') as f:
+        metadata = json.load(f)
+    metadata['scaler_folded'] = forest.raw_inputs
+    metadata['flat_forest'] = {
+        'bundle': BUNDLE_DIR,
+        'layout': forest.LAYOUT,
+        'n_trees': forest.n_trees,
+        'n_nodes': forest.n_nodes,
+        'max_depth': forest.max_depth,
+        'threshold_units': 'raw' if forest.raw_inputs else 'scaled'
+    }
+    with open(path, 'w') as f:
+        json.dump(metadata, f, indent=2)
+    return metadata
+
+
+def load_encoded_dataset(scaler, encoders, data_path=DATA_PATH):
+    """Encode the training CSV the same way train_model.py does (unscaled)"""
+    df = pd.read_csv(data_path)
+    X = df[list(scaler.feature_names_in_)].copy()
+    for col, encoder in encoders.items():
+        X[col] = encoder.transform(X[col])
+    return X.to_numpy(dtype=np.float64)
+
+
+def load_scaled_dataset(scaler, encoders, data_path=DATA_PATH):
+    """Encode and scale the training CSV the same way train_model.py does"""
+    return scale_rows(scaler, load_encoded_dataset(scaler, encoders, data_path))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Export the trained model for fast inference')
+    parser.add_argument('--model-dir', default=MODEL_DIR)
+    parser.add_argument('--no-fold', action='store_true', help='keep thresholds in scaled units')
+    parser.add_argument('--compact', action='store_true', help='export the quantized low-memory forest')
+    args = parser.parse_args()
+
+    with open(os.path.join(args.model_dir, 'placement_model.pkl'), 'rb') as f:
+        model = pickle.load(f)
+    with open(os.path.join(args.model_dir, 'scaler.pkl'), 'rb') as f:
+        scaler = pickle.load(f)
+    with open(os.path.join(args.model_dir, 'encoders.pkl'), 'rb') as f:
+        encoders = pickle.load(f)
+
+    print("📦 Exporting model bundle...")
+    X_check = parity_inputs(load_encoded_dataset(scaler, encoders), scaler)
+    export_bundle(model, scaler, encoders, args.model_dir, X_check, fold=not args.no_fold, compact=args.compact,
+                  heads=load_heads(args.model_dir))
+    print("✅ Export complete!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+"""
+Feature Parsing & Encoding
+Turns raw student records (JSON or CSV rows) into the model's feature matrix
+"""
+
+import csv
+import io
+import os
+import numpy as np
+
+# Feature order: Branch, Gender, CGPA, Backlogs, DSA_Score, Projects, LeetCode_Problems, Certifications, Internship, Communication_Score
+FEATURE_COLS = [
+    'Branch', 'Gender', 'CGPA', 'Backlogs',
+    'DSA_Score', 'Projects', 'LeetCode_Problems',
+    'Certifications', 'Internship', 'Communication_Score'
+]
+
+# Safe defaults used when a field is missing (same as the single /predict route)
+NUMERIC_DEFAULTS = {
+    'CGPA': 7.0,
+    'Backlogs': 0,
+    'DSA_Score': 50,
+    'Projects': 1,
+    'LeetCode_Problems': 0,
+    'Certifications': 0,
+    'Communication_Score': 3
+}
+INTEGER_COLS = ['Backlogs', 'DSA_Score', 'Projects', 'LeetCode_Problems', 'Certifications', 'Communication_Score']
+DEFAULT_BRANCH = 'CSE'
+DEFAULT_GENDER = 'Male'
+
+TRUE_STRINGS = {'1', 'true', 'yes', 'y', 't'}
+
+# Other spellings of the trained categories (model_info.json and students.csv use
+# MECH/CIVIL, real_placement_data.csv uses full stream names). Keys are normalized.
+CATEGORY_ALIASES = {
+    'Branch': {
+        'mech': 'Mechanical',
+        'me': 'Mechanical',
+        'mechanical engineering': 'Mechanical',
+        'cv': 'Civil',
+        'civil engineering': 'Civil',
+        'cs': 'CSE',
+        'computer science': 'CSE',
+        'computer science and engineering': 'CSE',
+        'is': 'ISE',
+        'it': 'ISE',
+        'information science': 'ISE',
+        'information technology': 'ISE',
+        'ai': 'AIML',
+        'ai&ml': 'AIML',
+        'ai ml': 'AIML',
+        'ai-ml': 'AIML',
+        'ec': 'ECE',
+        'electronics and communication': 'ECE',
+        'ee': 'EEE',
+        'electrical': 'EEE',
+        'electrical and electronics': 'EEE',
+        'te': 'ETE',
+        'electronics and telecommunication': 'ETE'
+    },
+    'Gender': {
+        'm': 'Male',
+        'f': 'Female'
+    }
+}
+
+# Category used when a value is unknown even after normalization.
+# Branch defaults to CSE; Gender defaults to code 0 like the original route.
+UNKNOWN_FALLBACKS = {
+    'Branch': os.environ.get('ML_UNKNOWN_BRANCH', 'CSE'),
+    'Gender': os.environ.get('ML_UNKNOWN_GENDER')
+}
+
+
+def parse_flag(value):
+    """Interpret JSON booleans and CSV strings ('1', 'true', 'yes') as 0/1"""
+    if isinstance(value, str):
+        return 1 if value.strip().lower() in TRUE_STRINGS else 0
+    return 1 if value else 0
+
+
+def normalize_category(value):
+    """Case/whitespace-insensitive key used for category lookups"""
+    return ' '.join(str(value).replace('_', ' ').split()).lower()
+
+
+class CategoryTable:
+    """
+    Plain dict replacement for a fitted LabelEncoder.
+
+    Codes are the positions in `classes` (LabelEncoder's sorted order), so
+    encoded values stay compatible with the trained model.
+    """
+
+    def __init__(self, classes, aliases=None, fallback=None):
+        self.classes = np.asarray(classes, dtype=object)
+        self.codes = {normalize_category(c): i for i, c in enumerate(self.classes)}
+        for alias, target in (aliases or {}).items():
+            if normalize_category(target) in self.codes:
+                self.codes.setdefault(normalize_category(alias), self.codes[normalize_category(target)])
+        if fallback is not None and normalize_category(fallback) not in self.codes:
+            raise ValueError(f"Fallback category {fallback!r} is not one of {list(self.classes)}")
+        self.fallback_code = self.codes[normalize_category(fallback)] if fallback is not None else 0
+
+    def encode(self, value):
+        """Return (code, known) for a single value"""
+        code = self.codes.get(normalize_category(value))
+        if code is None:
+            return self.fallback_code, False
+        return code, True
+
+    def encode_column(self, values):
+        """Encode a whole column, normalizing each distinct value only once"""
+        values = np.asarray(values, dtype=object).astype(str)
+        if len(values) == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=bool)
+        uniques, inverse = np.unique(values, return_inverse=True)
+        encoded = [self.encode(u) for u in uniques]
+        codes = np.array([c for c, _ in encoded], dtype=np.int64)
+        known = np.array([k for _, k in encoded], dtype=bool)
+        return codes[inverse], known[inverse]
+
+
+def compile_encoders(encoders, fallbacks=None):
+    """Turn the LabelEncoders from encoders.pkl into CategoryTables once at startup"""
+    fallbacks = {**UNKNOWN_FALLBACKS, **(fallbacks or {})}
+    return {
+        col: CategoryTable(list(encoder.classes_), CATEGORY_ALIASES.get(col), fallbacks.get(col))
+        for col, encoder in encoders.items()
+    }
+
+
+def _numeric_column(records, col):
+    """Extract one numeric column as float64, applying defaults for missing values"""
+    values = [r.get(col) for r in records]
+    values = [None if v == '' else v for v in values]
+    try:
+        column = np.array(values, dtype=np.float64)
+        # Lists as values either fail above or give a 2-D (or ragged) column
+        if column.shape != (len(values),):
+            raise ValueError(col)
+    except (TypeError, ValueError):
+        # Slow path only to find out which rows are bad (float() rejects lists and dicts)
+        column = np.empty(len(values), dtype=np.float64)
+        for i, v in enumerate(values):
+            try:
+                column[i] = np.nan if v is None else float(v)
+            except (TypeError, ValueError):
+                column[i] = np.inf
+    column[np.isnan(column)] = NUMERIC_DEFAULTS[col]
+    return column
+
+
+def build_feature_block(records, tables):
+    """
+    Validate and encode a list of record dicts as one vectorized block.
+
+    `tables` maps each categorical column to its CategoryTable. Returns
+    (features, valid_mask, errors, context) where `features` holds only the valid
+    rows, `errors` maps row index -> message and `context` carries the branch names
+    (canonical when known) needed by the tip rules.
+    """
+    n = len(records)
+    errors = {}
+    for i, r in enumerate(records):
+        if not isinstance(r, dict):
+            errors[i] = 'Record must be an object'
+    if errors:
+        records = [r if isinstance(r, dict) else {} for r in records]
+
+    # Categories must be strings: anything else would reach the result cache key unhashable
+    categorical = {}
+    for col, default in (('Branch', DEFAULT_BRANCH), ('Gender', DEFAULT_GENDER)):
+        values = []
+        for i, r in enumerate(records):
+            value = r.get(col)
+            if value is not None and not isinstance(value, str):
+                errors.setdefault(i, f"Invalid value for {col} (expected a string)")
+                value = None
+            values.append(value or default)
+        categorical[col] = np.array(values, dtype=object)
+    branches, genders = categorical['Branch'], categorical['Gender']
+
+    # Encode categorical features; unknown values use each table's fallback
+    branch_enc, known_branch = tables['Branch'].encode_column(branches)
+    gender_enc, _ = tables['Gender'].encode_column(genders)
+    branches = np.where(known_branch, tables['Branch'].classes[branch_enc], branches)
+
+    columns = {'Branch': branch_enc, 'Gender': gender_enc}
+    for col in NUMERIC_DEFAULTS:
+        columns[col] = _numeric_column(records, col)
+    columns['Internship'] = np.array([parse_flag(r.get('Internship')) for r in records], dtype=np.float64)
+
+    features = np.column_stack([columns[c] for c in FEATURE_COLS]).astype(np.float64)
+
+    bad = ~np.isfinite(features)
+    for i in np.flatnonzero(bad.any(axis=1)):
+        cols = [FEATURE_COLS[j] for j in np.flatnonzero(bad[i])]
+        errors.setdefault(int(i), f"Invalid numeric value for {', '.join(cols)}")
+
+    for col in INTEGER_COLS:
+        j = FEATURE_COLS.index(col)
+        features[:, j] = np.trunc(features[:, j])
+
+    valid = np.ones(n, dtype=bool)
+    if errors:
+        valid[list(errors)] = False
+
+    context = {'branches': branches[valid]}
+    return features[valid], valid, errors, context
+
+
+def records_from_csv(text):
+    """Parse CSV text (header row with feature names) into record dicts"""
+    reader = csv.DictReader(io.StringIO(text))
+    return [{k.strip(): v for k, v in row.items() if k is not None} for row in reader]
@@ -0,0 +1,367 @@
+"""
+Flat Forest Inference Engine
+Compiles a trained RandomForestClassifier (or regressor) into contiguous
+NumPy node arrays and evaluates all trees level by level for a whole batch
+at once
+"""
+
+import numpy as np
+
+# Rows traversed together; keeps the per-level index arrays small enough to stay in cache
+ROW_BLOCK = 256
+
+
+class FlatForest:
+    """
+    Array-backed copy of a fitted sklearn forest.
+
+    All trees are concatenated into one node table. Leaves point to themselves
+    with an infinite threshold, so every row can take exactly `max_depth` steps
+    without checking whether it has already reached a leaf.
+    """
+
+    # Bundle layout name and the arrays a bundle stores for it
+    LAYOUT = 'flat'
+    ARRAYS = ['feature', 'threshold', 'left', 'right', 'value', 'roots', 'classes']
+
+    def __init__(self, feature, threshold, left, right, value, roots, max_depth, classes, raw_inputs=False):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.value = value
+        self.roots = roots
+        self.max_depth = int(max_depth)
+        self.classes = classes
+        # True once a StandardScaler has been folded into the thresholds
+        self.raw_inputs = bool(raw_inputs)
+
+    @staticmethod
+    def supports(model, regression=False):
+        """True for bagged forests, whose probabilities (or predicted values) are the mean over trees"""
+        from sklearn.ensemble import (
+            ExtraTreesClassifier, ExtraTreesRegressor, RandomForestClassifier, RandomForestRegressor
+        )
+        if regression:
+            return isinstance(model, (RandomForestRegressor, ExtraTreesRegressor))
+        return isinstance(model, (RandomForestClassifier, ExtraTreesClassifier))
+
+    @classmethod
+    def from_sklearn(cls, model):
+        """
+        Flatten the `tree_` arrays of every estimator in a fitted forest.
+
+        A regression forest gets one value column (the leaf mean) and no
+        classes; predict_value() returns its prediction.
+        """
+        regression = not hasattr(model, 'classes_')
+        features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+        offset = 0
+        max_depth = 0
+        for estimator in model.estimators_:
+            tree = estimator.tree_
+            n = tree.node_count
+            is_leaf = tree.children_left == -1
+            own = np.arange(offset, offset + n)
+
+            features.append(np.where(is_leaf, 0, tree.feature))
+            thresholds.append(np.where(is_leaf, np.inf, tree.threshold))
+            lefts.append(np.where(is_leaf, own, tree.children_left + offset))
+            rights.append(np.where(is_leaf, own, tree.children_right + offset))
+
+            if regression:
+                values.append(tree.value[:, 0, :1].astype(np.float64))
+            else:
+                # Newer sklearn stores class fractions and predicts them as they are;
+                # older versions stored counts and normalised them in predict_proba
+                value = tree.value[:, 0, :model.n_classes_].astype(np.float64)
+                normalizer = value.sum(axis=1)[:, np.newaxis]
+                if np.any(normalizer > 1 + 1e-9):
+                    normalizer[normalizer == 0.0] = 1.0
+                    value = value / normalizer
+                values.append(value)
+
+            roots.append(offset)
+            max_depth = max(max_depth, tree.max_depth)
+            offset += n
+
+        return cls(
+            feature=np.ascontiguousarray(np.concatenate(features), dtype=np.intp),
+            threshold=np.ascontiguousarray(np.concatenate(thresholds), dtype=np.float64),
+            left=np.ascontiguousarray(np.concatenate(lefts), dtype=np.intp),
+            right=np.ascontiguousarray(np.concatenate(rights), dtype=np.intp),
+            value=np.ascontiguousarray(np.concatenate(values), dtype=np.float64),
+            roots=np.array(roots, dtype=np.intp),
+            max_depth=max_depth,
+            classes=np.zeros(0) if regression else np.asarray(model.classes_)
+        )
+
+    @property
+    def n_trees(self):
+        return len(self.roots)
+
+    @property
+    def n_nodes(self):
+        return len(self.feature)
+
+    def apply(self, X):
+        """Return the leaf index reached by every (tree, row) pair, shape (n_trees, n_rows)"""
+        # sklearn trees compare float32 inputs against float64 thresholds; folded
+        # thresholds already account for that rounding and take raw float64 values
+        X = np.ascontiguousarray(X, dtype=np.float64 if self.raw_inputs else np.float32)
+        n_rows, n_features = X.shape
+        flat_X = X.ravel()
+        row_base = (np.arange(n_rows, dtype=np.intp) * n_features)[np.newaxis, :]
+
+        nodes = np.repeat(self.roots[:, np.newaxis], n_rows, axis=1)
+        for _ in range(self.max_depth):
+            x = flat_X[row_base + self.feature[nodes]]
+            go_left = x <= self.threshold[nodes]
+            nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+        return nodes
+
+    def predict_proba(self, X):
+        """Average leaf class probabilities over all trees, in estimator order"""
+        X = np.asarray(X)
+        proba = np.zeros((len(X), self.value.shape[1]), dtype=np.float64)
+        for start in range(0, len(X), ROW_BLOCK):
+            leaves = self.apply(X[start:start + ROW_BLOCK])
+            block = proba[start:start + ROW_BLOCK]
+            # Accumulate tree by tree (like sklearn) so results match bit for bit
+            for tree_leaves in leaves:
+                block += self.value[tree_leaves]
+        proba /= self.n_trees
+        return proba
+
+    def fold_scaler(self, mean, scale):
+        """
+        Return a copy whose thresholds are in raw feature units.
+
+        A scaled split sends x left when float32((x - mean) / scale) <= t. That
+        test is monotonic in x, so it equals x <= r for the largest float64 r that
+        still passes. r starts at the inverse transform of the float32 rounding
+        boundary above t and is then nudged ulp by ulp until it is exact.
+        """
+        split = np.isfinite(self.threshold)
+        t = self.threshold[split]
+        m = np.asarray(mean, dtype=np.float64)[self.feature[split]]
+        s = np.asarray(scale, dtype=np.float64)[self.feature[split]]
+
+        def passes(x):
+            return ((x - m) / s).astype(np.float32) <= t
+
+        # Largest float32 <= t, and the midpoint to the next float32 up
+        low = t.astype(np.float32)
+        low = np.where(low > t, np.nextafter(low, np.float32(-np.inf)), low)
+        high = np.nextafter(low, np.float32(np.inf))
+        raw = ((low.astype(np.float64) + high.astype(np.float64)) / 2) * s + m
+
+        for _ in range(1000):
+            too_high = ~passes(raw)
+            step_up = passes(np.nextafter(raw, np.inf))
+            if not (too_high.any() or step_up.any()):
+                break
+            raw = np.where(too_high, np.nextafter(raw, -np.inf), raw)
+            raw = np.where(step_up & ~too_high, np.nextafter(raw, np.inf), raw)
+        else:
+            raise RuntimeError("Could not fold scaler into split thresholds")
+
+        threshold = self.threshold.copy()
+        threshold[split] = raw
+        return FlatForest(
+            self.feature, threshold, self.left, self.right, self.value,
+            self.roots, self.max_depth, self.classes, raw_inputs=True
+        )
+
+    def predict(self, X):
+        return self.classes[np.argmax(self.predict_proba(X), axis=1)]
+
+    def predict_value(self, X):
+        """Prediction of a regression forest (its single value column)"""
+        return self.predict_proba(X)[:, 0]
+
+
+class CompactForest(FlatForest):
+    """
+    Quantized copy of a folded FlatForest for low-memory serving.
+
+    - subtrees whose leaves all hold the same class distribution become one leaf
+    - nodes are re-laid out in preorder per tree, so a left child is always the
+      next node and only the right child is stored, as a uint16 offset from the
+      tree's root (uint32 for trees over 65535 nodes)
+    - feature indices are uint8; thresholds and inputs are compared as float32.
+      Thresholds of features with a known resolution (integers, CGPA to two
+      decimals) are first moved to the midpoint between the grid values around
+      them, which keeps every decision on grid values exact
+    - only the positive-class probability is kept, as float32
+
+    Leaves use a -inf threshold and point their right child at themselves, so
+    the fixed-depth walk of FlatForest.apply still needs no leaf checks.
+    """
+
+    LAYOUT = 'compact'
+    ARRAYS = ['feature', 'threshold', 'right_offset', 'positive', 'roots', 'classes']
+
+    def __init__(self, feature, threshold, right_offset, positive, roots, max_depth, classes, raw_inputs=True):
+        if not raw_inputs:
+            raise ValueError("Compact forests take raw inputs (fold the scaler first)")
+        self.feature = feature
+        self.threshold = threshold
+        self.right_offset = right_offset
+        self.positive = positive
+        self.roots = roots
+        self.max_depth = int(max_depth)
+        self.classes = classes
+        self.raw_inputs = True
+
+    @classmethod
+    def from_flat(cls, forest, decimals=None):
+        """
+        Merge redundant leaves and quantize a folded FlatForest.
+
+        `decimals` maps a feature index to the number of decimals its inputs
+        have (0 for integers); other features' thresholds are only rounded.
+        """
+        if not forest.raw_inputs:
+            raise ValueError("Fold the scaler into the forest before compacting it")
+        if forest.value.shape[1] != 2 or forest.feature.max() > np.iinfo(np.uint8).max:
+            raise ValueError("Compact forests support binary classifiers with at most 256 features")
+        is_leaf = forest.left == np.arange(forest.n_nodes)
+
+        features, thresholds, rights, positives, roots = [], [], [], [], []
+        max_depth = 0
+        for root in forest.roots:
+            # Class distribution shared by every leaf below a node, or None
+            uniform = {}
+
+            def shared_value(node):
+                if node not in uniform:
+                    if is_leaf[node]:
+                        uniform[node] = tuple(forest.value[node])
+                    else:
+                        left, right = shared_value(forest.left[node]), shared_value(forest.right[node])
+                        uniform[node] = left if left is not None and left == right else None
+                return uniform[node]
+
+            start = len(features)
+            roots.append(start)
+
+            def emit(node, depth):
+                nonlocal max_depth
+                local = len(features) - start
+                shared = shared_value(node)
+                features.append(0)
+                thresholds.append(-np.inf)
+                rights.append(local)
+                positives.append(shared[-1] if shared is not None else forest.value[node, -1])
+                if shared is not None:
+                    max_depth = max(max_depth, depth)
+                    return
+                position = len(features) - 1
+                features[position] = forest.feature[node]
+                thresholds[position] = forest.threshold[node]
+                emit(forest.left[node], depth + 1)
+                rights[position] = len(features) - start
+                emit(forest.right[node], depth + 1)
+
+            emit(root, 0)
+
+        feature = np.array(features, dtype=np.uint8)
+        threshold = np.array(thresholds, dtype=np.float64)
+        split = np.isfinite(threshold)
+        for col, places in (decimals or {}).items():
+            # Move t to the midpoint between the grid values around it: grid values keep
+            # their side, stay far from t in float32, and off-grid inputs stay close to t
+            snap = split & (feature == col)
+            step = 10.0 ** -places
+            threshold[snap] = (np.floor(threshold[snap] / step) + 0.5) * step
+        threshold32 = threshold.astype(np.float32)
+        offsets = np.array(rights)
+        return cls(
+            feature=feature,
+            threshold=threshold32,
+            right_offset=offsets.astype(np.uint16 if offsets.max() <= np.iinfo(np.uint16).max else np.uint32),
+            positive=np.array(positives, dtype=np.float32),
+            roots=np.array(roots, dtype=np.intp),
+            max_depth=max_depth,
+            classes=np.asarray(forest.classes)
+        )
+
+    def _tree_base(self):
+        """Root index of the tree each node belongs to"""
+        sizes = np.diff(np.append(self.roots, self.n_nodes))
+        return np.repeat(self.roots, sizes)
+
+    @property
+    def right(self):
+        return self._tree_base() + self.right_offset
+
+    @property
+    def left(self):
+        own = np.arange(self.n_nodes)
+        return np.where(np.isfinite(self.threshold), own + 1, own)
+
+    @property
+    def value(self):
+        positive = self.positive.astype(np.float64)
+        return np.column_stack([1.0 - positive, positive])
+
+    def apply(self, X):
+        """Leaf index reached by every (tree, row) pair, shape (n_trees, n_rows)"""
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        n_rows, n_features = X.shape
+        flat_X = X.ravel()
+        row_base = (np.arange(n_rows, dtype=np.intp) * n_features)[np.newaxis, :]
+        tree_base = self.roots[:, np.newaxis]
+
+        nodes = np.repeat(tree_base, n_rows, axis=1)
+        for _ in range(self.max_depth):
+            x = flat_X[row_base + self.feature[nodes]]
+            go_left = x <= self.threshold[nodes]
+            nodes = np.where(go_left, nodes + 1, tree_base + self.right_offset[nodes])
+        return nodes
+
+    def predict_proba(self, X):
+        """Mean positive-class probability over all trees (binary forests only)"""
+        X = np.asarray(X)
+        positive = np.zeros(len(X), dtype=np.float64)
+        for start in range(0, len(X), ROW_BLOCK):
+            positive[start:start + ROW_BLOCK] = self.positive[self.apply(X[start:start + ROW_BLOCK])].sum(
+                axis=0, dtype=np.float64
+            )
+        positive /= self.n_trees
+        return np.column_stack([1.0 - positive, positive])
+
+    def fold_scaler(self, mean, scale):
+        raise ValueError("Compact forests already take raw inputs")
+
+
+def scale_rows(scaler, X):
+    """scaler.transform on a raw block, with the column names the scaler was fitted on"""
+    # Export-time only, so pandas stays out of the serving imports
+    import pandas as pd
+    return scaler.transform(pd.DataFrame(X, columns=getattr(scaler, 'feature_names_in_', None)))
+
+
+def check_parity(model, forest, X, scaler=None):
+    """
+    Raise if the flat forest does not reproduce model.predict_proba (for a
+    regression forest: model.predict) exactly.
+
+    X is in the forest's input units; for a folded forest it is raw and the
+    reference is the original scaler -> model pipeline.
+    """
+    regression = not hasattr(model, 'classes_')
+    n_jobs = model.n_jobs
+    # Single-threaded sklearn sums trees in estimator order, which we mirror
+    model.n_jobs = 1
+    try:
+        inputs = scale_rows(scaler, X) if forest.raw_inputs else X
+        expected = model.predict(inputs) if regression else model.predict_proba(inputs)
+    finally:
+        model.n_jobs = n_jobs
+    actual = forest.predict_value(X) if regression else forest.predict_proba(X)
+    if not np.array_equal(expected, actual):
+        diff = np.abs(expected - actual).max()
+        raise AssertionError(f"Flat forest differs from sklearn (max abs diff {diff:.3e})")
+    return len(X)
@@ -1,11 +1,26 @@
 """
 Synthetic Student Dataset Generator
 Generates realistic Indian student data with BMSIT USN format for ML training
+
+Students are produced lazily in shards and written incrementally (CSV, JSON
+Lines and optionally a JSON array), so memory stays flat however many are
+generated. Shards can be generated in parallel worker processes; every shard
+has its own seeded RNG, so the output does not depend on the worker count.
+
+Usage:
+    python generate_dataset.py                                   # 100 per branch, batch of 2023
+    python generate_dataset.py --per-branch 5000 --years 21 22 23 --workers 4 --seed 7
 """
 
+import argparse
+import collections
+import csv
+import io
 import json
-import random
+import multiprocessing
 import os
+import random
+import textwrap
 
 # Indian Names Database
 FIRST_NAMES_MALE = [
@@ -53,42 +68,62 @@ COMPANIES = {
     "AIML": ["TCS", "Infosys", "Wipro", "Mu Sigma", "Fractal Analytics", "Tiger Analytics", "Latent View", "Amazon", "Microsoft", "Google"]
 }
 
+# Package bands by employer: dream (product) companies, mass recruiters, everyone else
+DREAM_COMPANIES = ["Google", "Microsoft", "Amazon"]
+MASS_RECRUITERS = ["TCS", "Infosys", "Wipro", "Cognizant"]
+
+# Output files per format; 'json' is a single array, kept for existing consumers
+OUTPUT_FILES = {
+    "csv": "students.csv",
+    "jsonl": "students.jsonl",
+    "json": "students.json"
+}
+
+FIELDS = [
+    "usn", "name", "gender", "branch", "year", "cgpa", "backlogs", "skills", "num_skills",
+    "has_internship", "internship_months", "num_projects", "num_certifications",
+    "placed", "company", "package_lpa", "placement_score"
+]
+
+# Students per unit of work; each shard is generated (and seeded) independently
+SHARD_SIZE = 2000
+
 def generate_usn(branch_code, year, roll_number):
     """Generate USN in format: 1BY23CS001"""
     return f"1BY{year}{branch_code}{roll_number:03d}"
 
-def generate_cgpa(placed=None):
+def generate_cgpa(placed=None, rng=random):
     """Generate realistic CGPA distribution"""
     if placed is True:
         # Placed students tend to have higher CGPA
-        return round(random.triangular(6.5, 10.0, 8.0), 2)
+        return round(rng.triangular(6.5, 10.0, 8.0), 2)
     elif placed is False:
         # Not placed students have varied CGPA
-        return round(random.triangular(4.0, 9.0, 6.5), 2)
+        return round(rng.triangular(4.0, 9.0, 6.5), 2)
     else:
         # General distribution
-        return round(random.triangular(4.0, 10.0, 7.0), 2)
+        return round(rng.triangular(4.0, 10.0, 7.0), 2)
 
-def generate_student(branch, year, roll_number):
+def generate_student(branch, year, roll_number, rng=random):
     """Generate a single student record"""
-    is_male = random.random() > 0.35  # 65% male ratio typical in engineering
+    is_male = rng.random() > 0.35  # 65% male ratio typical in engineering
     
-    first_name = random.choice(FIRST_NAMES_MALE if is_male else FIRST_NAMES_FEMALE)
-    last_name = random.choice(LAST_NAMES)
+    first_name = rng.choice(FIRST_NAMES_MALE if is_male else FIRST_NAMES_FEMALE)
+    last_name = rng.choice(LAST_NAMES)
     
     branch_info = BRANCHES[branch]
     usn = generate_usn(branch_info["code"], year, roll_number)
     
     # Determine placement status based on multiple factors
-    cgpa = generate_cgpa()
-    num_skills = random.randint(2, 6)
-    skills = random.sample(branch_info["skills"], min(num_skills, len(branch_info["skills"])))
+    cgpa = generate_cgpa(rng=rng)
+    num_skills = rng.randint(2, 6)
+    skills = rng.sample(branch_info["skills"], min(num_skills, len(branch_info["skills"])))
     
-    has_internship = random.random() > 0.4  # 60% have internship
-    num_projects = random.randint(0, 4)
-    has_certifications = random.random() > 0.5
-    num_certifications = random.randint(1, 4) if has_certifications else 0
-    backlogs = random.choices([0, 0, 0, 0, 1, 1, 2, 3], weights=[40, 20, 10, 5, 10, 8, 5, 2])[0]
+    has_internship = rng.random() > 0.4  # 60% have internship
+    num_projects = rng.randint(0, 4)
+    has_certifications = rng.random() > 0.5
+    num_certifications = rng.randint(1, 4) if has_certifications else 0
+    backlogs = rng.choices([0, 0, 0, 0, 1, 1, 2, 3], weights=[40, 20, 10, 5, 10, 8, 5, 2])[0]
     
     # Calculate placement probability
     placement_score = 0
@@ -100,7 +135,7 @@ def generate_student(branch, year, roll_number):
     placement_score -= backlogs * 15  # Backlogs hurt significantly
     
     # Add some randomness
-    placement_score += random.uniform(-10, 10)
+    placement_score += rng.uniform(-10, 10)
     
     is_placed = placement_score >= 50 and cgpa >= 5.0 and backlogs <= 1
     
@@ -108,14 +143,14 @@ def generate_student(branch, year, roll_number):
     company = None
     package = None
     if is_placed:
-        company = random.choice(COMPANIES[branch])
+        company = rng.choice(COMPANIES[branch])
         # Package based on CGPA and company tier
-        if company in ["Google", "Microsoft", "Amazon"]:
-            package = round(random.uniform(15, 45), 2)
-        elif company in ["TCS", "Infosys", "Wipro", "Cognizant"]:
-            package = round(random.uniform(3.5, 7), 2)
+        if company in DREAM_COMPANIES:
+            package = round(rng.uniform(15, 45), 2)
+        elif company in MASS_RECRUITERS:
+            package = round(rng.uniform(3.5, 7), 2)
         else:
-            package = round(random.uniform(4, 12), 2)
+            package = round(rng.uniform(4, 12), 2)
     
     return {
         "usn": usn,
@@ -128,7 +163,7 @@ def generate_student(branch, year, roll_number):
         "skills": skills,
         "num_skills": len(skills),
         "has_internship": has_internship,
-        "internship_months": random.randint(1, 6) if has_internship else 0,
+        "internship_months": rng.randint(1, 6) if has_internship else 0,
         "num_projects": num_projects,
         "num_certifications": num_certifications,
         "placed": is_placed,
@@ -137,57 +172,195 @@ def generate_student(branch, year, roll_number):
         "placement_score": round(placement_score, 2)
     }
 
-def generate_dataset(num_students_per_branch=100, year="23"):
-    """Generate complete dataset"""
-    students = []
-    
-    for branch in BRANCHES.keys():
-        for i in range(1, num_students_per_branch + 1):
-            student = generate_student(branch, year, i)
-            students.append(student)
-    
-    return students
+def plan_shards(num_students_per_branch, years, shard_size=SHARD_SIZE):
+    """(year, branch, first roll number, count) for every shard, in output order"""
+    for year in years:
+        for branch in BRANCHES.keys():
+            for first in range(1, num_students_per_branch + 1, shard_size):
+                yield year, branch, first, min(shard_size, num_students_per_branch - first + 1)
 
-def save_dataset(students, output_dir):
-    """Save dataset in multiple formats"""
-    os.makedirs(output_dir, exist_ok=True)
-    
-    # Save as JSON
-    with open(os.path.join(output_dir, "students.json"), "w") as f:
-        json.dump(students, f, indent=2)
-    
-    # Save as CSV
-    import csv
-    csv_file = os.path.join(output_dir, "students.csv")
-    with open(csv_file, "w", newline="", encoding="utf-8") as f:
-        if students:
-            writer = csv.DictWriter(f, fieldnames=students[0].keys())
-            writer.writeheader()
-            writer.writerows(students)
-    
-    # Print statistics
-    total = len(students)
-    placed = sum(1 for s in students if s["placed"])
-    print(f"\n📊 Dataset Statistics:")
-    print(f"   Total Students: {total}")
-    print(f"   Placed: {placed} ({placed/total*100:.1f}%)")
-    print(f"   Not Placed: {total-placed} ({(total-placed)/total*100:.1f}%)")
-    
-    print(f"\n📁 Branch-wise breakdown:")
-    for branch in BRANCHES.keys():
-        branch_students = [s for s in students if s["branch"] == branch]
-        branch_placed = sum(1 for s in branch_students if s["placed"])
-        print(f"   {branch}: {len(branch_students)} students, {branch_placed} placed ({branch_placed/len(branch_students)*100:.1f}%)")
-    
+def shard_rng(seed, year, branch, first):
+    """Independent RNG for one shard; unseeded runs draw fresh OS entropy"""
+    if seed is None:
+        return random.Random()
+    return random.Random(f"{seed}:{year}:{branch}:{first}")
+
+def generate_shard(year, branch, first, count, seed=None):
+    """Lazily yield the students of one shard"""
+    rng = shard_rng(seed, year, branch, first)
+    for roll_number in range(first, first + count):
+        yield generate_student(branch, year, roll_number, rng)
+
+def iter_students(num_students_per_branch=100, years=("23",), seed=None):
+    """Lazily yield every student, batch year by batch year and branch by branch"""
+    for shard in plan_shards(num_students_per_branch, years):
+        yield from generate_shard(*shard, seed=seed)
+
+def generate_dataset(num_students_per_branch=100, year="23", seed=None):
+    """Generate complete dataset (in memory; use iter_students for large runs)"""
+    return list(iter_students(num_students_per_branch, [year], seed))
+
+class DatasetStats:
+    """Branch/year/placement counts accumulated in a single streaming pass"""
+
+    def __init__(self):
+        self.total = 0
+        self.placed = 0
+        self.branches = collections.defaultdict(lambda: [0, 0])
+        self.years = collections.defaultdict(lambda: [0, 0])
+
+    def add(self, student):
+        placed = 1 if student["placed"] else 0
+        self.total += 1
+        self.placed += placed
+        for counts in (self.branches[student["branch"]], self.years[student["year"]]):
+            counts[0] += 1
+            counts[1] += placed
+
+    def merge(self, other):
+        self.total += other.total
+        self.placed += other.placed
+        for mine, theirs in ((self.branches, other.branches), (self.years, other.years)):
+            for key, (count, placed) in theirs.items():
+                mine[key][0] += count
+                mine[key][1] += placed
+
+    def __getstate__(self):
+        # defaultdict(lambda) cannot be pickled back from worker processes
+        return {'total': self.total, 'placed': self.placed,
+                'branches': dict(self.branches), 'years': dict(self.years)}
+
+    def __setstate__(self, state):
+        self.__init__()
+        self.total, self.placed = state['total'], state['placed']
+        self.branches.update(state['branches'])
+        self.years.update(state['years'])
+
+    def report(self):
+        total = max(self.total, 1)
+        print(f"\n📊 Dataset Statistics:")
+        print(f"   Total Students: {self.total}")
+        print(f"   Placed: {self.placed} ({self.placed/total*100:.1f}%)")
+        print(f"   Not Placed: {self.total-self.placed} ({(self.total-self.placed)/total*100:.1f}%)")
+        
+        if len(self.years) > 1:
+            print(f"\n📅 Batch-wise breakdown:")
+            for year, (count, placed) in sorted(self.years.items()):
+                print(f"   {year}: {count} students, {placed} placed ({placed/count*100:.1f}%)")
+        
+        print(f"\n📁 Branch-wise breakdown:")
+        for branch in BRANCHES.keys():
+            count, placed = self.branches.get(branch, (0, 0))
+            if count:
+                print(f"   {branch}: {count} students, {placed} placed ({placed/count*100:.1f}%)")
+
+def format_students(students, formats):
+    """Serialize a group of students for every output format, plus their statistics"""
+    stats = DatasetStats()
+    csv_buffer = io.StringIO()
+    csv_writer = csv.DictWriter(csv_buffer, fieldnames=FIELDS)
+    jsonl, json_items = [], []
+    for student in students:
+        stats.add(student)
+        if "csv" in formats:
+            csv_writer.writerow(student)
+        if "jsonl" in formats:
+            jsonl.append(json.dumps(student) + "\n")
+        if "json" in formats:
+            # Same layout as json.dump(students, indent=2)
+            json_items.append(textwrap.indent(json.dumps(student, indent=2), "  "))
+    texts = {"csv": csv_buffer.getvalue(), "jsonl": "".join(jsonl), "json": ",\n".join(json_items)}
+    return {fmt: texts[fmt] for fmt in formats}, stats
+
+def build_shard(shard, seed, formats):
+    """Worker entry point: generate and serialize one shard"""
+    return format_students(generate_shard(*shard, seed=seed), formats)
+
+class DatasetWriter:
+    """Appends serialized shards to every output file as they arrive"""
+
+    def __init__(self, output_dir, formats):
+        os.makedirs(output_dir, exist_ok=True)
+        self.paths = [os.path.join(output_dir, OUTPUT_FILES[fmt]) for fmt in formats]
+        self.files = {fmt: open(path, "w", newline="", encoding="utf-8")
+                      for fmt, path in zip(formats, self.paths)}
+        self.stats = DatasetStats()
+        if "csv" in self.files:
+            csv.DictWriter(self.files["csv"], fieldnames=FIELDS).writeheader()
+        if "json" in self.files:
+            self.files["json"].write("[")
+
+    def write(self, texts, stats):
+        for fmt, text in texts.items():
+            if not text:
+                continue
+            if fmt == "json":
+                text = ("\n" if self.stats.total == 0 else ",\n") + text
+            self.files[fmt].write(text)
+        self.stats.merge(stats)
+
+    def close(self):
+        if "json" in self.files:
+            self.files["json"].write("\n]" if self.stats.total else "]")
+        for f in self.files.values():
+            f.close()
+
+def write_dataset(output_dir, num_students_per_branch=100, years=("23",), formats=tuple(OUTPUT_FILES),
+                  workers=1, seed=None):
+    """
+    Generate and write the dataset shard by shard, in parallel when workers > 1.
+    At most two shards per worker are in flight, so memory stays flat.
+    """
+    writer = DatasetWriter(output_dir, formats)
+    shards = plan_shards(num_students_per_branch, years)
+    try:
+        if workers <= 1:
+            for shard in shards:
+                writer.write(*build_shard(shard, seed, formats))
+        else:
+            with multiprocessing.Pool(workers) as pool:
+                pending = collections.deque()
+                for shard in shards:
+                    pending.append(pool.apply_async(build_shard, (shard, seed, formats)))
+                    if len(pending) >= 2 * workers:
+                        writer.write(*pending.popleft().get())
+                while pending:
+                    writer.write(*pending.popleft().get())
+    finally:
+        writer.close()
+    return writer
+
+def save_dataset(students, output_dir, formats=tuple(OUTPUT_FILES)):
+    """Save an iterable of students in multiple formats, one shard-sized group at a time"""
+    writer = DatasetWriter(output_dir, formats)
+    group = []
+    for student in students:
+        group.append(student)
+        if len(group) >= SHARD_SIZE:
+            writer.write(*format_students(group, formats))
+            group = []
+    writer.write(*format_students(group, formats))
+    writer.close()
+    report_saved(writer, output_dir)
+
+def report_saved(writer, output_dir):
+    writer.stats.report()
     print(f"\n✅ Dataset saved to: {output_dir}")
-    print(f"   - students.json")
-    print(f"   - students.csv")
+    for path in writer.paths:
+        print(f"   - {os.path.basename(path)}")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Generate the synthetic BMSIT student dataset")
+    parser.add_argument("--per-branch", type=int, default=100, help="students per branch per batch year")
+    parser.add_argument("--years", nargs="+", default=["23"], help="two-digit batch years, e.g. 22 23")
+    parser.add_argument("--formats", nargs="+", choices=list(OUTPUT_FILES), default=list(OUTPUT_FILES))
+    parser.add_argument("--workers", type=int, default=1, help="generator processes")
+    parser.add_argument("--seed", type=int, help="seed for reproducible output (default: random)")
+    parser.add_argument("--output-dir", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "data"))
+    return parser.parse_args()
 
 if __name__ == "__main__":
-    # Generate dataset with 100 students per branch
+    args = parse_args()
     print("🎓 Generating BMSIT Student Dataset...")
-    students = generate_dataset(num_students_per_branch=100, year="23")
-    
-    # Save to ml directory
-    output_dir = os.path.join(os.path.dirname(__file__), "data")
-    save_dataset(students, output_dir)
+    writer = write_dataset(args.output_dir, args.per_branch, args.years, args.formats, args.workers, args.seed)
+    report_saved(writer, args.output_dir)
@@ -1,17 +1,34 @@
 """
 BMSIT-Specific Placement Data Generator
 Generates realistic placement data based on Indian engineering college parameters
+
+Every column is drawn as a whole array and the branch/CGPA-conditional
+distributions are applied with masks, so millions of rows take seconds.
+Large datasets are produced chunk by chunk and written straight to disk.
+
+Usage:
+    python generate_kaggle_data.py                          # 2000 rows -> data/bmsit_placement_data.csv
+    python generate_kaggle_data.py --rows 10000000 --output data/big.csv
+    python generate_kaggle_data.py --rows 1000000 --format parquet
 """
 
-import pandas as pd
-import numpy as np
+import argparse
 import os
 
-# Set random seed for reproducibility
-np.random.seed(42)
+import numpy as np
+import pandas as pd
+
+# Default seed for reproducibility
+SEED = 42
+
+# Rows generated per chunk; each chunk has its own random stream, so a given
+# seed always produces the same rows no matter how many are requested
+CHUNK_ROWS = 250_000
 
 # BMSIT-specific branches
 BRANCHES = ['CSE', 'ISE', 'ECE', 'EEE', 'ETE', 'AIML', 'Mechanical', 'Civil']
+BRANCH_WEIGHTS = [0.20, 0.15, 0.15, 0.10, 0.08, 0.12, 0.12, 0.08]
+TECH_BRANCHES = ['CSE', 'ISE', 'AIML']
 
 # Branch-wise placement rates (realistic Indian scenario)
 BRANCH_PLACEMENT_RATES = {
@@ -25,142 +42,195 @@ BRANCH_PLACEMENT_RATES = {
     'Civil': 0.40
 }
 
-def generate_dataset(n_samples=2000):
+COLUMNS = [
+    'Branch', 'Gender', 'CGPA', 'Backlogs', 'DSA_Score', 'Projects', 'LeetCode_Problems',
+    'Certifications', 'Internship', 'Communication_Score', 'PlacedOrNot'
+]
+
+BASE_RATES = np.array([BRANCH_PLACEMENT_RATES[b] for b in BRANCHES])
+IS_TECH = np.array([b in TECH_BRANCHES for b in BRANCHES])
+
+
+def choice(rng, values, p, size):
+    """Weighted draw of `size` values, returned as a compact integer array"""
+    return np.asarray(values, dtype=np.int8)[rng.choice(len(values), size=size, p=p)]
+
+
+def choice_where(rng, out, mask, values, p):
+    """Fill out[mask] with a weighted draw (one branch of a conditional distribution)"""
+    out[mask] = choice(rng, values, p, int(mask.sum()))
+
+
+def generate_chunk(n_samples, rng):
+    """Generate one chunk of the placement dataset as a DataFrame"""
+
+    # Basic demographics
+    branch = rng.choice(len(BRANCHES), size=n_samples, p=BRANCH_WEIGHTS).astype(np.int8)
+    tech = IS_TECH[branch]
+    gender = rng.choice(2, size=n_samples, p=[0.65, 0.35]).astype(np.int8)
+
+    # Academic performance
+    cgpa = np.clip(np.round(rng.normal(7.2, 1.2, n_samples), 2), 4.0, 10.0)  # Clamp between 4-10
+
+    # Number of backlogs (heavy penalty for placement)
+    backlogs = np.empty(n_samples, dtype=np.int8)
+    high = cgpa >= 8.0
+    mid = (cgpa >= 6.5) & ~high
+    choice_where(rng, backlogs, high, [0, 1], [0.95, 0.05])
+    choice_where(rng, backlogs, mid, [0, 1, 2], [0.75, 0.20, 0.05])
+    choice_where(rng, backlogs, ~(high | mid), [0, 1, 2, 3, 4], [0.40, 0.30, 0.15, 0.10, 0.05])
+
+    # Technical skills (India-specific)
+    # DSA Score (0-100) - very important for tech placements; int() truncates toward zero
+    dsa_score = rng.normal(np.where(tech, 55, 30), np.where(tech, 20, 15))
+    dsa_score = np.clip(np.trunc(dsa_score), 0, 100).astype(np.int8)
+
+    # Projects (0-5)
+    projects = np.empty(n_samples, dtype=np.int8)
+    choice_where(rng, projects, tech, [0, 1, 2, 3, 4, 5], [0.05, 0.15, 0.30, 0.30, 0.15, 0.05])
+    choice_where(rng, projects, ~tech, [0, 1, 2, 3], [0.15, 0.35, 0.35, 0.15])
+
+    # LeetCode/Coding Problems Solved
+    leetcode_problems = rng.exponential(np.where(tech, 80, 20))
+    leetcode_problems = np.minimum(leetcode_problems.astype(np.int64), 500).astype(np.int16)
+
+    # Technical Certifications (0-5)
+    certifications = choice(rng, [0, 1, 2, 3, 4], [0.20, 0.35, 0.30, 0.12, 0.03], n_samples)
+
+    # Internship (binary)
+    internship_rate = np.where(tech & (cgpa >= 7.0), 0.70, 0.40)
+    has_internship = (rng.random(n_samples) < internship_rate).astype(np.int8)
+
+    # Communication Score (1-5)
+    communication = choice(rng, [1, 2, 3, 4, 5], [0.05, 0.15, 0.40, 0.30, 0.10], n_samples)
+
+    # Calculate placement probability based on all factors
+    base_rate = BASE_RATES[branch]
+    cgpa_factor = np.clip((cgpa - 6.0) / 4.0, 0, 1)  # 0 to 1 scale
+    dsa_factor = dsa_score / 100.0
+    project_factor = projects / 5.0
+    leetcode_factor = np.minimum(leetcode_problems / 200.0, 1.0)
+    backlog_penalty = backlogs * 0.15
+
+    # Tech-heavy weights
+    tech_prob = (
+        base_rate * 0.12 +
+        cgpa_factor * 0.22 +
+        dsa_factor * 0.22 +
+        project_factor * 0.12 +
+        leetcode_factor * 0.08 +
+        has_internship * 0.15 +
+        (communication / 5.0) * 0.09
+    )
+    # Core branches - more weight on CGPA and basics
+    core_prob = (
+        base_rate * 0.20 +
+        cgpa_factor * 0.28 +
+        dsa_factor * 0.08 +
+        project_factor * 0.08 +
+        has_internship * 0.18 +
+        (communication / 5.0) * 0.08 +
+        (certifications / 4.0) * 0.10
+    )
+    placement_prob = np.clip(np.where(tech, tech_prob, core_prob) - backlog_penalty, 0.05, 0.95)
+
+    # Determine placement
+    placed = (rng.random(n_samples) < placement_prob).astype(np.int8)
+
+    return pd.DataFrame({
+        'Branch': pd.Categorical.from_codes(branch, BRANCHES),
+        'Gender': pd.Categorical.from_codes(gender, ['Male', 'Female']),
+        'CGPA': cgpa,
+        'Backlogs': backlogs,
+        'DSA_Score': dsa_score,
+        'Projects': projects,
+        'LeetCode_Problems': leetcode_problems,
+        'Certifications': certifications,
+        'Internship': has_internship,
+        'Communication_Score': communication,
+        'PlacedOrNot': placed
+    }, columns=COLUMNS)
+
+
+def generate_chunks(n_samples, seed=SEED, chunk_rows=CHUNK_ROWS):
+    """Yield the dataset as DataFrames of at most chunk_rows rows"""
+    for index, start in enumerate(range(0, n_samples, chunk_rows)):
+        rng = np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(index,)))
+        yield generate_chunk(min(chunk_rows, n_samples - start), rng)
+
+
+def generate_dataset(n_samples=2000, seed=SEED):
     """Generate placement dataset with India-specific features"""
-    
-    data = []
-    
-    for _ in range(n_samples):
-        # Basic demographics
-        branch = np.random.choice(BRANCHES, p=[0.20, 0.15, 0.15, 0.10, 0.08, 0.12, 0.12, 0.08])
-        gender = np.random.choice(['Male', 'Female'], p=[0.65, 0.35])
-        
-        # Academic performance
-        cgpa = round(np.random.normal(7.2, 1.2), 2)
-        cgpa = max(4.0, min(10.0, cgpa))  # Clamp between 4-10
-        
-        # Number of backlogs (heavy penalty for placement)
-        if cgpa >= 8.0:
-            backlogs = np.random.choice([0, 1], p=[0.95, 0.05])
-        elif cgpa >= 6.5:
-            backlogs = np.random.choice([0, 1, 2], p=[0.75, 0.20, 0.05])
-        else:
-            backlogs = np.random.choice([0, 1, 2, 3, 4], p=[0.40, 0.30, 0.15, 0.10, 0.05])
-        
-        # Technical skills (India-specific)
-        # DSA Score (0-100) - very important for tech placements
-        if branch in ['CSE', 'ISE', 'AIML']:
-            dsa_score = int(np.random.normal(55, 20))
-        else:
-            dsa_score = int(np.random.normal(30, 15))
-        dsa_score = max(0, min(100, dsa_score))
-        
-        # Projects (0-5)
-        if branch in ['CSE', 'ISE', 'AIML']:
-            projects = np.random.choice([0, 1, 2, 3, 4, 5], p=[0.05, 0.15, 0.30, 0.30, 0.15, 0.05])
-        else:
-            projects = np.random.choice([0, 1, 2, 3], p=[0.15, 0.35, 0.35, 0.15])
-        
-        # LeetCode/Coding Problems Solved
-        if branch in ['CSE', 'ISE', 'AIML']:
-            leetcode_problems = int(np.random.exponential(80))
-        else:
-            leetcode_problems = int(np.random.exponential(20))
-        leetcode_problems = min(500, leetcode_problems)
-        
-        # Technical Certifications (0-5)
-        certifications = np.random.choice([0, 1, 2, 3, 4], p=[0.20, 0.35, 0.30, 0.12, 0.03])
-        
-        # Internship (binary)
-        if branch in ['CSE', 'ISE', 'AIML'] and cgpa >= 7.0:
-            has_internship = np.random.choice([0, 1], p=[0.30, 0.70])
-        else:
-            has_internship = np.random.choice([0, 1], p=[0.60, 0.40])
-        
-        # Communication Score (1-5)
-        communication = np.random.choice([1, 2, 3, 4, 5], p=[0.05, 0.15, 0.40, 0.30, 0.10])
-        
-        # Calculate placement probability based on all factors
-        base_rate = BRANCH_PLACEMENT_RATES[branch]
-        
-        # CGPA impact (major factor)
-        cgpa_factor = (cgpa - 6.0) / 4.0  # 0 to 1 scale
-        cgpa_factor = max(0, min(1, cgpa_factor))
-        
-        # DSA impact (very important for tech)
-        dsa_factor = dsa_score / 100.0
-        
-        # Projects impact
-        project_factor = projects / 5.0
-        
-        # LeetCode impact
-        leetcode_factor = min(leetcode_problems / 200.0, 1.0)
-        
-        # Backlogs penalty
-        backlog_penalty = backlogs * 0.15
-        
-        # Combined probability
-        if branch in ['CSE', 'ISE', 'AIML']:
-            # Tech-heavy weights
-            placement_prob = (
-                base_rate * 0.12 +
-                cgpa_factor * 0.22 +
-                dsa_factor * 0.22 +
-                project_factor * 0.12 +
-                leetcode_factor * 0.08 +
-                has_internship * 0.15 +  # Increased from 0.05 to 0.15
-                (communication / 5.0) * 0.09
-            ) - backlog_penalty
-        else:
-            # Core branches - more weight on CGPA and basics
-            placement_prob = (
-                base_rate * 0.20 +
-                cgpa_factor * 0.28 +
-                dsa_factor * 0.08 +
-                project_factor * 0.08 +
-                has_internship * 0.18 +  # Increased from 0.10 to 0.18
-                (communication / 5.0) * 0.08 +
-                (certifications / 4.0) * 0.10
-            ) - backlog_penalty
-        
-        placement_prob = max(0.05, min(0.95, placement_prob))
-        
-        # Determine placement
-        placed = 1 if np.random.random() < placement_prob else 0
-        
-        data.append({
-            'Branch': branch,
-            'Gender': gender,
-            'CGPA': cgpa,
-            'Backlogs': backlogs,
-            'DSA_Score': dsa_score,
-            'Projects': projects,
-            'LeetCode_Problems': leetcode_problems,
-            'Certifications': certifications,
-            'Internship': has_internship,
-            'Communication_Score': communication,
-            'PlacedOrNot': placed
-        })
-    
-    return pd.DataFrame(data)
+    return pd.concat(list(generate_chunks(n_samples, seed)), ignore_index=True)
+
+
+def write_chunks(output_path, chunks, file_format='csv'):
+    """Write DataFrame chunks to one file; returns (rows, placed) for the summary"""
+    if file_format == 'parquet':
+        # Optional dependency, only needed for Parquet output
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("Parquet output needs pyarrow: pip install pyarrow")
+
+    rows = placed = 0
+    writer = None
+    try:
+        for chunk in chunks:
+            if file_format == 'parquet':
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(output_path, table.schema)
+                writer.write_table(table)
+            else:
+                chunk.to_csv(output_path, mode='w' if rows == 0 else 'a', header=rows == 0, index=False)
+            rows += len(chunk)
+            placed += int(chunk['PlacedOrNot'].sum())
+    finally:
+        if writer is not None:
+            writer.close()
+    return rows, placed
+
+
+def write_dataset(output_path, n_samples, seed=SEED, file_format='csv'):
+    """
+    Generate and write the dataset chunk by chunk, so memory stays at one
+    chunk whatever the row count. Returns (rows, placed) for the summary.
+    """
+    return write_chunks(output_path, generate_chunks(n_samples, seed), file_format)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Generate the BMSIT placement dataset')
+    parser.add_argument('--rows', type=int, default=2000, help='number of students to generate')
+    parser.add_argument('--seed', type=int, default=SEED)
+    parser.add_argument('--format', choices=['csv', 'parquet'], default='csv')
+    parser.add_argument('--output', help='output file (default: data/bmsit_placement_data.<format>)')
+    return parser.parse_args()
+
 
 if __name__ == "__main__":
-    # Generate dataset
-    print("🎓 Generating BMSIT Placement Dataset...")
-    df = generate_dataset(2000)
-    
+    args = parse_args()
+
     # Create output directory
     output_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
-    os.makedirs(output_dir, exist_ok=True)
-    
-    # Save dataset
-    output_path = os.path.join(output_dir, 'bmsit_placement_data.csv')
-    df.to_csv(output_path, index=False)
-    
+    output_path = args.output or os.path.join(output_dir, f'bmsit_placement_data.{args.format}')
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+
+    # Generate and save dataset; a single chunk is kept for the sample printout
+    print("🎓 Generating BMSIT Placement Dataset...")
+    df = generate_dataset(args.rows, args.seed) if args.rows <= CHUNK_ROWS else None
+    if df is not None:
+        rows, placed = write_chunks(output_path, [df], args.format)
+    else:
+        rows, placed = write_dataset(output_path, args.rows, args.seed, args.format)
+
     print(f"✅ Dataset saved to: {output_path}")
-    print(f"📊 Total records: {len(df)}")
-    print(f"📈 Placement rate: {df['PlacedOrNot'].mean()*100:.1f}%")
-    print("\n📋 Sample data:")
-    print(df.head(10).to_string())
-    print("\n📊 Branch-wise placement rates:")
-    print(df.groupby('Branch')['PlacedOrNot'].mean().sort_values(ascending=False))
+    print(f"📊 Total records: {rows}")
+    print(f"📈 Placement rate: {placed / max(rows, 1) * 100:.1f}%")
+    if df is not None:
+        print("\n📋 Sample data:")
+        print(df.head(10).to_string())
+        print("\n📊 Branch-wise placement rates:")
+        print(df.groupby('Branch', observed=True)['PlacedOrNot'].mean().sort_values(ascending=False))
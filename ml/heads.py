@@ -0,0 +1,157 @@
+"""
+Outcome Heads
+Two models served next to the placement classifier: a package (LPA)
+regressor and a company-tier classifier, trained on the placed students in
+ml/data/students.csv. Both answer "if placed, then what": the API only fills
+them in for students the placement model predicts placed, and training drops
+a head that does not beat a constant baseline.
+They take the placement model's encoded feature block and its scaler, so
+one encoding pass (and, on the flat engine, the scaler folded into every
+head's thresholds) feeds all three outputs.
+
+students.csv has no DSA, LeetCode or communication scores. Those columns are
+filled with the placement scaler's means, i.e. 0 once scaled, so the heads
+never split on them and read the same feature block as the placement model.
+"""
+
+import os
+import pickle
+
+import numpy as np
+
+from features import FEATURE_COLS, compile_encoders
+
+HEADS_FILE = 'outcome_heads.pkl'
+# Training-only modules (data_loading pulls in pandas) are imported where they are used,
+# so the API can load and serve the heads without them
+STUDENTS_CSV = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'students.csv')
+
+# Model feature -> students.csv column; the rest are filled (see above)
+STUDENT_FEATURES = {
+    'Branch': 'branch',
+    'Gender': 'gender',
+    'CGPA': 'cgpa',
+    'Backlogs': 'backlogs',
+    'Projects': 'num_projects',
+    'Certifications': 'num_certifications',
+    'Internship': 'has_internship',
+}
+
+# students.csv has a few hundred rows: shallower trees with much larger leaves than the placement
+# forest (package varies mostly with the employer, which the features barely predict)
+HEAD_PARAMS = {'n_estimators': 100, 'max_depth': 8, 'min_samples_leaf': 10, 'random_state': 42}
+
+
+def company_tier(company):
+    """Tier of one employer (None or '' = not placed)"""
+    from generate_dataset import DREAM_COMPANIES, MASS_RECRUITERS
+    if not company:
+        return 'not_placed'
+    if company in DREAM_COMPANIES:
+        return 'dream'
+    if company in MASS_RECRUITERS:
+        return 'mass'
+    return 'core'
+
+
+def student_features(df, scaler, encoders):
+    """Raw feature block (FEATURE_COLS order) for a typed STUDENT_SCHEMA frame"""
+    tables = compile_encoders(encoders)
+    names = list(scaler.feature_names_in_)
+    columns = []
+    for feature in FEATURE_COLS:
+        column = STUDENT_FEATURES.get(feature)
+        if column is None:
+            columns.append(np.full(len(df), scaler.mean_[names.index(feature)]))
+        elif feature in tables:
+            columns.append(tables[feature].encode_column(df[column].astype(str).to_numpy())[0])
+        else:
+            columns.append(df[column].to_numpy(dtype=np.float64))
+    return np.column_stack(columns).astype(np.float64)
+
+
+def train_heads(scaler, encoders, csv_path=STUDENTS_CSV, test_size=0.2, require_baseline=True):
+    """
+    Fit both heads on the placed students in students.csv, in the placement
+    scaler's units: each predicts its outcome given placement.
+
+    Returns (heads, report). The report holds held-out MAE / R^2 (package) and
+    accuracy (tier) next to the constant predictors they must beat (training
+    mean, most common tier). With `require_baseline`, a head that does not beat
+    its baseline is left out of `heads` and marked 'served': False.
+    """
+    import pandas as pd
+    from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
+    from sklearn.metrics import accuracy_score, mean_absolute_error, r2_score
+    from sklearn.model_selection import train_test_split
+
+    from data_loading import STUDENT_SCHEMA, load_dataset
+
+    df, _ = load_dataset(csv_path, STUDENT_SCHEMA)
+    placed = df['placed'].to_numpy(dtype=bool)
+    X = scaler.transform(pd.DataFrame(student_features(df, scaler, encoders), columns=FEATURE_COLS))[placed]
+    tiers = np.array([company_tier(c) for c in df['company'].astype(object).where(df['company'].notna(), None)])[placed]
+    package = df['package_lpa'].to_numpy(dtype=np.float64)[placed]
+
+    X_train, X_test, tier_train, tier_test, package_train, package_test = train_test_split(
+        X, tiers, package, test_size=test_size, random_state=42, stratify=tiers
+    )
+    tier_model = RandomForestClassifier(**HEAD_PARAMS).fit(X_train, tier_train)
+    package_model = RandomForestRegressor(**HEAD_PARAMS).fit(X_train, package_train)
+
+    predicted = package_model.predict(X_test)
+    tiers_seen, tier_counts = np.unique(tier_train, return_counts=True)
+    report = {
+        'rows': len(df),
+        'placed_rows': int(placed.sum()),
+        'package': {
+            'mae_lpa': round(float(mean_absolute_error(package_test, predicted)), 3),
+            'r2': round(float(r2_score(package_test, predicted)), 3),
+            'baseline_mae_lpa': round(float(np.abs(package_test - package_train.mean()).mean()), 3)
+        },
+        'tier': {
+            'accuracy': round(float(accuracy_score(tier_test, tier_model.predict(X_test))), 4),
+            'baseline_accuracy': round(float(np.mean(tier_test == tiers_seen[np.argmax(tier_counts)])), 4),
+            'classes': [str(c) for c in tier_model.classes_]
+        }
+    }
+    report['package']['served'] = report['package']['mae_lpa'] < report['package']['baseline_mae_lpa']
+    report['tier']['served'] = report['tier']['accuracy'] > report['tier']['baseline_accuracy']
+
+    # Refit on every placed student for serving
+    tier_model.fit(X, tiers)
+    package_model.fit(X, package)
+    heads = {'package': package_model, 'tier': tier_model}
+    if require_baseline:
+        heads = {name: head for name, head in heads.items() if report[name]['served']}
+    return heads, report
+
+
+def save_heads(model_dir, heads):
+    with open(os.path.join(model_dir, HEADS_FILE), 'wb') as f:
+        pickle.dump(heads, f)
+
+
+def load_heads(model_dir):
+    """The pickled heads, or None when the models were trained without them"""
+    path = os.path.join(model_dir, HEADS_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path, 'rb') as f:
+        return pickle.load(f)
+
+
+def head_outputs(placed, package=None, tier_proba=None, tier_classes=None):
+    """
+    Response fields for one row from the heads being served. Both heads are
+    conditional on placement, so for a student predicted not placed they are None.
+    """
+    fields = {}
+    if package is not None:
+        fields['package_lpa'] = round(float(package), 2) if placed else None
+    if tier_proba is not None:
+        fields['company_tier'] = {
+            'tier': str(tier_classes[int(np.argmax(tier_proba))]),
+            'probabilities': {str(c): round(float(p) * 100, 2) for c, p in zip(tier_classes, tier_proba)}
+        } if placed else None
+    return fields
@@ -0,0 +1,114 @@
+"""
+Micro-batching for Concurrent Predictions
+Collects requests that arrive within a short window and scores them as one block
+"""
+
+import asyncio
+import time
+
+import numpy as np
+
+
+class QueueFullError(Exception):
+    """Raised when the pending queue is at max depth (caller should answer 503)"""
+
+
+class MicroBatcher:
+    """
+    asyncio front end for a vectorized scoring function.
+
+    `score_fn(group, features, branches)` takes a stacked (n, n_features) block
+    and returns one result per row. Requests are gathered until `max_batch`
+    rows are waiting or `window_ms` has passed since the first one, then scored
+    in a worker thread so the event loop keeps accepting connections meanwhile.
+    Rows are only stacked with rows of the same group (e.g. model version).
+    """
+
+    def __init__(self, score_fn, window_ms=2.0, max_batch=64, max_queue=1024):
+        self.score_fn = score_fn
+        self.window = window_ms / 1000.0
+        self.max_batch = max_batch
+        self.max_queue = max_queue
+        self._queue = None
+        self._task = None
+        self.batches = 0
+        self.rows = 0
+        self.rejected = 0
+
+    async def start(self):
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def submit(self, row, branch, group=None):
+        """Queue one encoded feature row and wait for its result"""
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self._queue.put_nowait((row, branch, group, future))
+        except asyncio.QueueFull:
+            self.rejected += 1
+            raise QueueFullError(f"Prediction queue is full ({self.max_queue} pending)")
+        return await future
+
+    async def _collect(self):
+        """Wait for one request, then gather more until the window closes or the batch is full"""
+        batch = [await self._queue.get()]
+        deadline = time.monotonic() + self.window
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            # Drop requests whose callers already went away
+            batch = [item for item in batch if not item[3].cancelled()]
+            # A model swap inside the window splits the batch by version
+            groups = {}
+            for item in batch:
+                groups.setdefault(id(item[2]), []).append(item)
+            for items in groups.values():
+                await self._score(loop, items)
+
+    async def _score(self, loop, items):
+        features = np.stack([row for row, _, _, _ in items])
+        branches = [branch for _, branch, _, _ in items]
+        try:
+            results = await loop.run_in_executor(None, self.score_fn, items[0][2], features, branches)
+        except Exception as e:
+            for *_, future in items:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        self.batches += 1
+        self.rows += len(items)
+        for (*_, future), result in zip(items, results):
+            if not future.done():
+                future.set_result(result)
+
+    def stats(self):
+        return {
+            'window_ms': self.window * 1000,
+            'max_batch': self.max_batch,
+            'max_queue': self.max_queue,
+            'queued': self._queue.qsize() if self._queue is not None else 0,
+            'batches': self.batches,
+            'rows': self.rows,
+            'mean_batch_size': round(self.rows / self.batches, 2) if self.batches else 0.0,
+            'rejected': self.rejected
+        }
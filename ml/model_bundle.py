@@ -0,0 +1,173 @@
+"""
+Model Bundle Format
+Versioned, pickle-free model artifacts: one .npy file per array plus a JSON
+manifest with checksums. Arrays are opened with mmap_mode='r' so every worker
+process maps the same page-cache pages instead of holding a private copy.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import time
+
+import numpy as np
+
+from features import CATEGORY_ALIASES, CategoryTable, UNKNOWN_FALLBACKS
+from flat_forest import CompactForest, FlatForest
+
+BUNDLE_DIR = 'bundle'
+MANIFEST_FILE = 'manifest.json'
+FORMAT_VERSION = 1
+
+# Forest classes by the layout name stored in the manifest (absent = 'flat')
+FOREST_LAYOUTS = {cls.LAYOUT: cls for cls in (FlatForest, CompactForest)}
+
+
+class BundleError(Exception):
+    """Raised when a bundle is missing, from another format version or corrupt"""
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def write_bundle(bundle_path, forest, scaler_mean, scaler_scale, categories, metadata, heads=None):
+    """
+    Write a bundle directory atomically.
+
+    `categories` maps a column name to its list of classes in encoder order.
+    `heads` maps an output name (see heads.py) to a FlatForest over the same
+    inputs as `forest`. The bundle is written to a temporary directory and
+    renamed into place, so readers never see a half-written bundle.
+    """
+    heads = heads or {}
+    arrays = {f'forest_{name}': getattr(forest, name) for name in forest.ARRAYS}
+    for head, head_forest in heads.items():
+        arrays.update({f'head_{head}_{name}': getattr(head_forest, name) for name in head_forest.ARRAYS})
+    arrays['scaler_mean'] = np.asarray(scaler_mean, dtype=np.float64)
+    arrays['scaler_scale'] = np.asarray(scaler_scale, dtype=np.float64)
+    for col, classes in categories.items():
+        arrays[f'category_{col}'] = np.asarray(classes, dtype=str)
+
+    tmp_path = f"{bundle_path}.tmp-{os.getpid()}"
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    os.makedirs(tmp_path)
+
+    files = {}
+    for name, array in arrays.items():
+        filename = f'{name}.npy'
+        np.save(os.path.join(tmp_path, filename), np.ascontiguousarray(array), allow_pickle=False)
+        files[name] = {
+            'file': filename,
+            'dtype': str(array.dtype),
+            'shape': list(array.shape),
+            'sha256': file_sha256(os.path.join(tmp_path, filename))
+        }
+
+    manifest = {
+        'format_version': FORMAT_VERSION,
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'checksum': bundle_checksum(files),
+        'forest': {
+            'layout': forest.LAYOUT,
+            'max_depth': forest.max_depth,
+            'raw_inputs': forest.raw_inputs,
+            'n_trees': forest.n_trees,
+            'n_nodes': forest.n_nodes
+        },
+        'heads': {
+            head: {
+                'layout': head_forest.LAYOUT,
+                'max_depth': head_forest.max_depth,
+                'raw_inputs': head_forest.raw_inputs,
+                'n_trees': head_forest.n_trees,
+                'n_nodes': head_forest.n_nodes
+            }
+            for head, head_forest in heads.items()
+        },
+        'categories': {col: list(classes) for col, classes in categories.items()},
+        'metadata': metadata,
+        'files': files
+    }
+    with open(os.path.join(tmp_path, MANIFEST_FILE), 'w') as f:
+        json.dump(manifest, f, indent=2)
+
+    old_path = f"{bundle_path}.old-{os.getpid()}"
+    if os.path.exists(bundle_path):
+        os.rename(bundle_path, old_path)
+    os.rename(tmp_path, bundle_path)
+    shutil.rmtree(old_path, ignore_errors=True)
+    return manifest
+
+
+def bundle_checksum(files):
+    """Checksum over every array file's hash; identifies the bundle as a whole"""
+    digest = hashlib.sha256()
+    for name in sorted(files):
+        digest.update(f"{name}:{files[name]['sha256']}\n".encode())
+    return digest.hexdigest()
+
+
+class ModelBundle:
+    """Loaded bundle: flat forest, scaler parameters, category tables and metadata"""
+
+    def __init__(self, path, manifest, arrays):
+        self.path = path
+        self.manifest = manifest
+        self.metadata = manifest.get('metadata', {})
+        self.checksum = manifest['checksum']
+        self.forest = build_forest(manifest['forest'], arrays, 'forest_')
+        # Bundles written before outcome heads existed have no 'heads' entry
+        self.heads = {
+            head: build_forest(info, arrays, f'head_{head}_')
+            for head, info in manifest.get('heads', {}).items()
+        }
+        self.scaler_mean = arrays['scaler_mean']
+        self.scaler_scale = arrays['scaler_scale']
+        self.encoders = {
+            col: CategoryTable(list(classes), CATEGORY_ALIASES.get(col), UNKNOWN_FALLBACKS.get(col))
+            for col, classes in manifest['categories'].items()
+        }
+
+
+def build_forest(info, arrays, prefix):
+    """Forest object for one manifest entry, over the arrays named prefix + array name"""
+    layout = info.get('layout', FlatForest.LAYOUT)
+    if layout not in FOREST_LAYOUTS:
+        raise BundleError(f"Unknown forest layout '{layout}'")
+    forest_cls = FOREST_LAYOUTS[layout]
+    return forest_cls(
+        max_depth=info['max_depth'],
+        raw_inputs=info['raw_inputs'],
+        **{name: arrays[f'{prefix}{name}'] for name in forest_cls.ARRAYS}
+    )
+
+
+def load_bundle(bundle_path, mmap=True, verify=True):
+    """Open a bundle, checking format version and (optionally) every file's checksum"""
+    manifest_path = os.path.join(bundle_path, MANIFEST_FILE)
+    if not os.path.exists(manifest_path):
+        raise BundleError(f"No bundle manifest at {manifest_path}")
+    with open(manifest_path, 'r') as f:
+        manifest = json.load(f)
+    if manifest.get('format_version') != FORMAT_VERSION:
+        raise BundleError(f"Unsupported bundle format {manifest.get('format_version')} (expected {FORMAT_VERSION})")
+    if bundle_checksum(manifest['files']) != manifest['checksum']:
+        raise BundleError("Bundle manifest checksum mismatch")
+
+    arrays = {}
+    for name, info in manifest['files'].items():
+        path = os.path.join(bundle_path, info['file'])
+        if verify and file_sha256(path) != info['sha256']:
+            raise BundleError(f"Checksum mismatch for {info['file']}")
+        array = np.load(path, mmap_mode='r' if mmap else None, allow_pickle=False)
+        if str(array.dtype) != info['dtype'] or list(array.shape) != info['shape']:
+            raise BundleError(f"{info['file']} does not match the manifest")
+        # Plain ndarray view of the mapping (indexing a np.memmap is slower)
+        arrays[name] = array.view(np.ndarray)
+    return ModelBundle(bundle_path, manifest, arrays)
@@ -0,0 +1,304 @@
+"""
+Model Registry
+Loads versioned model artifacts, validates them and swaps them in atomically,
+keeping the previous version around for instant rollback
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import threading
+import time
+
+import numpy as np
+
+from attributions import TreeExplainer
+from features import FEATURE_COLS, build_feature_block, compile_encoders
+from flat_forest import FlatForest
+from heads import load_heads
+from model_bundle import BUNDLE_DIR, load_bundle
+
+VALIDATION_ROWS = 64
+# Files in the models directory that are not part of a model version; the API
+# watches them itself (similarity.IndexFile, drift.DriftMonitor)
+UNVERSIONED_FILES = ('similarity_index.npz', 'drift_reference.json')
+
+
+def artifact_fingerprint(model_dir):
+    """
+    (path, mtime, size) of every artifact file under the models directory.
+    Changes whenever artifacts are rewritten; half-written bundle directories
+    (.tmp-*/.old-*), temporary files and UNVERSIONED_FILES are ignored.
+    """
+    entries = []
+    for root, dirs, files in os.walk(model_dir):
+        dirs[:] = sorted(d for d in dirs if '.tmp-' not in d and '.old-' not in d)
+        for name in sorted(files):
+            if name.startswith(UNVERSIONED_FILES) or '.tmp-' in name:
+                continue
+            path = os.path.join(root, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((os.path.relpath(path, model_dir), stat.st_mtime_ns, stat.st_size))
+    return tuple(entries)
+
+
+class ModelVersion:
+    """
+    One immutable, fully loaded set of artifacts.
+
+    Request handlers take a reference to a version once and use it for the
+    whole request, so a swap never mixes two models inside one response.
+    """
+
+    def __init__(self, version_id, source, encoders, metadata, forest=None, model=None, scaler=None, bundle=None,
+                 heads=None):
+        self.id = version_id
+        self.source = source
+        self.encoders = encoders
+        self.metadata = metadata
+        self.forest = forest
+        self.model = model
+        self.scaler = scaler
+        self.bundle = bundle
+        # Outcome heads (heads.py) over the same inputs as the placement model:
+        # flat forests on the flat engine, sklearn models otherwise
+        self.heads = heads or {}
+        # Path contributions are precomputed here, once per version, for forests only
+        self.explainer = None
+        if forest is not None:
+            self.explainer = TreeExplainer(forest, len(FEATURE_COLS))
+        elif FlatForest.supports(model):
+            self.explainer = TreeExplainer(FlatForest.from_sklearn(model), len(FEATURE_COLS))
+        self.loaded_at = time.time()
+
+    @property
+    def engine(self):
+        return 'flat' if self.forest is not None else 'sklearn'
+
+    def transform(self, features):
+        """Model inputs for a raw feature block"""
+        if self.forest is not None:
+            # Split thresholds are already in raw units, no transform pass needed
+            return features
+        return self.scale(features)
+
+    def scale(self, features):
+        """Scaled copy of a raw feature block (the scaler was fitted on a named frame)"""
+        # Only the pickle/sklearn path scales, so pandas stays off the startup path
+        import pandas as pd
+        return self.scaler.transform(pd.DataFrame(features, columns=FEATURE_COLS))
+
+    def infer(self, inputs):
+        """Class probabilities for a block returned by transform()"""
+        if self.forest is not None:
+            return self.forest.predict_proba(inputs)
+        return self.model.predict_proba(inputs)
+
+    def infer_heads(self, inputs):
+        """
+        Every head's output for a block returned by transform(): predicted
+        values for regressors, class probabilities (in head_classes order) for classifiers
+        """
+        outputs = {}
+        for name, head in self.heads.items():
+            if isinstance(head, FlatForest):
+                outputs[name] = head.predict_proba(inputs) if len(head.classes) else head.predict_value(inputs)
+            else:
+                outputs[name] = head.predict_proba(inputs) if hasattr(head, 'classes_') else head.predict(inputs)
+        return outputs
+
+    def head_classes(self, name):
+        head = self.heads[name]
+        return head.classes if isinstance(head, FlatForest) else head.classes_
+
+    def scaler_params(self):
+        """The training scaler's (mean, scale), in FEATURE_COLS order"""
+        if self.bundle is not None:
+            return self.bundle.scaler_mean, self.bundle.scaler_scale
+        return self.scaler.mean_, self.scaler.scale_
+
+    def predict_proba(self, features):
+        """Class probabilities for every row of a raw (unscaled) feature block"""
+        return self.infer(self.transform(features))
+
+    def explain(self, features):
+        """Per-row positive-class contributions for a raw feature block (None if not a forest)"""
+        if self.explainer is None:
+            return None
+        if self.explainer.forest.raw_inputs:
+            return self.explainer.explain(features)
+        return self.explainer.explain(self.scale(features))
+
+    def describe(self):
+        return {
+            'version': self.id,
+            'source': self.source,
+            'engine': self.engine,
+            'loaded_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(self.loaded_at)),
+            'accuracy': self.metadata.get('accuracy'),
+            'heads': sorted(self.heads)
+        }
+
+
+def load_pickles(model_dir):
+    """Legacy artifacts: sklearn model, scaler and LabelEncoders"""
+    with open(os.path.join(model_dir, 'placement_model.pkl'), 'rb') as f:
+        model = pickle.load(f)
+    with open(os.path.join(model_dir, 'scaler.pkl'), 'rb') as f:
+        scaler = pickle.load(f)
+    with open(os.path.join(model_dir, 'encoders.pkl'), 'rb') as f:
+        # Compiled into dict lookups so requests never call LabelEncoder.transform
+        encoders = compile_encoders(pickle.load(f))
+    return model, scaler, encoders
+
+
+def load_model_version(model_dir, engine='flat', verify=True):
+    """Load whatever artifacts model_dir currently holds, preferring the mmap bundle"""
+    bundle_path = os.path.join(model_dir, BUNDLE_DIR)
+    if engine == 'flat' and os.path.exists(bundle_path):
+        # No pickle.load at all: node tables are memory-mapped and shared between workers
+        bundle = load_bundle(bundle_path, verify=verify)
+        forest = bundle.forest
+        heads = dict(bundle.heads)
+        if not forest.raw_inputs:
+            forest = forest.fold_scaler(bundle.scaler_mean, bundle.scaler_scale)
+            heads = {name: head.fold_scaler(bundle.scaler_mean, bundle.scaler_scale) for name, head in heads.items()}
+        return ModelVersion(
+            bundle.checksum[:12], 'bundle', bundle.encoders, bundle.metadata,
+            forest=forest, bundle=bundle, heads=heads
+        )
+
+    model, scaler, encoders = load_pickles(model_dir)
+    with open(os.path.join(model_dir, 'model_metadata.json'), 'r') as f:
+        metadata = json.load(f)
+    files = [f for f in artifact_fingerprint(model_dir) if f[0].endswith('.pkl')]
+    version_id = hashlib.sha256(repr(files).encode()).hexdigest()[:12]
+    heads = load_heads(model_dir) or {}
+    forest = None
+    if engine == 'flat' and FlatForest.supports(model):
+        # No exported bundle yet: compile the pickled forest (takes a moment longer)
+        forest = FlatForest.from_sklearn(model).fold_scaler(scaler.mean_, scaler.scale_)
+        heads = {
+            name: FlatForest.from_sklearn(head).fold_scaler(scaler.mean_, scaler.scale_)
+            for name, head in heads.items()
+        }
+    return ModelVersion(version_id, 'pickle', encoders, metadata, forest=forest, model=model, scaler=scaler, heads=heads)
+
+
+def validate_version(version, n_rows=VALIDATION_ROWS):
+    """Warm up a freshly loaded version and sanity check its output before it takes traffic"""
+    if version.forest is not None and int(version.forest.feature.max()) >= len(FEATURE_COLS):
+        raise ValueError("Model expects more features than the API provides")
+    features, _, _, _ = build_feature_block([{}] * n_rows, version.encoders)
+    probabilities = version.predict_proba(features)
+    version.predict_proba(features[:1])
+    if probabilities.shape != (n_rows, 2) or not np.all(np.isfinite(probabilities)):
+        raise ValueError("Model returned malformed probabilities")
+    if not np.allclose(probabilities.sum(axis=1), 1.0):
+        raise ValueError("Model probabilities do not sum to 1")
+    for name, output in version.infer_heads(version.transform(features)).items():
+        if len(output) != n_rows or not np.all(np.isfinite(output)):
+            raise ValueError(f"Outcome head '{name}' returned malformed output")
+
+
+class ModelRegistry:
+    """
+    Holds the serving version plus the previous one.
+
+    `reload()` loads and validates in the calling thread and only then swaps
+    the `current` reference, which is a single atomic assignment; requests
+    that already picked up the old version finish on it. A background watcher
+    calls `reload()` when the files in the models directory change.
+    """
+
+    def __init__(self, model_dir, engine='flat', verify=True, validation_rows=VALIDATION_ROWS, on_swap=None):
+        self.model_dir = model_dir
+        self.engine = engine
+        self.verify = verify
+        self.validation_rows = validation_rows
+        self.on_swap = on_swap
+        self.current = None
+        self.previous = None
+        self.last_error = None
+        self.reloads = 0
+        self.failed_reloads = 0
+        self._lock = threading.Lock()
+        self._fingerprint = None
+        self._watch_pid = None
+
+    def reload(self, force=False):
+        """Load the artifacts on disk and swap them in; returns the serving version"""
+        with self._lock:
+            fingerprint = artifact_fingerprint(self.model_dir)
+            if not force and self.current is not None and fingerprint == self._fingerprint:
+                return self.current
+            try:
+                version = load_model_version(self.model_dir, self.engine, self.verify)
+                validate_version(version, self.validation_rows)
+            except Exception as e:
+                self.failed_reloads += 1
+                self.last_error = f"{type(e).__name__}: {e}"
+                print(f"❌ Model reload failed, keeping {self.current.id if self.current else 'no model'}: {self.last_error}")
+                raise
+            self._fingerprint = fingerprint
+            if self.current is not None and version.id == self.current.id:
+                return self.current
+            self.previous, self.current = self.current, version
+            self.reloads += 1
+            self.last_error = None
+        print(f"🔁 Serving model {version.id} ({version.source}, {version.engine})")
+        if self.on_swap:
+            self.on_swap(version)
+        return version
+
+    def rollback(self):
+        """Swap back to the previous version (and make the current one the fallback)"""
+        with self._lock:
+            if self.previous is None:
+                raise LookupError("No previous model version to roll back to")
+            self.current, self.previous = self.previous, self.current
+            version = self.current
+        print(f"⏪ Rolled back to model {version.id}")
+        if self.on_swap:
+            self.on_swap(version)
+        return version
+
+    def watch(self, interval):
+        """Poll the models directory in a daemon thread (once per process, so it survives forking)"""
+        if interval <= 0 or self._watch_pid == os.getpid():
+            return
+        self._watch_pid = os.getpid()
+        thread = threading.Thread(target=self._watch_loop, args=(interval,), daemon=True, name='model-watcher')
+        thread.start()
+
+    def _watch_loop(self, interval):
+        pending = None
+        while True:
+            time.sleep(interval)
+            fingerprint = artifact_fingerprint(self.model_dir)
+            if fingerprint == self._fingerprint:
+                pending = None
+                continue
+            # Trainers write several files; wait until the directory stops changing
+            if fingerprint != pending:
+                pending = fingerprint
+                continue
+            try:
+                self.reload()
+            except Exception:
+                # Don't retry the same broken files every poll
+                self._fingerprint = fingerprint
+            pending = None
+
+    def status(self):
+        return {
+            'current': self.current.describe() if self.current else None,
+            'previous': self.previous.describe() if self.previous else None,
+            'reloads': self.reloads,
+            'failed_reloads': self.failed_reloads,
+            'last_error': self.last_error
+        }
@@ -0,0 +1,244 @@
+"""
+Model & Hyperparameter Search
+Cross-validates every candidate of six model families on a process pool.
+Per-fold scaled splits and per-fold results are cached on disk, keyed by a
+hash of the training data and the candidate's full estimator configuration
+(with the scikit-learn release), so a re-run only fits what changed.
+"""
+
+import hashlib
+import itertools
+import json
+import multiprocessing
+import os
+import time
+
+import numpy as np
+import sklearn
+from sklearn.base import clone
+from sklearn.ensemble import AdaBoostClassifier, GradientBoostingClassifier, RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import accuracy_score, f1_score
+from sklearn.model_selection import StratifiedKFold
+from sklearn.neighbors import KNeighborsClassifier
+from sklearn.preprocessing import StandardScaler
+from sklearn.svm import SVC
+
+CACHE_DIR = os.environ.get(
+    'ML_SEARCH_CACHE', os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'model_search')
+)
+N_FOLDS = 5
+SEED = 42
+METRICS = ('accuracy', 'f1')
+
+# Family name -> (base estimator, parameter grid, extra parameters for the final refit).
+# Estimators inside the pool run single-threaded; parallelism comes from the pool.
+MODEL_FAMILIES = {
+    'Random Forest': (
+        RandomForestClassifier(random_state=SEED, n_jobs=1),
+        {'n_estimators': [100, 200], 'max_depth': [10, None], 'min_samples_split': [5]},
+        {'n_jobs': -1}
+    ),
+    'Gradient Boosting': (
+        GradientBoostingClassifier(random_state=SEED),
+        {'n_estimators': [100, 200], 'learning_rate': [0.05, 0.1], 'max_depth': [3]},
+        {}
+    ),
+    'SVM (RBF Kernel)': (
+        SVC(kernel='rbf', random_state=SEED),
+        {'C': [0.5, 1.0, 2.0], 'gamma': ['scale']},
+        # The API needs predict_proba; only the final model pays for Platt scaling
+        {'probability': True}
+    ),
+    'K-Nearest Neighbors': (
+        KNeighborsClassifier(),
+        {'n_neighbors': [5, 15, 31], 'weights': ['uniform', 'distance']},
+        {}
+    ),
+    'Logistic Regression': (
+        LogisticRegression(max_iter=1000),
+        {'C': [0.1, 1.0, 10.0]},
+        {}
+    ),
+    'AdaBoost': (
+        AdaBoostClassifier(random_state=SEED),
+        {'n_estimators': [100, 200], 'learning_rate': [0.5, 1.0]},
+        {}
+    ),
+}
+
+
+def data_hash(X, y):
+    """Identifies the training data (values, dtypes and shape) for cache keys"""
+    digest = hashlib.sha256()
+    for array in (np.ascontiguousarray(X, dtype=np.float64), np.ascontiguousarray(y, dtype=np.int64)):
+        digest.update(str(array.shape).encode())
+        digest.update(array.tobytes())
+    return digest.hexdigest()[:16]
+
+
+def candidates(families=None):
+    """(family, params) for every point of every requested family's grid"""
+    for family in families or MODEL_FAMILIES:
+        _, grid, _ = MODEL_FAMILIES[family]
+        names = sorted(grid)
+        for values in itertools.product(*(grid[name] for name in names)):
+            yield family, dict(zip(names, values))
+
+
+def candidate_key(family, params):
+    return json.dumps([family, params], sort_keys=True)
+
+
+def build_estimator(family, params, final=False):
+    base, _, final_params = MODEL_FAMILIES[family]
+    estimator = clone(base).set_params(**params)
+    if final:
+        estimator.set_params(**final_params)
+    return estimator
+
+
+def result_key(family, params):
+    """
+    File name of a candidate's cached fold results: every estimator parameter
+    (the base estimator's included, not just the grid point) and the
+    scikit-learn release, so editing a family or upgrading refits it
+    """
+    config = [family, build_estimator(family, params).get_params(), sklearn.__version__]
+    return hashlib.sha256(json.dumps(config, sort_keys=True, default=repr).encode()).hexdigest()[:16]
+
+
+def prepare_splits(X, y, cache_dir=CACHE_DIR, n_folds=N_FOLDS):
+    """
+    Write the scaled train/validation arrays of every fold (scaler fitted on the
+    fold's training part only) once per dataset; returns (data hash, fold paths)
+    """
+    key = data_hash(X, y)
+    split_dir = os.path.join(cache_dir, 'splits', f'{key}-k{n_folds}')
+    paths = [os.path.join(split_dir, f'fold_{k}.npz') for k in range(n_folds)]
+    if all(os.path.exists(p) for p in paths):
+        return key, paths
+
+    os.makedirs(split_dir, exist_ok=True)
+    folds = StratifiedKFold(n_splits=n_folds, shuffle=True, random_state=SEED)
+    for path, (train_idx, val_idx) in zip(paths, folds.split(X, y)):
+        scaler = StandardScaler().fit(X[train_idx])
+        tmp_path = f'{path}.tmp-{os.getpid()}.npz'
+        np.savez(
+            tmp_path,
+            X_train=scaler.transform(X[train_idx]), y_train=y[train_idx],
+            X_val=scaler.transform(X[val_idx]), y_val=y[val_idx]
+        )
+        os.replace(tmp_path, path)
+    return key, paths
+
+
+def fit_fold(task):
+    """Pool worker: fit one candidate on one fold and score it on the held-out part"""
+    family, params, split_path, result_path = task
+    split = np.load(split_path)
+    estimator = build_estimator(family, params)
+    start = time.perf_counter()
+    estimator.fit(split['X_train'], split['y_train'])
+    fit_seconds = time.perf_counter() - start
+    y_pred = estimator.predict(split['X_val'])
+    result = {
+        'accuracy': accuracy_score(split['y_val'], y_pred),
+        'f1': f1_score(split['y_val'], y_pred),
+        'fit_seconds': fit_seconds
+    }
+    tmp_path = f'{result_path}.tmp-{os.getpid()}'
+    with open(tmp_path, 'w') as f:
+        json.dump(result, f)
+    os.replace(tmp_path, result_path)
+    return result_path, result
+
+
+def run_search(X, y, families=None, metric='accuracy', workers=None, cache_dir=CACHE_DIR):
+    """
+    Cross-validate every candidate and return (best (family, params), report).
+
+    Folds whose results are already cached are not refitted. `report` holds the
+    per-family comparison table (each family's best candidate) plus run stats.
+    """
+    if metric not in METRICS:
+        raise ValueError(f"Unknown metric '{metric}' (expected one of {METRICS})")
+    X = np.asarray(X, dtype=np.float64)
+    y = np.asarray(y)
+    workers = workers or os.cpu_count() or 1
+    start = time.perf_counter()
+
+    key, split_paths = prepare_splits(X, y, cache_dir)
+    result_dir = os.path.join(cache_dir, 'folds', key)
+    os.makedirs(result_dir, exist_ok=True)
+
+    results = {}
+    tasks = []
+    for family, params in candidates(families):
+        candidate = candidate_key(family, params)
+        name = result_key(family, params)
+        for k, split_path in enumerate(split_paths):
+            result_path = os.path.join(result_dir, f'{name}-fold{k}.json')
+            results[result_path] = (candidate, None)
+            if os.path.exists(result_path):
+                with open(result_path) as f:
+                    results[result_path] = (candidate, json.load(f))
+            else:
+                tasks.append((family, params, split_path, result_path))
+
+    cached = len(results) - len(tasks)
+    print(f"   {len(results) // len(split_paths)} candidates x {len(split_paths)} folds: "
+          f"{len(tasks)} fits to run, {cached} cached ({workers} workers)")
+    if tasks:
+        if workers > 1:
+            with multiprocessing.Pool(workers) as pool:
+                for result_path, result in pool.imap_unordered(fit_fold, tasks):
+                    results[result_path] = (results[result_path][0], result)
+        else:
+            for task in tasks:
+                result_path, result = fit_fold(task)
+                results[result_path] = (results[result_path][0], result)
+
+    # Aggregate folds into one row per candidate
+    per_candidate = {}
+    for candidate, result in results.values():
+        per_candidate.setdefault(candidate, []).append(result)
+    rows = []
+    for candidate, fold_results in per_candidate.items():
+        family, params = json.loads(candidate)
+        row = {'family': family, 'params': params}
+        for name in METRICS:
+            scores = [r[name] for r in fold_results]
+            row[f'cv_{name}'] = float(np.mean(scores))
+            row[f'cv_{name}_std'] = float(np.std(scores))
+        row['fit_seconds'] = float(sum(r['fit_seconds'] for r in fold_results))
+        rows.append(row)
+
+    # Highest mean score wins; ties go to the lower spread
+    rows.sort(key=lambda r: (-r[f'cv_{metric}'], r[f'cv_{metric}_std']))
+    best = rows[0]
+    comparison = {}
+    for row in rows:
+        if row['family'] not in comparison:
+            comparison[row['family']] = {
+                'params': row['params'],
+                'accuracy': round(row['cv_accuracy'], 4),
+                'accuracy_std': round(row['cv_accuracy_std'], 4),
+                'f1_score': round(row['cv_f1'], 4),
+                'fit_seconds': round(row['fit_seconds'], 2)
+            }
+
+    report = {
+        'best_model': best['family'],
+        'best_params': best['params'],
+        'metric': metric,
+        'n_folds': len(split_paths),
+        'n_candidates': len(rows),
+        'fits_run': len(tasks),
+        'fits_cached': cached,
+        'workers': workers,
+        'data_hash': key,
+        'wall_seconds': round(time.perf_counter() - start, 2),
+        'model_comparison': comparison
+    }
+    return (best['family'], best['params']), report
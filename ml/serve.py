@@ -0,0 +1,96 @@
+"""
+BMSIT Placement Prediction API - Production Server
+Serves the Flask app from api.py with gunicorn instead of the Werkzeug dev server
+
+Usage:
+    python serve.py --workers 4 --threads 4 --port 5001
+    python serve.py --mode async --workers 4      # asyncio + micro-batching (async_api.py)
+"""
+
+import argparse
+import gc
+import multiprocessing
+import os
+import sys
+
+from gunicorn.app.base import BaseApplication
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+
+class PredictionServer(BaseApplication):
+    """
+    gunicorn application that imports api.py once in the master process.
+
+    With preload on, the model artifacts are loaded and warmed up before the
+    workers fork, so every worker shares the same NumPy buffers copy-on-write.
+    """
+
+    def __init__(self, options, mode='sync'):
+        self.options = options
+        self.mode = mode
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        import api
+        if self.mode == 'async':
+            import async_api
+            app = async_api.app
+        else:
+            app = api.app
+        # Background loads (similar-students index) finish in the master too, so
+        # the workers share them and no loader thread is cut off by the fork
+        api.join_background_loads()
+        # Move everything loaded so far out of the collector's reach so that
+        # gc passes in the workers do not touch (and un-share) those pages
+        gc.freeze()
+        return app
+
+
+def default_workers():
+    return min(4, multiprocessing.cpu_count())
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Run the prediction API with gunicorn')
+    parser.add_argument('--mode', choices=['sync', 'async'], default=os.environ.get('ML_SERVE_MODE', 'sync'),
+                        help='sync: Flask on gthread workers; async: ASGI micro-batching on uvicorn workers')
+    parser.add_argument('--host', default=os.environ.get('ML_HOST', '0.0.0.0'))
+    parser.add_argument('--port', type=int, default=int(os.environ.get('ML_PORT', 5001)))
+    parser.add_argument('--workers', type=int, default=int(os.environ.get('ML_WORKERS', default_workers())))
+    parser.add_argument('--threads', type=int, default=int(os.environ.get('ML_THREADS', 4)))
+    parser.add_argument('--timeout', type=int, default=int(os.environ.get('ML_TIMEOUT', 30)))
+    parser.add_argument('--no-preload', action='store_true',
+                        help='load artifacts in each worker instead of once in the master')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.mode == 'async':
+        # uvicorn.workers is deprecated in favour of the separate uvicorn-worker package
+        worker_class = 'uvicorn_worker.UvicornWorker'
+    else:
+        worker_class = 'gthread' if args.threads > 1 else 'sync'
+    options = {
+        'bind': f"{args.host}:{args.port}",
+        'workers': args.workers,
+        'threads': args.threads,
+        'worker_class': worker_class,
+        'preload_app': not args.no_preload,
+        'timeout': args.timeout,
+        'accesslog': None,
+    }
+    if args.mode == 'async':
+        print(f"🚀 Serving (async micro-batching) on {options['bind']} with {args.workers} worker(s)")
+    else:
+        print(f"🚀 Serving on {options['bind']} with {args.workers} worker(s) x {args.threads} thread(s)")
+    PredictionServer(options, mode=args.mode).run()
+
+
+if __name__ == '__main__':
+    main()
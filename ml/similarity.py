@@ -0,0 +1,351 @@
+"""
+Similar Students Index
+Nearest past profiles ("students like you") from ml/data/students.csv with
+their placement outcomes. Profiles are embedded in the model's scaled
+feature space, restricted to the features students.csv records, plus a
+one-hot branch, and held in a KD-tree. Records inserted later (a new
+season) go to a small delta that is scanned directly and merged into the
+tree once it grows past DELTA_MAX rows.
+
+The index is built by train_model.py and stored as models/similarity_index.npz:
+the validated record columns, the scaler parameters and how many records the
+tree covers, no pickles. Loading embeds the records and builds the tree over
+those; the rest stay in the delta. Seasons are inserted with --append or,
+while the API runs, POST /admin/similar/records.
+
+Usage:
+    python similarity.py                       # rebuild the index from students.csv
+    python similarity.py --append season.csv   # insert a new season's records
+"""
+
+import argparse
+import copy
+import os
+import pickle
+import threading
+import time
+
+import numpy as np
+
+from features import CATEGORY_ALIASES, FEATURE_COLS, CategoryTable
+
+INDEX_FILE = 'similarity_index.npz'
+# scipy and data_loading (pandas) are imported where they are used: the API
+# imports this module at startup but only needs them once the index loads
+STUDENTS_CSV = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'students.csv')
+
+# students.csv column -> (field stored and returned by /similar, storage dtype)
+RECORD_COLUMNS = {
+    'year': ('year', np.int16),
+    'branch': ('branch', str),
+    'cgpa': ('cgpa', np.float32),
+    'backlogs': ('backlogs', np.int8),
+    'num_projects': ('projects', np.int8),
+    'num_certifications': ('certifications', np.int8),
+    'has_internship': ('internship', bool),
+    'placed': ('placed', bool),
+    'company': ('company', str),
+    'package_lpa': ('package_lpa', np.float32),
+}
+
+# Model features the distance is measured on -> stored field. students.csv has
+# no DSA, LeetCode or communication scores; gender is deliberately left out
+EMBED_FEATURES = {
+    'CGPA': 'cgpa',
+    'Backlogs': 'backlogs',
+    'Projects': 'projects',
+    'Certifications': 'certifications',
+    'Internship': 'internship',
+}
+# A different branch adds sqrt(2) * BRANCH_WEIGHT standard deviations of distance
+BRANCH_WEIGHT = 1.0
+
+# Inserted rows are scanned by brute force until there are this many
+DELTA_MAX = 4096
+# Query rows per brute-force block over the delta
+QUERY_BLOCK = 256
+
+
+class SimilarityIndex:
+    """
+    KD-tree over the first `n_tree` records plus a brute-force delta.
+
+    `records` maps every RECORD_COLUMNS field to one array; `mean`/`scale`
+    are the training scaler's parameters for EMBED_FEATURES, in order.
+    """
+
+    def __init__(self, records, mean, scale, branches, built_at=None, n_tree=None):
+        self.mean = np.asarray(mean, dtype=np.float64)
+        self.scale = np.asarray(scale, dtype=np.float64)
+        self.branches = [str(b) for b in branches]
+        self.branch_table = CategoryTable(self.branches, CATEGORY_ALIASES['Branch'])
+        self.built_at = built_at or time.time()
+        self.records = {field: np.asarray(values) for field, values in records.items()}
+        self.points = self.embed_records(self.records)
+        self.rebuild(n_tree)
+
+    def __len__(self):
+        return len(self.points)
+
+    def embed(self, numeric, branches):
+        """Points for raw EMBED_FEATURES columns and branch names (unknown branches match none)"""
+        codes, known = self.branch_table.encode_column(branches)
+        one_hot = np.zeros((len(numeric), len(self.branches)))
+        one_hot[np.flatnonzero(known), codes[known]] = BRANCH_WEIGHT
+        return np.hstack([(numeric - self.mean) / self.scale, one_hot])
+
+    def embed_records(self, records):
+        numeric = np.column_stack([records[field] for field in EMBED_FEATURES.values()]).astype(np.float64)
+        return self.embed(numeric, records['branch'])
+
+    def embed_features(self, features, branches):
+        """Points for an encoded feature block from build_feature_block (and its context branches)"""
+        columns = [FEATURE_COLS.index(feature) for feature in EMBED_FEATURES]
+        return self.embed(np.asarray(features, dtype=np.float64)[:, columns], branches)
+
+    def rebuild(self, n_tree=None):
+        """Fold the delta into the tree (or the first `n_tree` points, leaving the rest as the delta)"""
+        from scipy.spatial import cKDTree
+        self.n_tree = len(self.points) if n_tree is None else min(n_tree, len(self.points))
+        self.tree = cKDTree(self.points[:self.n_tree]) if self.n_tree else None
+
+    def insert(self, records):
+        """Append records (same fields as self.records); rebuilds the tree once the delta is large"""
+        records = {field: np.asarray(records[field]) for field in self.records}
+        for field, values in self.records.items():
+            # String columns widen to the longest value instead of truncating
+            new = records[field] if values.dtype.kind == 'U' else records[field].astype(values.dtype)
+            self.records[field] = np.concatenate([values, new])
+        _, known = self.branch_table.encode_column(records['branch'])
+        if not known.all():
+            # The one-hot part gets wider, so every point moves: re-embed and rebuild
+            self.branches += sorted(set(records['branch'][~known].tolist()))
+            self.branch_table = CategoryTable(self.branches, CATEGORY_ALIASES['Branch'])
+            self.points = self.embed_records(self.records)
+            self.rebuild()
+            return
+        self.points = np.vstack([self.points, self.embed_records(records)])
+        if len(self.points) - self.n_tree > DELTA_MAX:
+            self.rebuild()
+
+    def inserted(self, records):
+        """A copy with `records` inserted; this index is left as it was and can keep serving queries"""
+        index = copy.copy(self)
+        index.records, index.branches = dict(self.records), list(self.branches)
+        index.insert(records)
+        return index
+
+    def query(self, points, k=5):
+        """(distances, record indices), both (len(points), k) and nearest first"""
+        points = np.atleast_2d(np.asarray(points, dtype=np.float64))
+        k = min(k, len(self.points))
+        if k == 0:
+            return np.zeros((len(points), 0)), np.zeros((len(points), 0), dtype=np.int64)
+        if self.tree is not None:
+            distances, indices = self.tree.query(points, k=min(k, self.n_tree))
+            distances, indices = distances.reshape(len(points), -1), indices.reshape(len(points), -1)
+        else:
+            distances, indices = np.zeros((len(points), 0)), np.zeros((len(points), 0), dtype=np.int64)
+        if len(self.points) == self.n_tree:
+            return distances, indices
+
+        delta = self.points[self.n_tree:]
+        delta_norms = (delta ** 2).sum(axis=1)
+        results = []
+        for start in range(0, len(points), QUERY_BLOCK):
+            block = points[start:start + QUERY_BLOCK]
+            squared = (block ** 2).sum(axis=1)[:, None] + delta_norms[None, :] - 2 * block @ delta.T
+            candidates = np.hstack([distances[start:start + QUERY_BLOCK], np.sqrt(np.maximum(squared, 0))])
+            candidate_ids = np.hstack([
+                indices[start:start + QUERY_BLOCK],
+                np.broadcast_to(np.arange(self.n_tree, len(self.points)), squared.shape)
+            ])
+            order = np.argsort(candidates, axis=1, kind='stable')[:, :k]
+            results.append((np.take_along_axis(candidates, order, axis=1),
+                            np.take_along_axis(candidate_ids, order, axis=1)))
+        return np.vstack([d for d, _ in results]), np.vstack([i for _, i in results])
+
+    def neighbours(self, features, branches, k=5):
+        """Per query row: a list of neighbour dicts (past profile, outcome and distance)"""
+        distances, indices = self.query(self.embed_features(features, branches), k)
+        columns = {field: values[indices].tolist() for field, values in self.records.items()}
+        distances = np.round(distances, 4).tolist()
+        results = []
+        for row in range(len(indices)):
+            neighbours = []
+            for j, distance in enumerate(distances[row]):
+                neighbour = {field: columns[field][row][j] for field in columns}
+                neighbour['cgpa'] = round(neighbour['cgpa'], 2)
+                package = neighbour['package_lpa']
+                neighbour['package_lpa'] = None if package != package else round(package, 2)
+                neighbour['company'] = neighbour['company'] or None
+                neighbour['distance'] = distance
+                neighbours.append(neighbour)
+            results.append(neighbours)
+        return results
+
+    def save(self, path):
+        """Write the record columns and scaler parameters (atomically replaces `path`)"""
+        tmp_path = f"{path}.tmp-{os.getpid()}.npz"
+        np.savez(
+            tmp_path, mean=self.mean, scale=self.scale, branches=np.asarray(self.branches, dtype=str),
+            built_at=np.float64(self.built_at), n_tree=np.int64(self.n_tree), **{f'record_{field}': values for field, values in self.records.items()}
+        )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            records = {field: data[f'record_{field}'] for field, _ in RECORD_COLUMNS.values()}
+            # Indexes written before n_tree was stored have no delta
+            n_tree = int(data['n_tree']) if 'n_tree' in data else None
+            return cls(records, data['mean'], data['scale'], data['branches'], float(data['built_at']), n_tree)
+
+    def describe(self):
+        return {
+            'records': len(self.points),
+            'delta': len(self.points) - self.n_tree,
+            'built_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(self.built_at))
+        }
+
+
+def student_records(df, branch_table):
+    """Record columns for a typed STUDENT_SCHEMA frame; branch names canonicalized to the model's spelling"""
+    branches = df['branch'].astype(str).to_numpy()
+    codes, known = branch_table.encode_column(branches)
+    records = {'branch': np.where(known, branch_table.classes[codes], branches).astype(str)}
+    for column, (field, dtype) in RECORD_COLUMNS.items():
+        if column == 'branch':
+            continue
+        if dtype is str:
+            records[field] = df[column].astype(object).fillna('').to_numpy(dtype=str)
+        else:
+            records[field] = df[column].to_numpy(dtype=dtype)
+    return records
+
+
+def build_index(mean, scale, branches, csv_path=STUDENTS_CSV):
+    """
+    Index over every record in students.csv, in the space of the training
+    scaler; `mean`/`scale` are its parameters in FEATURE_COLS order.
+    """
+    from data_loading import STUDENT_SCHEMA, load_dataset
+    df, _ = load_dataset(csv_path, STUDENT_SCHEMA)
+    columns = [FEATURE_COLS.index(feature) for feature in EMBED_FEATURES]
+    branches = [str(b) for b in branches]
+    records = student_records(df, CategoryTable(branches, CATEGORY_ALIASES['Branch']))
+    return SimilarityIndex(records, np.asarray(mean)[columns], np.asarray(scale)[columns], branches)
+
+
+def build_from_artifacts(model_dir, csv_path=STUDENTS_CSV):
+    with open(os.path.join(model_dir, 'scaler.pkl'), 'rb') as f:
+        scaler = pickle.load(f)
+    with open(os.path.join(model_dir, 'encoders.pkl'), 'rb') as f:
+        encoders = pickle.load(f)
+    return build_index(scaler.mean_, scaler.scale_, encoders['Branch'].classes_, csv_path)
+
+
+def validated_records(df, branch_table, source='data'):
+    """
+    Record columns for an untyped frame with (at least) the students.csv
+    columns in RECORD_COLUMNS; raises DataValidationError on bad values.
+    """
+    from data_loading import STUDENT_SCHEMA, apply_schema
+    schema = {column: STUDENT_SCHEMA[column] for column in RECORD_COLUMNS}
+    return student_records(apply_schema(df, schema, source=source), branch_table)
+
+
+def append_csv(index, csv_path):
+    """Validate a students.csv-shaped file and insert its rows; returns the number inserted"""
+    import pandas as pd
+    records = validated_records(pd.read_csv(csv_path, dtype=str), index.branch_table, os.path.basename(csv_path))
+    index.insert(records)
+    return len(records['branch'])
+
+
+class IndexFile:
+    """
+    The index in models/ as served by the API: reloaded when the file changes,
+    built in memory from students.csv when training has not written one yet.
+    `scaler_params` returns the serving model's (mean, scale, branches) for
+    that build; without it the pickled scaler and encoders are read.
+    """
+
+    def __init__(self, model_dir, scaler_params=None):
+        self.model_dir = model_dir
+        self.scaler_params = scaler_params
+        self.path = os.path.join(model_dir, INDEX_FILE)
+        self.index = None
+        self.signature = None
+        self._lock = threading.Lock()
+
+    def file_signature(self):
+        try:
+            stat = os.stat(self.path)
+            return (stat.st_mtime_ns, stat.st_size)
+        except FileNotFoundError:
+            return None
+
+    def current(self):
+        signature = self.file_signature()
+        index = self.index
+        if index is None or signature != self.signature:
+            with self._lock:
+                if self.index is None or signature != self.signature:
+                    self._load(signature)
+                index = self.index
+        return index
+
+    def invalidate(self):
+        """
+        Drop an index built from students.csv (no file yet) so the next query
+        rebuilds it in the new serving model's scaler space
+        """
+        with self._lock:
+            if self.signature is None:
+                self.index = None
+
+    def insert(self, df, source='data'):
+        """
+        Validate and insert an untyped frame of student records into the served
+        index, then write the file so other workers pick them up. Queries keep
+        using the previous index until the new one is swapped in.
+        Returns the number of records inserted.
+        """
+        index = self.current()
+        with self._lock:
+            index = self.index or index
+            records = validated_records(df, index.branch_table, source)
+            updated = index.inserted(records)
+            updated.save(self.path)
+            self.index, self.signature = updated, self.file_signature()
+        return len(records['branch'])
+
+    def _load(self, signature):
+        if signature is None:
+            print(f"⚠️  No {INDEX_FILE} in {self.model_dir}, building the similar-students index from students.csv")
+            if self.scaler_params is not None:
+                self.index = build_index(*self.scaler_params())
+            else:
+                self.index = build_from_artifacts(self.model_dir)
+        else:
+            self.index = SimilarityIndex.load(self.path)
+        self.signature = signature
+        print(f"🧭 Similar-students index: {len(self.index)} records")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Build or extend the similar-students index')
+    parser.add_argument('--models', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'models'))
+    parser.add_argument('--append', nargs='+', metavar='CSV', help='insert these students.csv-shaped files')
+    args = parser.parse_args()
+    path = os.path.join(args.models, INDEX_FILE)
+    start = time.perf_counter()
+    if args.append:
+        index = SimilarityIndex.load(path)
+        for csv_path in args.append:
+            print(f"➕ {csv_path}: {append_csv(index, csv_path)} records inserted")
+    else:
+        index = build_from_artifacts(args.models)
+    index.save(path)
+    print(f"✅ {len(index)} records in {path} ({(time.perf_counter() - start) * 1000:.0f} ms)")
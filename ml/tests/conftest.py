@@ -0,0 +1,30 @@
+"""
+Shared fixtures. Tests import the ml/ modules directly and use the artifacts
+in ml/models/ (the bundle when it has been exported, the pickles otherwise).
+"""
+
+import os
+import sys
+
+import pytest
+
+ML_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ML_DIR)
+# No watcher threads during tests
+os.environ.setdefault('ML_MODEL_WATCH_INTERVAL', '0')
+
+
+@pytest.fixture(scope='session')
+def api_module():
+    import api
+    return api
+
+
+@pytest.fixture()
+def client(api_module):
+    return api_module.app.test_client()
+
+
+@pytest.fixture(scope='session')
+def encoders(api_module):
+    return api_module.registry.current.encoders
@@ -0,0 +1,72 @@
+"""
+Async serving mode: /predict goes through the micro-batcher, every other
+route is forwarded to the Flask app.
+"""
+
+import asyncio
+import json
+
+import pytest
+
+
+@pytest.fixture(scope='module')
+def async_api(api_module):
+    import async_api
+    return async_api
+
+
+def call(async_api, method, path, body=b'', query=b'', headers=()):
+    """Run one request through the ASGI app (batcher started and stopped around it)"""
+    async def run():
+        sent = []
+        chunks = [{'type': 'http.request', 'body': body[i:i + 1000], 'more_body': i + 1000 < len(body)}
+                  for i in range(0, len(body), 1000)] or [{'type': 'http.request', 'body': b''}]
+
+        async def receive():
+            return chunks.pop(0)
+
+        async def send(message):
+            sent.append(message)
+
+        scope = {
+            'type': 'http', 'method': method, 'path': path, 'query_string': query, 'http_version': '1.1',
+            'headers': [(b'content-type', b'application/json'), *headers], 'client': ('127.0.0.1', 5000),
+            'server': ('testserver', 80), 'scheme': 'http', 'root_path': ''
+        }
+        await async_api.batcher.start()
+        try:
+            await async_api.app(scope, receive, send)
+        finally:
+            await async_api.batcher.stop()
+        return sent
+
+    sent = asyncio.run(run())
+    assert sent[-1]['type'] == 'http.response.body' and not sent[-1].get('more_body')
+    return sent[0]['status'], dict(sent[0]['headers']), b''.join(m.get('body', b'') for m in sent[1:])
+
+
+def test_predict_is_served_by_the_batcher(async_api):
+    rows = async_api.batcher.stats()['rows']
+    status, headers, body = call(async_api, 'POST', '/predict', json.dumps({'CGPA': 8.1}).encode())
+    assert status == 200 and 'placed' in json.loads(body)
+    assert async_api.batcher.stats()['rows'] == rows + 1
+
+
+def test_other_routes_are_forwarded_to_flask(async_api, api_module):
+    status, _, body = call(async_api, 'GET', '/branches')
+    assert status == 200 and json.loads(body) == api_module.app.test_client().get('/branches').get_json()
+
+    status, _, body = call(async_api, 'GET', '/cohort/stats', query=b'cohort=nope')
+    assert status == 404 and 'cohorts' in json.loads(body)
+
+    status, _, body = call(async_api, 'GET', '/no/such/route')
+    assert status == 404
+
+
+def test_streamed_batch_is_forwarded(async_api):
+    students = [{'CGPA': round(6 + i / 10, 1), 'id': i} for i in range(30)] + [{'CGPA': 'x', 'id': 30}]
+    status, headers, body = call(async_api, 'POST', '/predict/batch', json.dumps(students).encode())
+    assert status == 200 and headers[b'content-type'] == b'application/x-ndjson'
+    lines = [json.loads(line) for line in body.splitlines()]
+    assert [line['id'] for line in lines] == list(range(31))
+    assert all('placed' in line for line in lines[:30]) and 'error' in lines[30]
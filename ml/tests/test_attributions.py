@@ -0,0 +1,64 @@
+"""
+Attributions: for every row, base + sum(contributions) is the forest's
+placed probability, whichever engine explains it.
+"""
+
+import os
+import pickle
+
+import numpy as np
+import pytest
+
+from attributions import TreeExplainer
+from export_model import INPUT_DECIMALS, load_encoded_dataset
+from features import FEATURE_COLS
+from flat_forest import CompactForest, FlatForest, scale_rows
+from model_registry import load_model_version
+
+ML_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODEL_DIR = os.path.join(ML_DIR, 'models')
+
+
+@pytest.fixture(scope='module')
+def pipeline():
+    with open(os.path.join(MODEL_DIR, 'placement_model.pkl'), 'rb') as f:
+        model = pickle.load(f)
+    with open(os.path.join(MODEL_DIR, 'scaler.pkl'), 'rb') as f:
+        scaler = pickle.load(f)
+    with open(os.path.join(MODEL_DIR, 'encoders.pkl'), 'rb') as f:
+        encoders = pickle.load(f)
+    return model, scaler, load_encoded_dataset(scaler, encoders)[:300]
+
+
+def assert_sums_to_probability(forest, X):
+    explainer = TreeExplainer(forest, len(FEATURE_COLS))
+    contributions = explainer.explain(X)
+    assert contributions.shape == (len(X), len(FEATURE_COLS))
+    np.testing.assert_allclose(explainer.base + contributions.sum(axis=1), forest.predict_proba(X)[:, 1], atol=1e-6)
+
+
+def test_flat_forest_contributions_sum_to_the_probability(pipeline):
+    model, scaler, X = pipeline
+    assert_sums_to_probability(FlatForest.from_sklearn(model), scale_rows(scaler, X))
+
+
+def test_folded_forest_contributions_sum_to_the_probability(pipeline):
+    model, scaler, X = pipeline
+    assert_sums_to_probability(FlatForest.from_sklearn(model).fold_scaler(scaler.mean_, scaler.scale_), X)
+
+
+def test_compact_forest_contributions_sum_to_the_probability(pipeline):
+    model, scaler, X = pipeline
+    folded = FlatForest.from_sklearn(model).fold_scaler(scaler.mean_, scaler.scale_)
+    compact = CompactForest.from_flat(folded, {FEATURE_COLS.index(c): d for c, d in INPUT_DECIMALS.items()})
+    assert_sums_to_probability(compact, X)
+
+
+@pytest.mark.parametrize('engine', ['flat', 'sklearn'])
+def test_served_explanations_sum_to_the_served_probability(pipeline, engine):
+    _, _, X = pipeline
+    version = load_model_version(MODEL_DIR, engine=engine)
+    contributions = version.explain(X)
+    np.testing.assert_allclose(
+        version.explainer.base + contributions.sum(axis=1), version.predict_proba(X)[:, 1], atol=1e-6
+    )
@@ -0,0 +1,47 @@
+"""
+/cohort/stats: any histogram bin count from 1 to FINE_BINS is served.
+"""
+
+import numpy as np
+import pytest
+
+from cohort import FINE_BINS
+
+
+@pytest.fixture()
+def cohort(client):
+    rng = np.random.default_rng(0)
+    students = [{'id': i, 'CGPA': round(float(rng.uniform(5, 10)), 2), 'LeetCode_Problems': int(rng.integers(0, 400))}
+                for i in range(200)]
+    response = client.post('/predict/batch?cohort=bins-test', json=students)
+    assert response.status_code == 200
+    response.get_data()
+    return 'bins-test'
+
+
+@pytest.mark.parametrize('bins', [1, 3, 7, 10, 333, FINE_BINS])
+def test_any_bin_count(client, cohort, bins):
+    response = client.get(f'/cohort/stats?cohort={cohort}&bins={bins}')
+    assert response.status_code == 200
+    stats = response.get_json()
+    assert len(stats['overall']['histogram']) == bins
+    assert sum(stats['overall']['histogram']) == stats['overall']['students'] == 200
+    edges = stats['bin_edges']
+    assert len(edges) == bins + 1 and edges[0] == 0 and edges[-1] == 100
+    assert all(b > a for a, b in zip(edges, edges[1:]))
+    if FINE_BINS % bins == 0:
+        assert np.allclose(np.diff(edges), stats['bin_width'], atol=0.05)
+    else:
+        assert 'bin_width' not in stats
+
+
+def test_three_bins_split_on_rounded_edges(client, cohort):
+    stats = client.get(f'/cohort/stats?cohort={cohort}&bins=3').get_json()
+    assert stats['bin_edges'] == [0.0, 33.3, 66.7, 100.0]
+
+
+@pytest.mark.parametrize('bins', [0, -2, FINE_BINS + 1])
+def test_out_of_range_bin_counts_are_rejected(client, cohort, bins):
+    response = client.get(f'/cohort/stats?cohort={cohort}&bins={bins}')
+    assert response.status_code == 400
+    assert str(FINE_BINS) in response.get_json()['error']
@@ -0,0 +1,53 @@
+"""
+What-if candidates: steps stop at the feature bounds, and the bound itself
+is always offered.
+"""
+
+import numpy as np
+import pytest
+
+from counterfactuals import CHANGE_STEPS, FEATURE_BOUNDS, candidate_options
+from features import FEATURE_COLS
+
+
+def options_for(feature, value, **others):
+    row = np.zeros(len(FEATURE_COLS))
+    row[FEATURE_COLS.index('Communication_Score')] = 3
+    for name, other in {feature: value, **others}.items():
+        row[FEATURE_COLS.index(name)] = other
+    columns, values, efforts = candidate_options(row)
+    chosen = columns == FEATURE_COLS.index(feature)
+    return list(values[chosen]), list(efforts[chosen])
+
+
+@pytest.mark.parametrize('feature, value, expected', [
+    ('CGPA', 9.9, [10.0]),
+    ('CGPA', 9.6, [9.85, 10.0]),
+    ('LeetCode_Problems', 490, [500]),
+    ('DSA_Score', 97, [100]),
+    ('Backlogs', 1, [0]),
+])
+def test_last_step_stops_on_the_bound(feature, value, expected):
+    values, efforts = options_for(feature, value)
+    assert values == pytest.approx(expected)
+    step, effort, _ = CHANGE_STEPS[feature]
+    # The partial step is costed for the distance actually moved
+    assert efforts[-1] == pytest.approx(effort * abs(expected[-1] - value) / abs(step))
+
+
+def test_in_range_steps_are_unchanged():
+    values, efforts = options_for('CGPA', 6.0)
+    assert values == pytest.approx([6.25, 6.5, 6.75, 7.0, 7.25, 7.5, 7.75, 8.0])
+    assert efforts == pytest.approx([2.0 * k for k in range(1, 9)])
+
+
+def test_out_of_range_profiles_can_move_back_into_it():
+    values, _ = options_for('Backlogs', 6)
+    assert values == pytest.approx([5, 4, 3, 2])
+
+
+@pytest.mark.parametrize('feature', ['CGPA', 'LeetCode_Problems', 'Communication_Score'])
+def test_profiles_at_or_past_the_bound_get_no_change(feature):
+    high = FEATURE_BOUNDS[feature][1]
+    assert options_for(feature, high) == ([], [])
+    assert options_for(feature, high + 1) == ([], [])
@@ -0,0 +1,29 @@
+"""
+Typed CSV loading: a finished file whose last line has no newline loads in full.
+"""
+
+import os
+
+from data_loading import PLACEMENT_SCHEMA, load_dataset
+from training_state import read_rows
+
+ML_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_PATH = os.path.join(ML_DIR, 'data', 'bmsit_placement_data.csv')
+
+
+def test_last_line_without_newline_is_loaded(tmp_path):
+    with open(DATA_PATH, 'rb') as f:
+        lines = f.read().splitlines()[:51]
+    csv_path = tmp_path / 'bmsit_placement_data.csv'
+    csv_path.write_bytes(b'\n'.join(lines))
+
+    for use_cache in (False, True):
+        df, meta = load_dataset(str(csv_path), PLACEMENT_SCHEMA, use_cache=use_cache, cache_dir=str(tmp_path / 'cache'))
+        assert len(df) == 50
+        assert meta['offset'] == os.path.getsize(csv_path)
+
+    # Rows appended later are picked up from that offset
+    with open(csv_path, 'ab') as f:
+        f.write(b'\n' + lines[1] + b'\n')
+    appended, offset, _ = read_rows(str(csv_path), meta['offset'], meta['header'])
+    assert len(appended) == 1 and offset == os.path.getsize(csv_path)
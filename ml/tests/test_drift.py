@@ -0,0 +1,94 @@
+"""
+Drift monitor: traffic like the training data stays stable, a shifted block
+is reported, counts only cover the recent windows, unseen branches get their
+own bin, and /drift answers 404 until a reference exists.
+"""
+
+import numpy as np
+import pytest
+
+from drift import CATEGORICAL, DriftMonitor, build_reference, save_reference
+from features import FEATURE_COLS, build_feature_block
+from generate_kaggle_data import generate_dataset
+
+
+def block(encoders, rows, seed, **overrides):
+    """Encoded features, branch names and placed probabilities for generated profiles"""
+    df = generate_dataset(rows, seed=seed)[FEATURE_COLS].astype(object)
+    for column, value in overrides.items():
+        df[column] = value(df[column]) if callable(value) else value
+    features, _, _, context = build_feature_block(df.to_dict('records'), encoders)
+    probabilities = np.random.default_rng(seed).beta(2, 3, len(features))
+    return features, context['branches'], probabilities
+
+
+@pytest.fixture()
+def monitor(encoders, tmp_path):
+    features, _, probabilities = block(encoders, 5000, seed=1)
+    categories = {col: encoders[col].classes for col in CATEGORICAL}
+    save_reference(str(tmp_path), build_reference(features, probabilities, categories))
+    monitor = DriftMonitor(str(tmp_path), window=2000, flush_rows=256)
+    assert monitor.reload() is not None
+    return monitor
+
+
+def observe(monitor, features, branches, probabilities, chunk=100):
+    for start in range(0, len(features), chunk):
+        end = start + chunk
+        monitor.observe(features[start:end], branches[start:end], probabilities[start:end])
+
+
+def test_traffic_like_training_is_stable(monitor, encoders):
+    observe(monitor, *block(encoders, 1500, seed=2))
+    report = monitor.report()
+    assert report['rows'] == 1500 and report['enough_data']
+    assert report['drifted'] == []
+    assert set(report['features']) == {*FEATURE_COLS, 'placed_probability'}
+    for feature, result in report['features'].items():
+        assert result['psi'] >= 0 and result['status'] != 'drift'
+        if feature in CATEGORICAL:
+            assert result['unseen'] == 0 and 'ks' not in result
+        else:
+            assert 0 <= result['ks'] < 0.1
+
+
+def test_shifted_block_is_reported(monitor, encoders):
+    observe(monitor, *block(encoders, 1500, seed=2, CGPA=lambda cgpa: (cgpa + 1.5).clip(upper=10)))
+    report = monitor.report()
+    assert 'CGPA' in report['drifted']
+    cgpa = report['features']['CGPA']
+    assert cgpa['status'] == 'drift' and cgpa['psi'] > 0.25 and cgpa['ks'] > 0.3
+    # Nothing else moved
+    assert report['drifted'] == ['CGPA']
+
+
+def test_counts_cover_only_the_recent_windows(monitor, encoders):
+    observe(monitor, *block(encoders, 2000, seed=2, CGPA=9.9))
+    assert 'CGPA' in monitor.report()['drifted']
+    # Two more windows of normal traffic push the shifted rows out
+    observe(monitor, *block(encoders, 4500, seed=3))
+    report = monitor.report()
+    assert report['rows'] <= 2 * monitor.window + monitor.flush_rows
+    assert report['rows_seen'] == 6500
+    assert 'CGPA' not in report['drifted']
+
+
+def test_unseen_branch_gets_its_own_bin(monitor, encoders):
+    features, branches, probabilities = block(encoders, 1000, seed=2)
+    branches = branches.copy()
+    branches[:250] = 'Robotics'
+    observe(monitor, features, branches, probabilities)
+    branch = monitor.report()['features']['Branch']
+    assert branch['unseen'] == pytest.approx(0.25)
+    assert branch['status'] == 'drift'
+
+
+def test_drift_endpoint_needs_a_reference(client, api_module, monitor, encoders, tmp_path_factory, monkeypatch):
+    monkeypatch.setattr(api_module, 'drift', DriftMonitor(str(tmp_path_factory.mktemp('no-reference'))))
+    response = client.get('/drift')
+    assert response.status_code == 404 and 'python drift.py' in response.get_json()['error']
+
+    monkeypatch.setattr(api_module, 'drift', monitor)
+    observe(monitor, *block(encoders, 200, seed=2))
+    response = client.get('/drift')
+    assert response.status_code == 200 and response.get_json()['rows'] == 200
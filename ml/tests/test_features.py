@@ -0,0 +1,38 @@
+import pytest
+
+from features import FEATURE_COLS, build_feature_block
+
+
+@pytest.mark.parametrize('value', [[7, 8], [[7]], {'a': 1}])
+def test_non_scalar_numeric_value_is_rejected(encoders, value):
+    features, valid, errors, _ = build_feature_block([{'CGPA': value}, {'CGPA': 8.1}], encoders)
+    assert features.shape == (1, len(FEATURE_COLS))
+    assert list(valid) == [False, True]
+    assert 'CGPA' in errors[0]
+
+
+def test_numeric_strings_are_accepted(encoders):
+    features, valid, errors, _ = build_feature_block([{'CGPA': '7.5', 'Projects': ''}], encoders)
+    assert not errors
+    assert features[0, FEATURE_COLS.index('CGPA')] == 7.5
+
+
+@pytest.mark.parametrize('value', [[7, 8], {'a': 1}])
+def test_predict_rejects_non_scalar_numeric_value(client, value):
+    response = client.post('/predict', json={'CGPA': value})
+    assert response.status_code == 400
+    assert 'CGPA' in response.get_json()['error']
+
+
+@pytest.mark.parametrize('body', [{'Branch': {}}, {'Branch': {'a': 1}}, {'Branch': ['CSE']}, {'Gender': 5}])
+def test_predict_rejects_non_string_category(client, body):
+    response = client.post('/predict', json=body)
+    assert response.status_code == 400
+    assert 'expected a string' in response.get_json()['error']
+
+
+def test_batch_reports_non_string_category_per_row(client):
+    response = client.post('/predict/batch', json=[{'Branch': {'a': 1}}, {'Branch': 'CSE'}])
+    assert response.status_code == 200
+    rows = [line for line in response.get_data(as_text=True).splitlines() if line]
+    assert '"error"' in rows[0] and '"placed"' in rows[1]
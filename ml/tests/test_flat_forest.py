@@ -0,0 +1,88 @@
+"""
+Flat forest parity: the compiled forest, and the forest with the scaler
+folded into its thresholds, give exactly scaler + RandomForest's
+predict_proba, including on rows that sit on (or one ulp beside) a split.
+The compact forest agrees with them on inputs at their real resolution.
+"""
+
+import os
+import pickle
+import shutil
+
+import numpy as np
+import pytest
+
+from export_model import INPUT_DECIMALS, boundary_inputs, export_bundle, load_encoded_dataset, parity_inputs
+from features import FEATURE_COLS
+from flat_forest import CompactForest, FlatForest, scale_rows
+from model_registry import load_model_version
+
+ML_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODEL_DIR = os.path.join(ML_DIR, 'models')
+
+
+@pytest.fixture(scope='module')
+def pipeline():
+    with open(os.path.join(MODEL_DIR, 'placement_model.pkl'), 'rb') as f:
+        model = pickle.load(f)
+    with open(os.path.join(MODEL_DIR, 'scaler.pkl'), 'rb') as f:
+        scaler = pickle.load(f)
+    with open(os.path.join(MODEL_DIR, 'encoders.pkl'), 'rb') as f:
+        encoders = pickle.load(f)
+    # Single-threaded sklearn sums the trees in the order the flat forest does
+    model.set_params(n_jobs=1)
+    return model, scaler, load_encoded_dataset(scaler, encoders)[:100]
+
+
+def scaled_boundary_rows(forest, X_scaled):
+    """Rows with one scaled feature on a split threshold, and one float64 ulp either side"""
+    split = np.flatnonzero(np.isfinite(forest.threshold))
+    rows = []
+    for direction in (-np.inf, None, np.inf):
+        base = X_scaled[np.arange(len(split)) % len(X_scaled)].copy()
+        values = forest.threshold[split].astype(np.float64)
+        if direction is not None:
+            values = np.nextafter(values, direction)
+        base[np.arange(len(split)), forest.feature[split]] = values
+        rows.append(base)
+    return np.vstack(rows)
+
+
+def test_flat_forest_matches_sklearn_on_split_boundaries(pipeline):
+    model, scaler, X = pipeline
+    forest = FlatForest.from_sklearn(model)
+    X_scaled = scaled_boundary_rows(forest, scale_rows(scaler, X))
+    np.testing.assert_array_equal(forest.predict_proba(X_scaled), model.predict_proba(X_scaled))
+
+
+def test_folded_forest_matches_scaler_and_sklearn_on_split_boundaries(pipeline):
+    model, scaler, X = pipeline
+    folded = FlatForest.from_sklearn(model).fold_scaler(scaler.mean_, scaler.scale_)
+    assert folded.raw_inputs
+    # Raw rows on every folded threshold and one ulp either side of it
+    X_raw = np.vstack([X, boundary_inputs(folded, X)])
+    expected = model.predict_proba(scale_rows(scaler, X_raw))
+    np.testing.assert_array_equal(folded.predict_proba(X_raw), expected)
+
+
+def test_compact_forest_agrees_with_the_flat_forest(pipeline, tmp_path):
+    model, scaler, X = pipeline
+    folded = FlatForest.from_sklearn(model).fold_scaler(scaler.mean_, scaler.scale_)
+    compact = CompactForest.from_flat(folded, {FEATURE_COLS.index(c): d for c, d in INPUT_DECIMALS.items()})
+    assert compact.n_nodes <= folded.n_nodes and list(compact.classes) == list(folded.classes)
+    # Inputs at their real resolution, inside and around the training range
+    rng = np.random.default_rng(0)
+    noise = scaler.mean_ + scaler.scale_ * rng.normal(0, 2, size=(2000, X.shape[1]))
+    X_grid = np.vstack([X, noise])
+    X_grid = np.column_stack([np.round(X_grid[:, j], INPUT_DECIMALS[c]) for j, c in enumerate(FEATURE_COLS)])
+    # Same leaves; only the float32 probabilities differ
+    np.testing.assert_allclose(compact.predict_proba(X_grid), folded.predict_proba(X_grid), atol=1e-6)
+
+    # Served through the usual bundle path
+    shutil.copy(os.path.join(MODEL_DIR, 'model_metadata.json'), tmp_path)
+    with open(os.path.join(MODEL_DIR, 'encoders.pkl'), 'rb') as f:
+        encoders = pickle.load(f)
+    export_bundle(model, scaler, encoders, str(tmp_path), parity_inputs(X, scaler), compact=True)
+    version = load_model_version(str(tmp_path))
+    assert isinstance(version.forest, CompactForest)
+    np.testing.assert_allclose(version.predict_proba(X_grid), folded.predict_proba(X_grid), atol=1e-6)
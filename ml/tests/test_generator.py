@@ -0,0 +1,108 @@
+"""
+Vectorized placement generator: same distributions as the original
+row-by-row generator it replaced (column KS/means, placement rates per
+branch and per backlog count), and full chunks that do not depend on how
+many rows are requested.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.stats import ks_2samp
+
+from generate_kaggle_data import BRANCH_PLACEMENT_RATES, BRANCHES, COLUMNS, generate_chunks, generate_dataset
+
+LEGACY_ROWS = 20_000
+VECTOR_ROWS = 200_000
+
+
+def legacy_dataset(n_samples, rs):
+    """The row loop generate_kaggle_data.py used before vectorizing (global seed -> `rs`)"""
+    data = []
+    for _ in range(n_samples):
+        branch = rs.choice(BRANCHES, p=[0.20, 0.15, 0.15, 0.10, 0.08, 0.12, 0.12, 0.08])
+        gender = rs.choice(['Male', 'Female'], p=[0.65, 0.35])
+        tech = branch in ['CSE', 'ISE', 'AIML']
+        cgpa = max(4.0, min(10.0, round(rs.normal(7.2, 1.2), 2)))
+        if cgpa >= 8.0:
+            backlogs = rs.choice([0, 1], p=[0.95, 0.05])
+        elif cgpa >= 6.5:
+            backlogs = rs.choice([0, 1, 2], p=[0.75, 0.20, 0.05])
+        else:
+            backlogs = rs.choice([0, 1, 2, 3, 4], p=[0.40, 0.30, 0.15, 0.10, 0.05])
+        dsa_score = max(0, min(100, int(rs.normal(55, 20)) if tech else int(rs.normal(30, 15))))
+        if tech:
+            projects = rs.choice([0, 1, 2, 3, 4, 5], p=[0.05, 0.15, 0.30, 0.30, 0.15, 0.05])
+        else:
+            projects = rs.choice([0, 1, 2, 3], p=[0.15, 0.35, 0.35, 0.15])
+        leetcode_problems = min(500, int(rs.exponential(80)) if tech else int(rs.exponential(20)))
+        certifications = rs.choice([0, 1, 2, 3, 4], p=[0.20, 0.35, 0.30, 0.12, 0.03])
+        if tech and cgpa >= 7.0:
+            has_internship = rs.choice([0, 1], p=[0.30, 0.70])
+        else:
+            has_internship = rs.choice([0, 1], p=[0.60, 0.40])
+        communication = rs.choice([1, 2, 3, 4, 5], p=[0.05, 0.15, 0.40, 0.30, 0.10])
+
+        base_rate = BRANCH_PLACEMENT_RATES[branch]
+        cgpa_factor = max(0, min(1, (cgpa - 6.0) / 4.0))
+        dsa_factor = dsa_score / 100.0
+        project_factor = projects / 5.0
+        leetcode_factor = min(leetcode_problems / 200.0, 1.0)
+        if tech:
+            placement_prob = (
+                base_rate * 0.12 + cgpa_factor * 0.22 + dsa_factor * 0.22 + project_factor * 0.12 +
+                leetcode_factor * 0.08 + has_internship * 0.15 + (communication / 5.0) * 0.09
+            ) - backlogs * 0.15
+        else:
+            placement_prob = (
+                base_rate * 0.20 + cgpa_factor * 0.28 + dsa_factor * 0.08 + project_factor * 0.08 +
+                has_internship * 0.18 + (communication / 5.0) * 0.08 + (certifications / 4.0) * 0.10
+            ) - backlogs * 0.15
+        placement_prob = max(0.05, min(0.95, placement_prob))
+        placed = 1 if rs.random() < placement_prob else 0
+
+        data.append([branch, gender, cgpa, backlogs, dsa_score, projects, leetcode_problems,
+                     certifications, has_internship, communication, placed])
+    return pd.DataFrame(data, columns=COLUMNS)
+
+
+@pytest.fixture(scope='module')
+def datasets():
+    return legacy_dataset(LEGACY_ROWS, np.random.RandomState(42)), generate_dataset(VECTOR_ROWS)
+
+
+@pytest.mark.parametrize('column', [c for c in COLUMNS if c not in ('Branch', 'Gender')])
+def test_column_distributions_match_the_row_loop(datasets, column):
+    legacy, vector = datasets
+    result = ks_2samp(legacy[column].to_numpy(float), vector[column].to_numpy(float))
+    assert result.pvalue > 1e-3, f'{column}: KS {result.statistic:.4f}'
+    scale = max(legacy[column].std(), 1e-9)
+    assert abs(legacy[column].mean() - vector[column].mean()) < 0.05 * scale
+
+
+@pytest.mark.parametrize('column', ['Branch', 'Gender'])
+def test_category_shares_match_the_row_loop(datasets, column):
+    legacy, vector = datasets
+    shares = pd.concat([
+        legacy[column].astype(str).value_counts(normalize=True),
+        vector[column].astype(str).value_counts(normalize=True)
+    ], axis=1).fillna(0)
+    assert (shares.iloc[:, 0] - shares.iloc[:, 1]).abs().max() < 0.015
+
+
+@pytest.mark.parametrize('group', ['Branch', 'Backlogs'])
+def test_placement_rates_match_the_row_loop(datasets, group):
+    legacy, vector = datasets
+    legacy_rates = legacy.groupby(legacy[group].astype(str))['PlacedOrNot'].agg(['mean', 'size'])
+    vector_rates = vector.groupby(vector[group].astype(str), observed=True)['PlacedOrNot'].mean()
+    for key, (rate, size) in legacy_rates.iterrows():
+        # Four standard errors of the smaller (row loop) sample
+        tolerance = 4 * np.sqrt(max(rate * (1 - rate), 0.01) / size)
+        assert abs(rate - vector_rates[key]) < tolerance, f'{group}={key}'
+
+
+def test_full_chunks_do_not_depend_on_the_row_count():
+    def rows(n_samples):
+        return pd.concat(list(generate_chunks(n_samples, seed=7, chunk_rows=250)), ignore_index=True)
+    assert rows(1000).iloc[:500].equals(rows(600).iloc[:500])
+    assert generate_dataset(300, seed=7).equals(generate_dataset(300, seed=7))
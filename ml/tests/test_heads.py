@@ -0,0 +1,85 @@
+"""
+Outcome heads: only heads that beat their baseline are served, and their
+outputs agree with the placement decision.
+"""
+
+import os
+import pickle
+import shutil
+
+import numpy as np
+import pytest
+
+from heads import head_outputs, save_heads, train_heads
+
+ML_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODEL_DIR = os.path.join(ML_DIR, 'models')
+
+
+def load_pickles():
+    with open(os.path.join(MODEL_DIR, 'scaler.pkl'), 'rb') as f:
+        scaler = pickle.load(f)
+    with open(os.path.join(MODEL_DIR, 'encoders.pkl'), 'rb') as f:
+        encoders = pickle.load(f)
+    return scaler, encoders
+
+
+@pytest.fixture(scope='module')
+def trained():
+    # Both heads, whether or not they beat their baselines
+    return train_heads(*load_pickles(), require_baseline=False)
+
+
+def test_heads_are_conditional_on_placement(trained):
+    heads, report = trained
+    assert 'not_placed' not in report['tier']['classes']
+    assert [str(c) for c in heads['tier'].classes_] == report['tier']['classes']
+
+
+def test_only_heads_that_beat_their_baseline_are_served(trained):
+    _, report = trained
+    assert report['package']['served'] == (report['package']['mae_lpa'] < report['package']['baseline_mae_lpa'])
+    assert report['tier']['served'] == (report['tier']['accuracy'] > report['tier']['baseline_accuracy'])
+
+    served, gated_report = train_heads(*load_pickles(), require_baseline=True)
+    assert sorted(served) == sorted(name for name in ('package', 'tier') if gated_report[name]['served'])
+
+
+def test_head_outputs_follow_the_placement_decision():
+    classes = np.array(['core', 'dream', 'mass'])
+    proba = np.array([0.2, 0.7, 0.1])
+    assert head_outputs(False, 12.5, proba, classes) == {'package_lpa': None, 'company_tier': None}
+    placed = head_outputs(True, 12.5, proba, classes)
+    assert placed['package_lpa'] == 12.5
+    assert placed['company_tier']['tier'] == 'dream'
+    # A head that is not served adds no field at all
+    assert head_outputs(True, None, proba, classes).keys() == {'company_tier'}
+    assert head_outputs(True) == {}
+
+
+def test_predictions_are_consistent_with_placement(trained, api_module, tmp_path, monkeypatch):
+    heads, _ = trained
+    model_dir = tmp_path / 'models'
+    shutil.copytree(MODEL_DIR, model_dir, ignore=shutil.ignore_patterns('bundle', '*.npz'))
+    save_heads(str(model_dir), heads)
+    from model_registry import load_model_version
+    version = load_model_version(str(model_dir))
+    monkeypatch.setattr(api_module, 'OUTCOME_HEADS', True)
+
+    from features import build_feature_block
+    rng = np.random.default_rng(0)
+    records = [
+        {'CGPA': float(rng.uniform(5, 10)), 'Backlogs': int(rng.integers(0, 4)), 'Internship': int(rng.integers(0, 2)),
+         'Projects': int(rng.integers(0, 6)), 'LeetCode_Problems': int(rng.integers(0, 400))}
+        for _ in range(200)
+    ]
+    features, _, _, context = build_feature_block(records, version.encoders)
+    results = api_module.score_block(version, features, context['branches'])
+    assert {r['placed'] for r in results} == {True, False}
+    for result in results:
+        if result['placed']:
+            assert result['package_lpa'] > 0
+            assert result['company_tier']['tier'] in ('core', 'dream', 'mass')
+        else:
+            assert result['package_lpa'] is None and result['company_tier'] is None
+
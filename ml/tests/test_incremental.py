@@ -0,0 +1,119 @@
+"""
+Incremental training: appended rows grow the forest, nothing new is a no-op,
+and a rewritten file or a delta the forest cannot warm-start on falls back
+to a full retrain with the run's search options.
+"""
+
+import functools
+import os
+import pickle
+import shutil
+
+import numpy as np
+import pytest
+
+import train_model
+from data_loading import load_dataset
+from training_state import RESERVOIR_FILE, TrainingState
+
+ML_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_PATH = os.path.join(ML_DIR, 'data', 'bmsit_placement_data.csv')
+TRAIN_ROWS = 1500
+
+
+def read_lines():
+    with open(DATA_PATH, 'rb') as f:
+        return f.read().splitlines(keepends=True)
+
+
+@pytest.fixture(scope='module')
+def trained(tmp_path_factory):
+    """A full training run on the first TRAIN_ROWS rows, copied per test"""
+    root = tmp_path_factory.mktemp('trained')
+    (root / 'models').mkdir()
+    (root / 'data.csv').write_bytes(b''.join(read_lines()[:TRAIN_ROWS + 1]))
+    with pytest.MonkeyPatch.context() as mp:
+        point_at(mp, root)
+        train_model.train_model()
+    return root
+
+
+def point_at(mp, root):
+    mp.setattr(train_model, 'DATA_PATH', str(root / 'data.csv'))
+    mp.setattr(train_model, 'MODEL_DIR', str(root / 'models'))
+    mp.setattr(train_model, 'load_dataset', functools.partial(load_dataset, cache_dir=str(root / 'cache')))
+
+
+@pytest.fixture()
+def workdir(trained, tmp_path, monkeypatch):
+    shutil.copytree(trained / 'models', tmp_path / 'models')
+    shutil.copy(trained / 'data.csv', tmp_path / 'data.csv')
+    # The state records the file it consumed; the copy is that file now
+    state = TrainingState.load(str(tmp_path / 'models'))
+    state.data_path = str(tmp_path / 'data.csv')
+    state.save(str(tmp_path / 'models'))
+    point_at(monkeypatch, tmp_path)
+    return tmp_path
+
+
+@pytest.fixture()
+def full_retrains(monkeypatch):
+    calls = []
+    monkeypatch.setattr(train_model, 'train_model', lambda **options: calls.append(options))
+    return calls
+
+
+def append(workdir, lines):
+    with open(workdir / 'data.csv', 'ab') as f:
+        f.write(b''.join(lines))
+
+
+def test_appended_rows_grow_the_forest_and_new_categories_get_new_codes(workdir, full_retrains):
+    before = TrainingState.load(str(workdir / 'models'))
+    with open(workdir / 'models' / 'encoders.pkl', 'rb') as f:
+        old_branches = list(pickle.load(f)['Branch'].classes_)
+    new_rows = read_lines()[TRAIN_ROWS + 1:TRAIN_ROWS + 201]
+    new_rows[0] = new_rows[0].replace(new_rows[0].split(b',')[0], b'Robotics', 1)
+    append(workdir, new_rows)
+
+    model, _, encoders = train_model.train_incremental(new_trees=5)
+    assert not full_retrains
+    assert len(model.estimators_) == model.n_estimators == 105
+    # Existing codes keep their meaning; the unseen branch is appended
+    assert list(encoders['Branch'].classes_) == old_branches + ['Robotics']
+
+    state = TrainingState.load(str(workdir / 'models'))
+    assert state.rows == before.rows + 200
+    assert state.offset == os.path.getsize(workdir / 'data.csv')
+    assert state.updates[-1]['new_categories'] == {'Branch': ['Robotics']}
+
+
+def test_no_new_rows_is_a_no_op(workdir, full_retrains):
+    before = (workdir / 'models' / 'placement_model.pkl').read_bytes()
+    model, _, _ = train_model.train_incremental(new_trees=5)
+    assert not full_retrains
+    assert len(model.estimators_) == 100
+    assert (workdir / 'models' / 'placement_model.pkl').read_bytes() == before
+    assert TrainingState.load(str(workdir / 'models')).updates == []
+
+
+def test_rewritten_file_falls_back_to_a_full_retrain_with_search_options(workdir, full_retrains):
+    lines = read_lines()[:TRAIN_ROWS + 1]
+    # Same length, different bytes before the recorded offset
+    lines[-1] = lines[-1][:-2] + (b'0' if lines[-1][-2:-1] == b'1' else b'1') + b'\n'
+    (workdir / 'data.csv').write_bytes(b''.join(lines))
+    append(workdir, read_lines()[TRAIN_ROWS + 1:TRAIN_ROWS + 11])
+
+    train_model.train_incremental(search=True, metric='f1', workers=2)
+    assert full_retrains == [{'search': True, 'metric': 'f1', 'workers': 2}]
+
+
+def test_single_class_delta_falls_back_to_a_full_retrain(workdir, full_retrains):
+    os.remove(workdir / 'models' / RESERVOIR_FILE)
+    placed = [line for line in read_lines()[TRAIN_ROWS + 1:] if line.rstrip().endswith(b',1')][:20]
+    append(workdir, placed)
+
+    train_model.train_incremental(search=True)
+    assert full_retrains == [{'search': True, 'metric': 'accuracy', 'workers': None}]
+    with open(workdir / 'models' / 'placement_model.pkl', 'rb') as f:
+        assert np.array_equal(pickle.load(f).classes_, [0, 1])
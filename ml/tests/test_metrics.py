@@ -0,0 +1,64 @@
+"""
+/metrics: Prometheus text exposition, every sample under a declared family.
+"""
+
+import re
+
+from metrics import CONTENT_TYPE, MetricsRegistry
+
+SAMPLE = re.compile(r'^([a-zA-Z_:][a-zA-Z0-9_:]*)(\{[^}]*\})? (\S+)$')
+
+
+def parse(text):
+    """{family: kind} and [(sample name, labels, value)]; fails on a malformed line"""
+    kinds, samples = {}, []
+    for line in text.splitlines():
+        if line.startswith('# TYPE '):
+            _, _, name, kind = line.split(' ', 3)
+            assert name not in kinds, f'{name} declared twice'
+            kinds[name] = kind
+        elif not line.startswith('#'):
+            match = SAMPLE.match(line)
+            assert match, line
+            samples.append((match.group(1), match.group(2) or '', float(match.group(3))))
+    return kinds, samples
+
+
+def family_of(name, kinds):
+    if name in kinds:
+        return name
+    for suffix in ('_bucket', '_sum', '_count'):
+        if name.endswith(suffix) and kinds.get(name[:-len(suffix)]) == 'histogram':
+            return name[:-len(suffix)]
+    raise AssertionError(f'sample {name} has no HELP/TYPE family')
+
+
+def test_counter_family_is_named_after_its_samples():
+    registry = MetricsRegistry()
+    requests = registry.counter('demo_requests', 'Requests', ['status'])
+    latency = registry.histogram('demo_seconds', 'Latency', buckets=(0.1, 1.0))
+    requests.labels(200).inc()
+    requests.labels(200).inc(2)
+    latency.observe(0.5)
+
+    text = registry.render()
+    assert '# TYPE demo_requests_total counter' in text
+    assert '# HELP demo_requests_total Requests' in text
+    assert 'demo_requests_total{status="200"} 3' in text
+    assert 'demo_seconds_bucket{le="0.1"} 0' in text
+    assert 'demo_seconds_bucket{le="+Inf"} 1' in text
+    assert 'demo_seconds_count 1' in text
+
+
+def test_metrics_endpoint_format(client):
+    client.post('/predict', json={'CGPA': 8.1})
+    response = client.get('/metrics')
+    assert response.status_code == 200
+    assert response.headers['Content-Type'] == CONTENT_TYPE
+
+    kinds, samples = parse(response.get_data(as_text=True))
+    for name, _, _ in samples:
+        family_of(name, kinds)
+    assert kinds['ml_requests_total'] == 'counter'
+    assert any(name == 'ml_requests_total' and 'endpoint="predict"' in labels and value >= 1
+               for name, labels, value in samples)
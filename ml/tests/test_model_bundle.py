@@ -0,0 +1,90 @@
+"""
+Model bundle: a written bundle loads back unchanged, and a bundle with a
+corrupt file, a tampered manifest or another format version is rejected.
+"""
+
+import json
+import os
+import pickle
+
+import numpy as np
+import pytest
+
+from flat_forest import FlatForest
+from model_bundle import MANIFEST_FILE, BundleError, bundle_checksum, load_bundle, write_bundle
+
+ML_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODEL_DIR = os.path.join(ML_DIR, 'models')
+
+
+@pytest.fixture(scope='module')
+def forest():
+    with open(os.path.join(MODEL_DIR, 'placement_model.pkl'), 'rb') as f:
+        model = pickle.load(f)
+    with open(os.path.join(MODEL_DIR, 'scaler.pkl'), 'rb') as f:
+        scaler = pickle.load(f)
+    return FlatForest.from_sklearn(model).fold_scaler(scaler.mean_, scaler.scale_), scaler
+
+
+@pytest.fixture()
+def bundle_path(forest, tmp_path):
+    forest, scaler = forest
+    path = str(tmp_path / 'bundle')
+    write_bundle(path, forest, scaler.mean_, scaler.scale_, {'Branch': ['CSE', 'ECE'], 'Gender': ['Female', 'Male']},
+                 {'accuracy': 64.75})
+    return path
+
+
+def edit_manifest(bundle_path, edit, reseal=False):
+    path = os.path.join(bundle_path, MANIFEST_FILE)
+    with open(path) as f:
+        manifest = json.load(f)
+    edit(manifest)
+    if reseal:
+        manifest['checksum'] = bundle_checksum(manifest['files'])
+    with open(path, 'w') as f:
+        json.dump(manifest, f)
+
+
+def test_bundle_round_trip(forest, bundle_path):
+    forest, _ = forest
+    bundle = load_bundle(bundle_path)
+    for name in FlatForest.ARRAYS:
+        np.testing.assert_array_equal(getattr(bundle.forest, name), getattr(forest, name))
+    assert bundle.forest.raw_inputs and bundle.metadata['accuracy'] == 64.75
+
+
+def test_corrupt_array_file_is_rejected(bundle_path):
+    path = os.path.join(bundle_path, 'forest_threshold.npy')
+    with open(path, 'r+b') as f:
+        f.seek(-1, os.SEEK_END)
+        last = f.read(1)
+        f.seek(-1, os.SEEK_END)
+        f.write(bytes([last[0] ^ 0xFF]))
+    with pytest.raises(BundleError, match='Checksum mismatch for forest_threshold.npy'):
+        load_bundle(bundle_path)
+    # Same shape and dtype, so only the checksum pass can tell
+    load_bundle(bundle_path, verify=False)
+
+
+def test_tampered_manifest_is_rejected(bundle_path):
+    edit_manifest(bundle_path, lambda m: m['files']['forest_threshold'].update(sha256='0' * 64))
+    with pytest.raises(BundleError, match='manifest checksum mismatch'):
+        load_bundle(bundle_path)
+
+
+def test_manifest_shape_must_match_the_file(bundle_path):
+    edit_manifest(bundle_path, lambda m: m['files']['forest_feature'].update(shape=[1]), reseal=True)
+    with pytest.raises(BundleError, match='does not match the manifest'):
+        load_bundle(bundle_path, verify=False)
+
+
+def test_other_format_version_is_rejected(bundle_path):
+    edit_manifest(bundle_path, lambda m: m.update(format_version=99))
+    with pytest.raises(BundleError, match='Unsupported bundle format 99'):
+        load_bundle(bundle_path)
+
+
+def test_missing_manifest_is_rejected(tmp_path):
+    with pytest.raises(BundleError, match='No bundle manifest'):
+        load_bundle(str(tmp_path))
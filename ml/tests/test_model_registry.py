@@ -0,0 +1,36 @@
+"""
+Model registry: every engine loaded from ml/models/ scores the same way.
+"""
+
+import os
+import warnings
+
+import numpy as np
+import pytest
+
+from features import build_feature_block
+from model_registry import load_model_version
+
+ML_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODEL_DIR = os.path.join(ML_DIR, 'models')
+
+RECORDS = [
+    {'CGPA': 8.1, 'Internship': 1, 'Projects': 3},
+    {'CGPA': 6.0, 'Backlogs': 2, 'Branch': 'Civil'},
+    {'CGPA': 9.4, 'LeetCode_Problems': 350, 'Branch': 'CSE'},
+]
+
+
+@pytest.fixture(scope='module')
+def versions():
+    return load_model_version(MODEL_DIR), load_model_version(MODEL_DIR, engine='sklearn')
+
+
+def test_sklearn_engine_scales_without_feature_name_warnings(versions):
+    flat, sklearn = versions
+    features = build_feature_block(RECORDS, flat.encoders)[0]
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        proba = sklearn.predict_proba(features)
+    assert sklearn.engine == 'sklearn'
+    np.testing.assert_allclose(proba, flat.predict_proba(features))
@@ -0,0 +1,46 @@
+"""
+Model search cache: fold results are reused only for the same data, the same
+full estimator configuration and the same scikit-learn release.
+"""
+
+import numpy as np
+import pytest
+from sklearn.neighbors import KNeighborsClassifier
+
+import model_search
+from model_search import run_search
+
+FAMILY = 'K-Nearest Neighbors'
+
+
+@pytest.fixture()
+def data():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(200, 4))
+    return X, (X[:, 0] + rng.normal(0, 0.5, 200) > 0).astype(np.int64)
+
+
+def search(data, cache_dir):
+    _, report = run_search(*data, families=[FAMILY], workers=1, cache_dir=str(cache_dir))
+    return report
+
+
+def test_unchanged_rerun_is_fully_cached(data, tmp_path):
+    first = search(data, tmp_path)
+    assert first['fits_cached'] == 0 and first['fits_run'] > 0
+    second = search(data, tmp_path)
+    assert second['fits_run'] == 0 and second['fits_cached'] == first['fits_run']
+    assert second['model_comparison'] == first['model_comparison']
+
+
+def test_base_estimator_change_invalidates_results(data, tmp_path, monkeypatch):
+    first = search(data, tmp_path)
+    _, grid, final = model_search.MODEL_FAMILIES[FAMILY]
+    monkeypatch.setitem(model_search.MODEL_FAMILIES, FAMILY, (KNeighborsClassifier(p=1), grid, final))
+    assert search(data, tmp_path)['fits_run'] == first['fits_run']
+
+
+def test_sklearn_upgrade_invalidates_results(data, tmp_path, monkeypatch):
+    first = search(data, tmp_path)
+    monkeypatch.setattr(model_search.sklearn, '__version__', '99.0')
+    assert search(data, tmp_path)['fits_run'] == first['fits_run']
@@ -0,0 +1,69 @@
+"""
+Prediction cache: LRU/TTL eviction, repeated requests are served from it,
+and a model swap empties it.
+"""
+
+import os
+import shutil
+
+from model_registry import ModelRegistry
+from prediction_cache import PredictionCache
+
+ML_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODEL_DIR = os.path.join(ML_DIR, 'models')
+STUDENT = {'CGPA': 7.7, 'Branch': 'ECE', 'Projects': 2, 'LeetCode_Problems': 120}
+
+
+def test_lru_and_ttl_eviction():
+    now = [0.0]
+    cache = PredictionCache(maxsize=2, ttl=10, clock=lambda: now[0])
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.get('a') == 1
+    cache.put('c', 3)
+    # 'b' was the least recently used
+    assert cache.get('b') is None and cache.get('a') == 1 and cache.get('c') == 3
+    now[0] = 10.0
+    assert cache.get('a') is None
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['evictions'], stats['expirations']) == (3, 2, 1, 1)
+
+
+def test_disabled_cache_never_stores():
+    cache = PredictionCache(maxsize=0)
+    cache.put('a', 1)
+    assert cache.get('a') is None and len(cache) == 0
+
+
+def test_repeated_request_is_a_cache_hit(client, api_module):
+    api_module.prediction_cache.clear()
+    first = client.post('/predict', json=STUDENT)
+    hits = api_module.prediction_cache.stats()['hits']
+    second = client.post('/predict', json=STUDENT)
+    assert first.status_code == second.status_code == 200
+    assert second.get_json() == first.get_json()
+    assert api_module.prediction_cache.stats()['hits'] == hits + 1
+
+
+def test_model_swap_invalidates_the_cache(client, api_module, tmp_path, monkeypatch):
+    model_dir = tmp_path / 'models'
+    shutil.copytree(MODEL_DIR, model_dir, ignore=shutil.ignore_patterns('bundle', '*.npz'))
+    registry = ModelRegistry(str(model_dir), on_swap=api_module.on_model_swap)
+    monkeypatch.setattr(api_module, 'registry', registry)
+    registry.reload()
+    client.post('/predict', json=STUDENT)
+    client.post('/predict', json=STUDENT)
+    before = api_module.prediction_cache.stats()
+    assert before['size'] > 0
+
+    # A retrained model lands in the directory
+    model_path = model_dir / 'placement_model.pkl'
+    stat = os.stat(model_path)
+    os.utime(model_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    old = registry.current
+    assert registry.reload() is not old
+
+    after = api_module.prediction_cache.stats()
+    assert after['size'] == 0 and after['invalidations'] == before['invalidations'] + 1
+    client.post('/predict', json=STUDENT)
+    assert api_module.prediction_cache.stats()['misses'] == after['misses'] + 1
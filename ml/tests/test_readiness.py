@@ -0,0 +1,33 @@
+"""
+Readiness gate: until warmup has finished, prediction routes and /ready
+answer 503 while /health stays up for the orchestrator.
+"""
+
+import pytest
+
+
+@pytest.fixture()
+def warming_up(api_module):
+    api_module.ready.clear()
+    try:
+        yield
+    finally:
+        api_module.ready.set()
+
+
+def test_gate_answers_503_before_warmup(client, warming_up):
+    response = client.post('/predict', json={'CGPA': 8.1})
+    assert response.status_code == 503 and 'warming up' in response.get_json()['error']
+    assert client.post('/predict/batch', json=[{'CGPA': 8.1}]).status_code == 503
+    assert client.get('/branches').status_code == 503
+
+    response = client.get('/ready')
+    assert response.status_code == 503 and response.get_json() == {'ready': False}
+    response = client.get('/health')
+    assert response.status_code == 200 and response.get_json()['ready'] is False
+
+
+def test_gate_opens_once_ready(client, api_module):
+    assert api_module.ready.is_set()
+    assert client.get('/ready').get_json() == {'ready': True}
+    assert client.post('/predict', json={'CGPA': 8.1}).status_code == 200
@@ -0,0 +1,94 @@
+"""
+Similar-students index: the delta survives a save/load, inserts reach the
+served index and the file, and a model swap drops an index built in memory.
+"""
+
+import os
+import pickle
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from similarity import INDEX_FILE, IndexFile, SimilarityIndex, build_index
+
+ML_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODEL_DIR = os.path.join(ML_DIR, 'models')
+STUDENTS_CSV = os.path.join(ML_DIR, 'data', 'students.csv')
+
+
+@pytest.fixture(scope='module')
+def scaler_params():
+    with open(os.path.join(MODEL_DIR, 'scaler.pkl'), 'rb') as f:
+        scaler = pickle.load(f)
+    with open(os.path.join(MODEL_DIR, 'encoders.pkl'), 'rb') as f:
+        encoders = pickle.load(f)
+    return scaler.mean_, scaler.scale_, encoders['Branch'].classes_
+
+
+def season(n=20):
+    df = pd.read_csv(STUDENTS_CSV, dtype=str).head(n).copy()
+    df['year'] = '2030'
+    return df
+
+
+def brute_force(index, points, k):
+    distances = np.sqrt(((points[:, None, :] - index.points[None, :, :]) ** 2).sum(axis=2))
+    return np.sort(distances, axis=1)[:, :k]
+
+
+def test_delta_is_persisted(scaler_params, tmp_path):
+    index = build_index(*scaler_params)
+    files = IndexFile(str(tmp_path))
+    index.save(files.path)
+    files.insert(season())
+    assert files.current().describe()['delta'] == 20
+
+    loaded = SimilarityIndex.load(str(tmp_path / INDEX_FILE))
+    assert loaded.n_tree == index.n_tree and len(loaded) == len(index) + 20
+    points = loaded.points[::37]
+    distances, _ = loaded.query(points, k=5)
+    np.testing.assert_allclose(distances, brute_force(loaded, points, 5), atol=1e-9)
+
+
+def test_insert_serves_new_records_without_touching_the_old_index(scaler_params, tmp_path):
+    build_index(*scaler_params).save(str(tmp_path / INDEX_FILE))
+    files = IndexFile(str(tmp_path))
+    before = files.current()
+    assert files.insert(season(5)) == 5
+    after = files.current()
+    assert after is not before and len(after) == len(before) + 5
+    assert 2030 not in before.records['year'] and (after.records['year'] == 2030).sum() == 5
+    # Another worker reading the file sees the same records
+    assert len(IndexFile(str(tmp_path)).current()) == len(after)
+
+
+def test_model_swap_drops_an_index_built_in_memory(scaler_params, tmp_path):
+    params = list(scaler_params)
+    files = IndexFile(str(tmp_path), scaler_params=lambda: params)
+    first = files.current()
+    files.invalidate()
+    params[1] = params[1] * 2
+    rebuilt = files.current()
+    assert rebuilt is not first
+    assert not np.allclose(rebuilt.scale, first.scale)
+
+    # An index written by training is left alone; it changes with its file
+    rebuilt.save(files.path)
+    from_file = files.current()
+    files.invalidate()
+    assert files.current() is from_file
+
+
+def test_admin_insert_endpoint(api_module, client, scaler_params, tmp_path, monkeypatch):
+    build_index(*scaler_params).save(str(tmp_path / INDEX_FILE))
+    monkeypatch.setattr(api_module, 'similar_index', IndexFile(str(tmp_path)))
+    records = season(3).to_dict('records')
+    response = client.post('/admin/similar/records', json={'records': records})
+    assert response.status_code == 200
+    assert response.get_json()['inserted'] == 3
+    assert response.get_json()['similarity_index']['delta'] == 3
+
+    records[0]['cgpa'] = 'eleven'
+    response = client.post('/admin/similar/records', json=records)
+    assert response.status_code == 400 and 'cgpa' in response.get_json()['error']
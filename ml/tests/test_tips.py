@@ -0,0 +1,35 @@
+"""
+Tip rule tables: the batch (mask) path agrees with the per-row path, for
+tables of any size.
+"""
+
+import numpy as np
+import pytest
+
+from features import FEATURE_COLS
+from tips import ROW_PATH_MAX, TipTable
+
+
+def table(n_rules):
+    messages = {f'm{i}': f'tip {i}' for i in range(n_rules)}
+    rules = [
+        {'message': f'm{i}', 'when': [['CGPA', '>=', 5 + i * 5 / n_rules]],
+         **({'branches': ['CSE', 'ISE']} if i % 3 == 0 else {})}
+        for i in range(n_rules)
+    ]
+    return TipTable({'messages': messages, 'rules': rules}, version='test')
+
+
+@pytest.mark.parametrize('n_rules', [0, 9, 63, 64, 200])
+def test_batch_tips_match_row_tips(n_rules):
+    rng = np.random.default_rng(n_rules)
+    rows = ROW_PATH_MAX * 8
+    features = np.zeros((rows, len(FEATURE_COLS)))
+    features[:, FEATURE_COLS.index('CGPA')] = rng.uniform(4, 10, rows)
+    branches = rng.choice(['CSE', 'ECE', 'Civil', 'Robotics'], rows)
+    tips = table(n_rules)
+    expected = [tips.for_row(row, branch) for row, branch in zip(features, branches)]
+    assert tips.evaluate(features, branches) == expected
+    if n_rules == 200:
+        # Rules past the first 63 fire too
+        assert any('tip 199' in row_tips for row_tips in expected)
@@ -0,0 +1,182 @@
+"""
+Improvement Tips
+Tips are a declarative rule table (tip_rules.json): each rule is a message id,
+one or more (feature, operator, threshold) conditions that must all hold, and
+an optional branch set. A table is compiled once and evaluated as boolean
+masks over a whole encoded feature block; edits to the file are picked up
+without a restart.
+"""
+
+import hashlib
+import json
+import operator
+import os
+import threading
+import time
+
+import numpy as np
+
+from features import FEATURE_COLS
+
+RULES_FILE = os.environ.get(
+    'ML_TIP_RULES', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tip_rules.json')
+)
+
+# Operator -> (scalar function for one row, ufunc for a block)
+OPERATORS = {
+    '<': (operator.lt, np.less),
+    '<=': (operator.le, np.less_equal),
+    '>': (operator.gt, np.greater),
+    '>=': (operator.ge, np.greater_equal),
+    '==': (operator.eq, np.equal),
+    '!=': (operator.ne, np.not_equal),
+}
+
+# Blocks up to this size are evaluated row by row; the masks only pay off above it
+ROW_PATH_MAX = 32
+# Fired rules are packed into int64 bit patterns this many at a time
+RULES_PER_WORD = 63
+
+
+class TipTable:
+    """One compiled version of the rule table; immutable once built"""
+
+    def __init__(self, spec, version):
+        self.version = version
+        messages = spec['messages']
+        self.rules = []
+        for rule in spec['rules']:
+            if rule['message'] not in messages:
+                raise ValueError(f"Tip rule refers to unknown message '{rule['message']}'")
+            conditions = []
+            for feature, op, threshold in rule['when']:
+                if feature not in FEATURE_COLS:
+                    raise ValueError(f"Tip rule uses unknown feature '{feature}'")
+                if op not in OPERATORS:
+                    raise ValueError(f"Tip rule uses unknown operator '{op}'")
+                conditions.append((FEATURE_COLS.index(feature), *OPERATORS[op], float(threshold)))
+            branches = rule.get('branches')
+            self.rules.append((
+                rule['message'], messages[rule['message']], conditions,
+                frozenset(branches) if branches is not None else None
+            ))
+
+    @classmethod
+    def from_file(cls, path):
+        with open(path, 'rb') as f:
+            raw = f.read()
+        return cls(json.loads(raw), hashlib.sha256(raw).hexdigest()[:12])
+
+    def for_row(self, row, branch):
+        """Tips for one encoded feature row (plain comparisons, no array overhead)"""
+        values = row.tolist() if hasattr(row, 'tolist') else row
+        tips = []
+        for _, text, conditions, branches in self.rules:
+            if branches is not None and branch not in branches:
+                continue
+            if all(compare(values[col], threshold) for col, compare, _, threshold in conditions):
+                tips.append(text)
+        return tips
+
+    def masks(self, features, branches):
+        """Boolean (rules x rows) matrix: which rule fires for which row"""
+        features = np.asarray(features, dtype=np.float64)
+        # Branch sets are tested once per distinct name, then spread to the rows
+        names, positions = np.unique(np.asarray(branches, dtype=object).astype(str), return_inverse=True)
+        masks = np.ones((len(self.rules), len(features)), dtype=bool)
+        for i, (_, _, conditions, branch_set) in enumerate(self.rules):
+            for col, _, ufunc, threshold in conditions:
+                masks[i] &= ufunc(features[:, col], threshold)
+            if branch_set is not None:
+                masks[i] &= np.array([name in branch_set for name in names], dtype=bool)[positions.ravel()]
+        return masks
+
+    def evaluate(self, features, branches):
+        """
+        Tip lists for every row of a block. Rows that fire the same rules share
+        one list, so the per-row work is a lookup; the lists must not be mutated.
+        """
+        if len(features) <= ROW_PATH_MAX:
+            return [self.for_row(row, branch) for row, branch in zip(features, branches)]
+        masks = self.masks(features, branches)
+        # Encode each row's fired rules as integers (one per 63 rules, so a table of any
+        # size fits), find the distinct patterns, then build each distinct list once
+        weights = np.left_shift(1, np.arange(RULES_PER_WORD, dtype=np.int64))
+        blocks = [masks[start:start + RULES_PER_WORD] for start in range(0, max(len(masks), 1), RULES_PER_WORD)]
+        words = np.stack([weights[:len(block)] @ block for block in blocks])
+        if len(words) == 1:
+            _, first, inverse = np.unique(words[0], return_index=True, return_inverse=True)
+        else:
+            _, first, inverse = np.unique(words.T, axis=0, return_index=True, return_inverse=True)
+        texts = [text for _, text, _, _ in self.rules]
+        lists = [[text for text, fired in zip(texts, pattern) if fired] for pattern in masks[:, first].T.tolist()]
+        return [lists[i] for i in inverse.ravel()]
+
+
+class TipRules:
+    """
+    Serves the current TipTable and swaps in a new one when the rules file
+    changes. A table that fails to load or compile is reported and the previous
+    one keeps serving.
+    """
+
+    def __init__(self, path=RULES_FILE, on_reload=None):
+        self.path = path
+        self.on_reload = on_reload
+        self.current = None
+        self.last_error = None
+        self._signature = None
+        self._lock = threading.Lock()
+        self._watch_pid = None
+
+    def signature(self):
+        stat = os.stat(self.path)
+        return stat.st_mtime_ns, stat.st_size
+
+    def reload(self, force=False):
+        with self._lock:
+            signature = self.signature()
+            if not force and self.current is not None and signature == self._signature:
+                return self.current
+            self._signature = signature
+            try:
+                table = TipTable.from_file(self.path)
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                self.last_error = f"{type(e).__name__}: {e}"
+                print(f"❌ Tip rules reload failed, keeping {self.current.version if self.current else 'no rules'}: {self.last_error}")
+                if self.current is None:
+                    raise
+                return self.current
+            changed = self.current is None or table.version != self.current.version
+            self.current = table
+            self.last_error = None
+        if changed:
+            print(f"💡 Serving tip rules {table.version} ({len(table.rules)} rules)")
+            if self.on_reload:
+                self.on_reload(table)
+        return table
+
+    def watch(self, interval):
+        """Poll the rules file in a daemon thread (once per process, like the model watcher)"""
+        if interval <= 0 or self._watch_pid == os.getpid():
+            return
+        self._watch_pid = os.getpid()
+        thread = threading.Thread(target=self._watch_loop, args=(interval,), daemon=True, name='tip-watcher')
+        thread.start()
+
+    def _watch_loop(self, interval):
+        while True:
+            time.sleep(interval)
+            try:
+                self.reload()
+            except OSError:
+                # Rules file briefly missing while an editor replaces it
+                pass
+
+    def status(self):
+        return {
+            'version': self.current.version if self.current else None,
+            'rules': len(self.current.rules) if self.current else 0,
+            'path': self.path,
+            'last_error': self.last_error
+        }
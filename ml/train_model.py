@@ -1,28 +1,80 @@
 """
 BMSIT Placement Prediction Model Training
 Trains a Random Forest model on BMSIT-specific placement data
+
+With --search, cross-validates six model families and a small hyperparameter
+grid each (see model_search.py) and keeps the best one. With --incremental,
+only rows appended to the CSV since the last run are read and the forest
+grows new trees for them (see training_state.py).
 """
 
 import pandas as pd
 import numpy as np
 from sklearn.model_selection import train_test_split, cross_val_score
 from sklearn.ensemble import RandomForestClassifier
+from sklearn.inspection import permutation_importance
 from sklearn.preprocessing import LabelEncoder, StandardScaler
 from sklearn.metrics import accuracy_score, classification_report, confusion_matrix
+import argparse
 import pickle
 import os
 import json
+import shutil
+import time
+
+from export_model import export_bundle, parity_inputs
+from features import compile_encoders
+from flat_forest import FlatForest
+from heads import load_heads, save_heads, train_heads
+from model_bundle import BUNDLE_DIR
+from model_search import build_estimator, run_search
+from similarity import INDEX_FILE, build_index
+from data_loading import PLACEMENT_SCHEMA, apply_schema, load_dataset
+from drift import CATEGORICAL, build_reference, load_reference, save_reference
+from training_state import TrainingState, load_reservoir, read_rows, tail_hash, update_reservoir
+
+# Paths
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_PATH = os.path.join(SCRIPT_DIR, 'data', 'bmsit_placement_data.csv')
+MODEL_DIR = os.path.join(SCRIPT_DIR, 'models')
+
+# Incremental updates: trees added per run, and the cap after which the oldest trees are dropped
+NEW_TREES = 20
+MAX_TREES = 300
 
-def train_model():
-    # Paths
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    data_path = os.path.join(script_dir, 'data', 'bmsit_placement_data.csv')
-    model_dir = os.path.join(script_dir, 'models')
+def model_importances(model, X_test, y_test):
+    """feature_importances_ where the model has them, permutation importance otherwise"""
+    if hasattr(model, 'feature_importances_'):
+        return model.feature_importances_
+    result = permutation_importance(model, X_test, y_test, n_repeats=5, random_state=42)
+    importances = np.clip(result.importances_mean, 0, None)
+    return importances / importances.sum() if importances.sum() > 0 else importances
+
+def encode_categorical(values):
+    """Fit a LabelEncoder on a categorical column through its categories, not per row"""
+    encoder = LabelEncoder().fit(np.asarray(values.cat.categories, dtype=object))
+    codes = encoder.transform(np.asarray(values.cat.categories, dtype=object))[values.cat.codes.to_numpy()]
+    return encoder, codes
+
+def print_comparison(report):
+    print(f"\n🏁 Model comparison ({report['n_folds']}-fold CV, best candidate per family):")
+    print(f"   {'Model':<22} {'Accuracy':>9} {'+/-':>6} {'F1':>7}  Params")
+    for family, row in report['model_comparison'].items():
+        print(f"   {family:<22} {row['accuracy']*100:>8.2f}% {row['accuracy_std']*100:>5.2f} "
+              f"{row['f1_score']*100:>6.2f}%  {row['params']}")
+    print(f"   Search took {report['wall_seconds']}s: {report['fits_run']} fits run, "
+          f"{report['fits_cached']} cached, {report['workers']} workers")
+
+def train_model(search=False, metric='accuracy', workers=None):
+    data_path = DATA_PATH
+    model_dir = MODEL_DIR
     os.makedirs(model_dir, exist_ok=True)
     
-    # Load data
+    # Load data (typed and validated; later runs map the columnar cache in data/.cache).
+    # The byte offset of the rows loaded is where --incremental resumes
     print("📂 Loading BMSIT placement data...")
-    df = pd.read_csv(data_path)
+    df, source = load_dataset(data_path, PLACEMENT_SCHEMA)
+    offset, header = source['offset'], source['header']
     print(f"   Total records: {len(df)}")
     
     # Features and target
@@ -33,24 +85,24 @@ def train_model():
     ]
     target_col = 'PlacedOrNot'
     
-    X = df[feature_cols].copy()
-    y = df[target_col].copy()
+    X = df[feature_cols]
+    y = df[target_col]
     
     # Encode categorical features
     print("🔄 Encoding categorical features...")
     encoders = {}
+    columns = {col: X[col] for col in feature_cols}
     
     # Encode Branch
-    le_branch = LabelEncoder()
-    X['Branch'] = le_branch.fit_transform(X['Branch'])
+    le_branch, columns['Branch'] = encode_categorical(X['Branch'])
     encoders['Branch'] = le_branch
     print(f"   Branches: {list(le_branch.classes_)}")
     
     # Encode Gender
-    le_gender = LabelEncoder()
-    X['Gender'] = le_gender.fit_transform(X['Gender'])
+    le_gender, columns['Gender'] = encode_categorical(X['Gender'])
     encoders['Gender'] = le_gender
     print(f"   Genders: {list(le_gender.classes_)}")
+    X = pd.DataFrame(columns)
     
     # Train-test split
     X_train, X_test, y_train, y_test = train_test_split(
@@ -63,15 +115,27 @@ def train_model():
     X_train_scaled = scaler.fit_transform(X_train)
     X_test_scaled = scaler.transform(X_test)
     
-    # Train Random Forest
-    print("🌲 Training Random Forest...")
-    model = RandomForestClassifier(
-        n_estimators=100,
-        max_depth=10,
-        min_samples_split=5,
-        random_state=42,
-        n_jobs=-1
-    )
+    search_report = None
+    if search:
+        # Folds are scaled independently inside the search; the final model uses the scaler above
+        print(f"🔍 Searching model families (metric: {metric})...")
+        (model_name, params), search_report = run_search(
+            X_train.to_numpy(dtype=np.float64), y_train.to_numpy(), metric=metric, workers=workers
+        )
+        print_comparison(search_report)
+        print(f"\n🏆 Training best model: {model_name} {params}")
+        model = build_estimator(model_name, params, final=True)
+    else:
+        # Train Random Forest
+        print("🌲 Training Random Forest...")
+        model_name = 'Random Forest'
+        model = RandomForestClassifier(
+            n_estimators=100,
+            max_depth=10,
+            min_samples_split=5,
+            random_state=42,
+            n_jobs=-1
+        )
     model.fit(X_train_scaled, y_train)
     
     # Evaluate
@@ -80,20 +144,82 @@ def train_model():
     accuracy = accuracy_score(y_test, y_pred)
     print(f"   Accuracy: {accuracy*100:.2f}%")
     
-    # Cross-validation
-    cv_scores = cross_val_score(model, X_train_scaled, y_train, cv=5)
-    print(f"   5-Fold CV Accuracy: {cv_scores.mean()*100:.2f}% (+/- {cv_scores.std()*100:.2f}%)")
+    # Cross-validation (already done by the search; otherwise folds run in parallel)
+    if search_report:
+        best = search_report['model_comparison'][model_name]
+        cv_mean, cv_std = best['accuracy'], best['accuracy_std']
+    else:
+        cv_scores = cross_val_score(model, X_train_scaled, y_train, cv=5, n_jobs=-1)
+        cv_mean, cv_std = cv_scores.mean(), cv_scores.std()
+    print(f"   5-Fold CV Accuracy: {cv_mean*100:.2f}% (+/- {cv_std*100:.2f}%)")
     
     print("\n📋 Classification Report:")
     print(classification_report(y_test, y_pred, target_names=['Not Placed', 'Placed']))
     
     # Feature importance
     print("\n🎯 Feature Importance:")
-    feature_importance = dict(zip(feature_cols, model.feature_importances_))
+    feature_importance = dict(zip(feature_cols, model_importances(model, X_test_scaled, y_test)))
     for feature, importance in sorted(feature_importance.items(), key=lambda x: x[1], reverse=True):
         print(f"   {feature}: {importance*100:.1f}%")
     
-    # Save artifacts
+    # Save metadata
+    metadata = {
+        'features': feature_cols,
+        'target': target_col,
+        'model': model_name,
+        'accuracy': round(accuracy * 100, 2),
+        'cv_accuracy': round(cv_mean * 100, 2),
+        'feature_importance': {k: round(v * 100, 1) for k, v in feature_importance.items()},
+        'branches': list(le_branch.classes_),
+        'n_samples': len(df)
+    }
+    
+    # Package and company-tier heads, on the same encoders and scaler
+    print("\n💰 Training package and company-tier heads...")
+    heads, heads_report = train_heads(scaler, encoders)
+    package, tier = heads_report['package'], heads_report['tier']
+    print(f"   Package: MAE {package['mae_lpa']} LPA (mean-only baseline {package['baseline_mae_lpa']}), "
+          f"R² {package['r2']} - {'served' if package['served'] else 'not served'}")
+    print(f"   Company tier: accuracy {tier['accuracy']*100:.2f}% (majority baseline {tier['baseline_accuracy']*100:.2f}%) "
+          f"over {tier['classes']} - {'served' if tier['served'] else 'not served'}")
+    metadata['heads'] = heads_report
+    if search_report:
+        metadata['model_params'] = search_report['best_params']
+        metadata['model_comparison'] = search_report['model_comparison']
+        metadata['search'] = {k: v for k, v in search_report.items() if k != 'model_comparison'}
+    
+    # Training distribution for the API's drift monitor; probabilities from the held-out rows
+    drift_reference = build_reference(
+        X.to_numpy(dtype=np.float64), model.predict_proba(X_test_scaled)[:, 1],
+        {col: encoders[col].classes_ for col in CATEGORICAL}
+    )
+    
+    save_artifacts(model_dir, model, scaler, encoders, metadata, X.to_numpy(dtype=np.float64), heads, drift_reference)
+    
+    # Past students' outcomes for /similar, in this scaler's feature space
+    print("\n🧭 Building similar-students index...")
+    index = build_index(scaler.mean_, scaler.scale_, encoders['Branch'].classes_)
+    index.save(os.path.join(model_dir, INDEX_FILE))
+    print(f"   {len(index)} past records indexed")
+    
+    # Starting point for --incremental: everything up to `offset` has been learned
+    state = TrainingState(data_path, offset, len(df), header, tail_hash(data_path, offset))
+    state.seen = update_reservoir(
+        model_dir, np.zeros((0, len(feature_cols))), np.zeros(0, dtype=np.int64),
+        X.to_numpy(dtype=np.float64), y.to_numpy(), 0, seed=42
+    )
+    state.save(model_dir)
+    
+    print("✅ Model training complete!")
+    print(f"   Model saved to: {model_dir}")
+    
+    return model, scaler, encoders
+
+def save_artifacts(model_dir, model, scaler, encoders, metadata, X_raw, heads=None, drift_reference=None):
+    """
+    Write the pickles and metadata, then the flat-forest bundle (X_raw: encoded
+    rows for the parity check). Without `heads` the ones already saved are re-exported.
+    """
     print("\n💾 Saving model artifacts...")
     
     with open(os.path.join(model_dir, 'placement_model.pkl'), 'wb') as f:
@@ -105,24 +231,170 @@ def train_model():
     with open(os.path.join(model_dir, 'encoders.pkl'), 'wb') as f:
         pickle.dump(encoders, f)
     
-    # Save metadata
-    metadata = {
-        'features': feature_cols,
-        'target': target_col,
-        'accuracy': round(accuracy * 100, 2),
-        'cv_accuracy': round(cv_scores.mean() * 100, 2),
-        'feature_importance': {k: round(v * 100, 1) for k, v in feature_importance.items()},
-        'branches': list(le_branch.classes_),
-        'n_samples': len(df)
-    }
-    
     with open(os.path.join(model_dir, 'model_metadata.json'), 'w') as f:
         json.dump(metadata, f, indent=2)
     
-    print("✅ Model training complete!")
+    if heads is not None:
+        save_heads(model_dir, heads)
+    else:
+        heads = load_heads(model_dir)
+    
+    if drift_reference is not None:
+        save_reference(model_dir, drift_reference)
+        print(f"   Drift reference: {drift_reference['rows']} rows")
+    
+    # Pickle-free, memory-mappable bundle for the API's fast inference path
+    if FlatForest.supports(model):
+        print("\n📦 Exporting model bundle...")
+        export_bundle(model, scaler, encoders, model_dir, parity_inputs(X_raw, scaler), heads=heads)
+    else:
+        # The API would otherwise keep serving the previous forest's bundle
+        shutil.rmtree(os.path.join(model_dir, BUNDLE_DIR), ignore_errors=True)
+        print(f"\n📦 {metadata.get('model')} has no flat-forest export; the API will serve it through sklearn")
+
+def train_incremental(new_trees=NEW_TREES, max_trees=MAX_TREES, search=False, metric='accuracy', workers=None):
+    """
+    Learn only the rows appended to the training CSV since the last run.
+    
+    The forest grows `new_trees` trees (warm_start) fitted on the new rows plus
+    a bounded reservoir sample of older ones, so the cost follows the size of
+    the delta. Unseen categories are appended to the encoders, which keeps the
+    codes the existing trees were trained on. The scaler stays frozen: tree
+    splits are unaffected by it, and refitting would shift the old thresholds.
+    
+    When an update is not possible the model is retrained in full, with the
+    search options (`search`, `metric`, `workers`) of a normal run.
+    """
+    retrain = lambda: train_model(search=search, metric=metric, workers=workers)
+    data_path = DATA_PATH
+    model_dir = MODEL_DIR
+    state = TrainingState.load(model_dir)
+    with open(os.path.join(model_dir, 'placement_model.pkl'), 'rb') as f:
+        model = pickle.load(f)
+    with open(os.path.join(model_dir, 'scaler.pkl'), 'rb') as f:
+        scaler = pickle.load(f)
+    with open(os.path.join(model_dir, 'encoders.pkl'), 'rb') as f:
+        encoders = pickle.load(f)
+    
+    if state is None or not state.is_append_of(data_path):
+        print("⚠️  No training state for this data file (or it was rewritten), running a full retrain")
+        return retrain()
+    if not isinstance(model, RandomForestClassifier):
+        print(f"⚠️  {type(model).__name__} cannot grow trees incrementally, running a full retrain")
+        return retrain()
+    
+    print("📂 Reading rows appended since the last run...")
+    df, offset, _ = read_rows(data_path, state.offset, state.header)
+    if len(df) == 0:
+        print(f"✅ No new rows since the last run ({state.rows} records trained)")
+        return model, scaler, encoders
+    print(f"   New records: {len(df)} (model has seen {state.rows})")
+    # Same checks as a full load; new categories are allowed, out-of-range values are not
+    apply_schema(df, PLACEMENT_SCHEMA, source='appended rows')
+    
+    feature_cols = list(scaler.feature_names_in_)
+    X_new = df[feature_cols].copy()
+    y_new = df['PlacedOrNot'].to_numpy()
+    
+    # New categories get the next free code instead of refitting the encoder
+    new_categories = {}
+    for col, table in compile_encoders(encoders).items():
+        _, known = table.encode_column(X_new[col])
+        unseen = sorted(set(X_new[col][~known].astype(str)))
+        if unseen:
+            encoders[col].classes_ = np.concatenate([encoders[col].classes_, np.array(unseen, dtype=object)])
+            new_categories[col] = unseen
+            print(f"   New {col} categories: {unseen}")
+    for col, table in compile_encoders(encoders).items():
+        X_new[col] = table.encode_column(X_new[col])[0]
+    X_new = X_new.to_numpy(dtype=np.float64)
+    
+    # Hold part of the delta out to measure the update (it still enters the reservoir)
+    n_holdout = len(X_new) // 5 if len(X_new) >= 50 else 0
+    rng = np.random.default_rng(state.seen)
+    order = rng.permutation(len(X_new))
+    holdout, fit_rows = order[:n_holdout], order[n_holdout:]
+    
+    X_reservoir, y_reservoir = load_reservoir(model_dir)
+    X_fit = np.vstack([X_new[fit_rows], X_reservoir]) if len(X_reservoir) else X_new[fit_rows]
+    y_fit = np.concatenate([y_new[fit_rows], y_reservoir])
+    if not np.array_equal(np.unique(y_fit), model.classes_):
+        # warm_start would refit classes_ under the existing trees
+        print(f"⚠️  Rows to fit only cover classes {np.unique(y_fit).tolist()}, running a full retrain")
+        return retrain()
+    scale = lambda rows: scaler.transform(pd.DataFrame(rows, columns=feature_cols))
+    
+    accuracy_before = accuracy_score(y_new[holdout], model.predict(scale(X_new[holdout]))) if n_holdout else None
+    
+    print(f"🌲 Growing {new_trees} trees on {len(fit_rows)} new + {len(X_reservoir)} reservoir rows...")
+    model.set_params(warm_start=True, n_estimators=len(model.estimators_) + new_trees, n_jobs=-1)
+    model.fit(scale(X_fit), y_fit)
+    
+    # Refresh: the oldest trees (fitted on the oldest data) go first
+    dropped = max(0, len(model.estimators_) - max_trees)
+    if dropped:
+        model.estimators_ = model.estimators_[dropped:]
+        model.n_estimators = len(model.estimators_)
+        print(f"   Dropped the {dropped} oldest trees (cap {max_trees})")
+    
+    accuracy_after = accuracy_score(y_new[holdout], model.predict(scale(X_new[holdout]))) if n_holdout else None
+    if n_holdout:
+        print(f"\n📊 Accuracy on {n_holdout} held-out new rows: "
+              f"{accuracy_before*100:.2f}% before -> {accuracy_after*100:.2f}% after")
+    
+    state.seen = update_reservoir(model_dir, X_reservoir, y_reservoir, X_new, y_new, state.seen, seed=state.seen)
+    
+    # Drift reference over the updated reservoir (a uniform sample of every row seen);
+    # probabilities from the held-out new rows, or the previous reference's without any
+    drift_reference = build_reference(
+        load_reservoir(model_dir)[0],
+        model.predict_proba(scale(X_new[holdout]))[:, 1] if n_holdout else None,
+        {col: encoders[col].classes_ for col in CATEGORICAL}
+    )
+    previous_reference = load_reference(model_dir)
+    if not n_holdout and previous_reference:
+        drift_reference['probability'] = previous_reference['probability']
+    state.advance(offset, len(df))
+    state.updates.append({
+        'at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'rows_added': len(df),
+        'trees_added': new_trees,
+        'trees_dropped': dropped,
+        'new_categories': new_categories,
+        'holdout_accuracy_before': round(accuracy_before * 100, 2) if n_holdout else None,
+        'holdout_accuracy_after': round(accuracy_after * 100, 2) if n_holdout else None
+    })
+    
+    with open(os.path.join(model_dir, 'model_metadata.json'), 'r') as f:
+        metadata = json.load(f)
+    metadata['feature_importance'] = {
+        k: round(v * 100, 1) for k, v in zip(feature_cols, model.feature_importances_)
+    }
+    metadata['branches'] = [str(c) for c in encoders['Branch'].classes_]
+    metadata['n_samples'] = state.rows
+    metadata['incremental'] = {'updates': len(state.updates), 'n_trees': len(model.estimators_), **state.updates[-1]}
+    
+    save_artifacts(model_dir, model, scaler, encoders, metadata, X_fit, drift_reference=drift_reference)
+    state.save(model_dir)
+    
+    print("✅ Incremental update complete!")
     print(f"   Model saved to: {model_dir}")
     
     return model, scaler, encoders
 
 if __name__ == "__main__":
-    train_model()
+    parser = argparse.ArgumentParser(description='Train the BMSIT placement model')
+    parser.add_argument('--search', action='store_true', help='compare model families and hyperparameters')
+    parser.add_argument('--metric', choices=['accuracy', 'f1'], default='accuracy', help='CV metric that picks the best model')
+    parser.add_argument('--workers', type=int, help='search processes (default: all cores)')
+    parser.add_argument('--incremental', action='store_true', help='only learn rows appended since the last run (--search etc. apply if a full retrain is needed)')
+    parser.add_argument('--new-trees', type=int, default=NEW_TREES, help='trees added per incremental run')
+    parser.add_argument('--max-trees', type=int, default=MAX_TREES, help='oldest trees are dropped beyond this')
+    args = parser.parse_args()
+    if args.incremental:
+        train_incremental(
+            new_trees=args.new_trees, max_trees=args.max_trees,
+            search=args.search, metric=args.metric, workers=args.workers
+        )
+    else:
+        train_model(search=args.search, metric=args.metric, workers=args.workers)
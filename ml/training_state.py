@@ -0,0 +1,120 @@
+"""
+Incremental Training State
+Remembers how much of the training CSV the current model has seen, plus a
+bounded reservoir sample of those rows, so a retrain only has to read and
+learn from rows appended since the last run
+"""
+
+import hashlib
+import io
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+STATE_FILE = 'training_state.json'
+RESERVOIR_FILE = 'training_reservoir.npz'
+RESERVOIR_SIZE = int(os.environ.get('ML_RESERVOIR_SIZE', 5000))
+# Bytes just before the offset that must be unchanged for an incremental update
+TAIL_BYTES = 64 * 1024
+
+
+def tail_hash(path, offset):
+    """Hash of the last TAIL_BYTES before `offset`; detects a rewritten (not appended) file"""
+    with open(path, 'rb') as f:
+        start = max(0, offset - TAIL_BYTES)
+        f.seek(start)
+        return hashlib.sha256(f.read(offset - start)).hexdigest()
+
+
+def read_rows(path, offset=0, header=None):
+    """
+    Read complete CSV lines from byte `offset` on.
+
+    Returns (DataFrame, new offset, header line). A trailing line without a
+    newline is left for the next run, in case a writer is still appending it.
+    """
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        raw = f.read()
+    end = raw.rfind(b'\n') + 1
+    raw = raw[:end]
+    if offset == 0:
+        header, _, raw = raw.partition(b'\n')
+        header = header.decode('utf-8-sig')
+        end_offset = end
+    else:
+        end_offset = offset + end
+    if not raw.strip():
+        return pd.DataFrame(columns=header.split(',')), end_offset, header
+    df = pd.read_csv(io.BytesIO(header.encode() + b'\n' + raw))
+    return df, end_offset, header
+
+
+class TrainingState:
+    """Persisted in models/training_state.json next to the artifacts it describes"""
+
+    def __init__(self, data_path, offset, rows, header, tail, seen=0, updates=None):
+        self.data_path = data_path
+        self.offset = offset
+        self.rows = rows
+        self.header = header
+        self.tail = tail
+        # Rows offered to the reservoir so far (needed to keep it a uniform sample)
+        self.seen = seen
+        self.updates = updates or []
+
+    @classmethod
+    def load(cls, model_dir):
+        path = os.path.join(model_dir, STATE_FILE)
+        if not os.path.exists(path):
+            return None
+        with open(path, 'r') as f:
+            return cls(**json.load(f))
+
+    def save(self, model_dir):
+        path = os.path.join(model_dir, STATE_FILE)
+        with open(path, 'w') as f:
+            json.dump(vars(self), f, indent=2)
+
+    def is_append_of(self, data_path):
+        """True if data_path still starts with the bytes this state has consumed"""
+        return (
+            os.path.abspath(data_path) == os.path.abspath(self.data_path)
+            and os.path.getsize(data_path) >= self.offset
+            and tail_hash(data_path, self.offset) == self.tail
+        )
+
+    def advance(self, offset, new_rows):
+        self.offset = offset
+        self.rows += new_rows
+        self.tail = tail_hash(self.data_path, offset)
+
+
+def load_reservoir(model_dir):
+    path = os.path.join(model_dir, RESERVOIR_FILE)
+    if not os.path.exists(path):
+        return np.zeros((0, 0)), np.zeros(0, dtype=np.int64)
+    with np.load(path) as data:
+        return data['X'], data['y']
+
+
+def update_reservoir(model_dir, X, y, X_new, y_new, seen, seed=None, size=RESERVOIR_SIZE):
+    """
+    Reservoir-sample (algorithm R) the new encoded rows into the stored sample
+    and save it; returns the updated count of rows offered so far.
+    """
+    rng = np.random.default_rng(seed)
+    X = X if len(X) else np.zeros((0, X_new.shape[1]))
+    fill = min(max(size - len(X), 0), len(X_new))
+    X = np.vstack([X, X_new[:fill]])
+    y = np.concatenate([y, y_new[:fill]])
+    # Row i of the rest replaces a random slot with probability size / (rows seen so far)
+    positions = seen + fill + np.arange(len(X_new) - fill)
+    slots = (rng.random(len(positions)) * (positions + 1)).astype(np.int64)
+    keep = slots < size
+    for row, slot in zip(np.flatnonzero(keep) + fill, slots[keep]):
+        X[slot], y[slot] = X_new[row], y_new[row]
+    np.savez(os.path.join(model_dir, RESERVOIR_FILE), X=X, y=y)
+    return seen + len(X_new)